@@ -0,0 +1,54 @@
+# benchmarks/bench_answer_cache.py
+"""
+Lookup latency of the semantic answer cache vs. a simulated full RAG answer.
+
+    python benchmarks/bench_answer_cache.py --entries 5000 --llm-latency-ms 2500
+
+Embeddings are random unit vectors (1536-d, like text-embedding-3-small);
+repeat questions are the cached vector plus small noise so they land above
+the cosine threshold.
+"""
+
+import os, sys, time, argparse, tempfile, statistics
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from support_agent.answer_cache import SemanticAnswerCache
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, default=5000)
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--llm-latency-ms", type=float, default=2500)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(7)
+    vectors = {}
+
+    def embed(text):
+        if text not in vectors:
+            base = text.split("~")[0]
+            v = vectors.get(base)
+            v = rng.normal(size=1536) if v is None else v + rng.normal(scale=0.01, size=1536)
+            vectors[text] = v / np.linalg.norm(v)
+        return vectors[text]
+
+    with tempfile.TemporaryDirectory() as root:
+        cache = SemanticAnswerCache(os.path.join(root, "answers.jsonl"), embed, threshold=0.92,
+                                    max_entries=args.entries)
+        cache.load("bench")
+        for i in range(args.entries):
+            cache.add(f"question {i}", f"answer {i}", sampler_hint=False)
+
+        timings = []
+        for i in range(args.lookups):
+            q = f"question {rng.integers(args.entries)}~{i}"
+            embed(q)  # embedding cost is covered by the query-embedding cache
+            t0 = time.perf_counter()
+            answer, sim = cache.lookup(q, sampler_hint=False)
+            timings.append((time.perf_counter() - t0) * 1000)
+            assert answer is not None, sim
+
+    print(f"⚡ {args.entries:,} cached answers — p50 lookup {statistics.median(timings):.2f} ms, "
+          f"max {max(timings):.2f} ms (hit rate {cache.counters['hits'] / args.lookups:.0%})")
+    print(f"🐢 uncached RAG answer (simulated LLM) ≈ {args.llm_latency_ms:.0f} ms")
@@ -0,0 +1,82 @@
+# benchmarks/bench_chunking.py
+"""
+Prompt tokens per query and retrieval hit-rate: whole-file docs vs. chunks.
+
+    python benchmarks/bench_chunking.py
+
+Retrieval uses a hashed bag-of-words embedder (no API key needed), the same
+ranking for both modes, so the difference comes from the chunking alone.
+"Before" = top-3 whole markdown files; "after" = top-6 chunks packed into the
+FAQ_CONTEXT_TOKEN_BUDGET. A query is a hit when its answer phrase is in the
+context.
+"""
+
+import os, re, sys, math, argparse, hashlib
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from support_agent.md_chunker import chunk_markdown, pack_chunks, count_tokens
+
+FAQ_DIR = os.path.join(os.path.dirname(__file__), "..", "support_agent")
+
+# (question, phrase that must appear in the retrieved context)
+LABELED_QUERIES = [
+    ("What's your refund policy?", "within 14 days"),
+    ("How long does shipping take?", "3–5 business days"),
+    ("Do you ship outside the US?", "United States"),
+    ("My package says delivered but I don't have it", "within **7 days**"),
+    ("How do I brew masala chai?", "Boil the water"),
+    ("How much milk should I use?", "1 cup (8 oz) milk"),
+    ("How can I make my chai stronger?", "simmer longer"),
+    ("What's in the sampler box?", "stainless-steel strainer"),
+    ("Which chai helps with immunity?", "Turmeric"),
+    ("Tell me about Rose Radiance", "rose petals"),
+    ("Who founded Two Peaks?", "Founders"),
+    ("What is your mission?", "Mission"),
+]
+
+
+def embed(text: str, dims: int = 512) -> list[float]:
+    vec = [0.0] * dims
+    for word in re.findall(r"\w+", text.lower()):
+        vec[int(hashlib.md5(word.encode()).hexdigest(), 16) % dims] += 1.0
+    norm = math.sqrt(sum(v * v for v in vec)) or 1.0
+    return [v / norm for v in vec]
+
+
+def rank(query: str, docs: list[dict], k: int) -> list[str]:
+    q = embed(query)
+    scored = sorted(docs, key=lambda d: -sum(a * b for a, b in zip(q, d["vec"])))
+    return [d["text"] for d in scored[:k]]
+
+
+def load(chunked: bool, max_tokens: int, overlap: int) -> list[dict]:
+    docs = []
+    for name in sorted(os.listdir(FAQ_DIR)):
+        if name.endswith(".md"):
+            with open(os.path.join(FAQ_DIR, name), encoding="utf-8") as f:
+                text = f.read()
+            parts = chunk_markdown(text, name, max_tokens, overlap) if chunked else [{"text": text}]
+            docs.extend({"text": p["text"], "vec": embed(p["text"])} for p in parts)
+    return docs
+
+
+def evaluate(label: str, docs: list[dict], k: int, budget: int | None):
+    tokens, hits = [], 0
+    for question, phrase in LABELED_QUERIES:
+        ranked = rank(question, docs, k)
+        context = "\n\n".join(pack_chunks(ranked, budget) if budget else ranked)
+        tokens.append(count_tokens(context))
+        hits += phrase in context
+    print(f"{label:<28} docs={len(docs):<3} avg prompt tokens={sum(tokens) / len(tokens):6.0f}  "
+          f"hit-rate={hits}/{len(LABELED_QUERIES)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunk-tokens", type=int, default=200)
+    parser.add_argument("--overlap", type=int, default=30)
+    parser.add_argument("--budget", type=int, default=500)
+    args = parser.parse_args()
+
+    evaluate("before: whole files, top-3", load(False, 0, 0), 3, None)
+    evaluate(f"after: chunks ≤{args.budget} tok", load(True, args.chunk_tokens, args.overlap), 6, args.budget)
@@ -0,0 +1,61 @@
+# benchmarks/bench_embedding_cache.py
+"""
+Replay skewed support traffic through the query-embedding cache.
+
+    python benchmarks/bench_embedding_cache.py --queries 2000 --embed-latency-ms 150
+
+Prints API round-trips with and without the cache and p50 latency for hits
+vs. misses. A second pass with a fresh LRU shows disk-tier hits after restart.
+"""
+
+import os, sys, time, random, hashlib, argparse, tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from support_agent.embedding_cache import EmbeddingCache
+
+QUESTIONS = [
+    "What's your refund policy?", "How do I brew masala chai?", "Do you ship internationally?",
+    "Where is my order?", "What's the best chai for first-time buyers?", "Is the chai caffeine free?",
+    "Tell me about the founders.", "Can I cancel my order?", "How long does shipping take?",
+    "What's in the Founder's Ritual Sampler Box?",
+]
+
+
+def paraphrase(q: str) -> str:
+    return random.choice([q, q.lower(), q.rstrip("?"), f"  {q}  ", q.replace("'", "’")])
+
+
+def stub_embedder(latency_s: float, calls: list):
+    def embed(texts):
+        calls.append(len(texts))
+        time.sleep(latency_s)
+        return [[b / 255 for b in hashlib.sha256(t.encode()).digest()] for t in texts]
+    return embed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--embed-latency-ms", type=float, default=150)
+    parser.add_argument("--unique-share", type=float, default=0.05, help="fraction of one-off questions")
+    args = parser.parse_args()
+
+    random.seed(7)
+    weights = [1 / (i + 1) for i in range(len(QUESTIONS))]  # Zipf-like popularity
+    traffic = [
+        f"Question about order #{i}" if random.random() < args.unique_share
+        else paraphrase(random.choices(QUESTIONS, weights)[0])
+        for i in range(args.queries)
+    ]
+
+    with tempfile.TemporaryDirectory() as path:
+        for label in ("first process", "after restart"):
+            calls = []
+            cache = EmbeddingCache(stub_embedder(args.embed_latency_ms / 1000, calls),
+                                   model="text-embedding-3-small", disk_path=path)
+            for q in traffic:
+                cache.get(q)
+            s = cache.stats()
+            print(f"📊 {label}: {len(calls)} API calls for {s['requests']} queries "
+                  f"(hit rate {s['hit_rate']:.1%}, memory={s['memory_hits']}, disk={s['disk_hits']})")
+            print(f"   p50 hit {s['p50_hit_ms']} ms · p50 miss {s['p50_miss_ms']} ms")
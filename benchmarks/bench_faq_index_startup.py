@@ -0,0 +1,74 @@
+# benchmarks/bench_faq_index_startup.py
+"""
+Startup cost of the FAQ index: cold (empty chroma_db) vs. warm (reused).
+
+    python benchmarks/bench_faq_index_startup.py --embed-latency-ms 300
+
+Embeddings come from a deterministic stub with simulated API latency, so no
+OpenAI key is needed. A third run edits one document to show that only the
+changed chunk is re-embedded.
+"""
+
+import os, sys, time, hashlib, argparse, tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import chromadb
+from support_agent.faq_index import chunk_id, sync_collection
+
+FAQ_DIR = os.path.join(os.path.dirname(__file__), "..", "support_agent")
+
+
+class StubEmbedder:
+    """Hash-based 64-d vectors plus a fixed per-request delay."""
+
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.calls = 0
+        self.texts = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        self.texts += len(texts)
+        time.sleep(self.latency_s)
+        return [[b / 255 for b in hashlib.sha512(t.encode()).digest()] for t in texts]
+
+
+def load_faq_docs(scale: int):
+    docs = []
+    for name in sorted(os.listdir(FAQ_DIR)):
+        if not name.endswith(".md"):
+            continue
+        with open(os.path.join(FAQ_DIR, name), encoding="utf-8") as f:
+            text = f.read()
+        for copy in range(scale):
+            source = name if copy == 0 else f"{name}#{copy}"
+            docs.append({"id": chunk_id(source, text), "text": text, "source": source})
+    return docs
+
+
+def startup(path: str, docs, embedder) -> tuple[float, dict]:
+    t0 = time.perf_counter()
+    client = chromadb.PersistentClient(path=path)
+    collection = client.get_or_create_collection("two_peaks_faqs")
+    stats = sync_collection(collection, docs, embedder, batch_size=16)
+    return time.perf_counter() - t0, stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--embed-latency-ms", type=float, default=300)
+    parser.add_argument("--scale", type=int, default=20, help="copies of each FAQ file")
+    args = parser.parse_args()
+
+    docs = load_faq_docs(args.scale)
+    with tempfile.TemporaryDirectory() as path:
+        for label, run_docs in [
+            ("cold", docs),
+            ("warm", docs),
+            ("one edit", [dict(docs[0], text=docs[0]["text"] + "\nUpdated.",
+                               id=chunk_id(docs[0]["source"], docs[0]["text"] + "\nUpdated."))] + docs[1:]),
+        ]:
+            embedder = StubEmbedder(args.embed_latency_ms / 1000)
+            seconds, stats = startup(path, run_docs, embedder)
+            print(f"{label:>9}: {seconds:6.2f}s  embed calls={embedder.calls:<3} "
+                  f"added={stats['added']:<4} deleted={stats['deleted']:<3} reused={stats['unchanged']}")
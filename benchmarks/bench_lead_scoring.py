@@ -0,0 +1,113 @@
+# benchmarks/bench_lead_scoring.py
+"""
+Lead-scoring throughput: the old one-row-at-a-time loop vs. `BatchScorer`.
+
+    python benchmarks/bench_lead_scoring.py --rows 1000 --latency-ms 400 --rpm 3000 --pack-sizes 1 10 25
+
+Starts `stub_openai_server` in-process. The baseline scores a sample of rows
+sequentially with the old `time.sleep(0.3)` pacing and extrapolates to the
+full batch. The batch scorer then runs at several concurrency levels, and
+once more against a tight per-minute budget so 429 handling shows up in the
+retry count. Finally, packed mode (`packed_scoring.score_rows`) is compared
+across pack sizes: requests, tokens per lead, and agreement with the
+one-row-per-request scores.
+"""
+
+import os, re, sys, time, random, argparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+os.environ.setdefault("LLM_CACHE", "0")  # measure real request traffic, not cache hits
+sys.path.append(os.path.dirname(__file__))
+
+from openai import OpenAI
+from stub_openai_server import start_server
+from marketing_agent.batch_scorer import BatchScorer
+from marketing_agent.packed_scoring import score_rows
+
+COMMENTS = [
+    "This chai just made my morning ☕️✨", "Need this in a bulk pack 😍", "Loved the saffron notes!",
+    "Best chai I’ve ever had!", "Can you ship internationally?", "The ritual is everything. Beautiful blend.",
+]
+PROMPT = """
+Evaluate this Instagram comment for purchase interest (1–10).
+
+Username: {username}
+Comment: "{comment}"
+Followers: {followers}
+Likes: {likes}
+
+Reply strictly as:
+SCORE: <number> | REASON: <short reason>
+"""
+
+
+def fake_rows(n: int) -> list[dict]:
+    random.seed(11)
+    return [{"username": f"chai_fan_{i}", "comment": f"{random.choice(COMMENTS)} #{i}",
+             "followers": random.randint(50, 20000), "likes": random.randint(0, 500)} for i in range(n)]
+
+
+def parse_score(resp):
+    m = re.search(r"SCORE:\s*(\d+)", resp)
+    return (int(m.group(1)) if m else 5), re.sub(r".*REASON:\s*", "", resp).strip()
+
+
+def sequential_baseline(base_url: str, prompts: list[str], sample: int) -> float:
+    client = OpenAI(api_key="stub", base_url=base_url)
+    t0 = time.perf_counter()
+    for p in prompts[:sample]:
+        client.chat.completions.create(model="gpt-4o-mini", temperature=0.2,
+                                       messages=[{"role": "user", "content": p}])
+        time.sleep(0.3)
+    return sample / (time.perf_counter() - t0)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--baseline-sample", type=int, default=10)
+    parser.add_argument("--rpm", type=int, default=3000, help="stub per-minute budget for the rate-limited run")
+    parser.add_argument("--pack-sizes", type=int, nargs="+", default=[1, 10, 25])
+    args = parser.parse_args()
+
+    rows = fake_rows(args.rows)
+    prompts = [PROMPT.format(**r) for r in rows]
+    server, base_url = start_server(latency_ms=args.latency_ms)
+    print(f"🧪 Stub LLM at {base_url} (latency {args.latency_ms:.0f} ms), {args.rows} rows")
+
+    rate = sequential_baseline(base_url, prompts, args.baseline_sample)
+    print(f"🐢 sequential + sleep(0.3): {rate:6.2f} rows/s → ~{args.rows / rate / 60:.1f} min for {args.rows} rows")
+
+    for c in args.concurrency:
+        scorer = BatchScorer(concurrency=c, rpm=100_000, api_key="stub", base_url=base_url)
+        results = scorer.run(prompts)
+        s = scorer.stats
+        print(f"⚡ concurrency {c:>3}: {s['rows_per_s']:7.2f} rows/s   {s['seconds']:6.1f}s   "
+              f"ok {s['ok']}  failed {s['failed']}  retries {s['retries']}")
+    server.shutdown()
+
+    # Tight server budget: the scorer starts optimistic, then follows the headers / 429s.
+    server, base_url = start_server(latency_ms=args.latency_ms, rpm=args.rpm)
+    scorer = BatchScorer(concurrency=max(args.concurrency), rpm=args.rpm * 2, api_key="stub", base_url=base_url)
+    scorer.run(prompts[: min(args.rows, args.rpm // 2)])
+    s = scorer.stats
+    print(f"🚦 rpm-limited ({args.rpm}/min): {s['rows_per_s']:7.2f} rows/s   "
+          f"ok {s['ok']}  failed {s['failed']}  retries {s['retries']}")
+    server.shutdown()
+
+    server, base_url = start_server(latency_ms=args.latency_ms)
+    reference = None
+    for size in args.pack_sizes:
+        scorer = BatchScorer(concurrency=16, rpm=100_000, api_key="stub", base_url=base_url)
+        scores = [r[0] if r else None for r in
+                  score_rows(scorer, rows, lambda r: PROMPT.format(**r), parse_score, pack_size=size)]
+        reference = reference or scores
+        s = scorer.stats
+        agree = sum(a == b for a, b in zip(scores, reference)) / len(rows)
+        tokens = (s["prompt_tokens"] + s["completion_tokens"]) / len(rows)
+        print(f"📦 pack {size:>3}: {s['requests']:>5} requests   {tokens:6.1f} tokens/lead   "
+              f"{s['rows_per_s']:7.2f} rows/s   fallbacks {s['fallback_rows']}   same score {agree:.0%}")
+    server.shutdown()
@@ -0,0 +1,78 @@
+# benchmarks/bench_template_generation.py
+"""
+Outreach template generation: serial loop vs. `template_pipeline.generate_templates`.
+
+    python benchmarks/bench_template_generation.py --leads 500 --latency-ms 800 --concurrency 32
+
+Starts `stub_openai_server` in-process. The baseline drafts a sample of leads
+the old way (one request, then `time.sleep(0.3)`) and extrapolates. The
+pipeline then drafts every lead. Its writes go to an in-memory sheet that
+charges `--write-latency-ms` per append, to mimic a Sheets round-trip. The
+report shows leads/sec, time to the first written batch and the write count.
+"""
+
+import os, sys, time, random, argparse
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(__file__))
+os.environ.setdefault("LLM_CACHE", "0")  # measure real request traffic, not cache hits
+
+from openai import OpenAI
+from stub_openai_server import start_server
+from marketing_agent.template_pipeline import build_prompt, generate_templates
+
+COMMENTS = ["Need this in a bulk pack 😍", "Loved the saffron notes!", "Can you ship internationally?"]
+
+
+def fake_leads(n: int) -> list[dict]:
+    random.seed(5)
+    return [{"username": f"chai_fan_{i}", "comment": random.choice(COMMENTS), "likes": random.randint(10, 100),
+             "followers": random.randint(500, 5000), "reason": "Strong purchase intent."} for i in range(n)]
+
+
+class TimedSheet:
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.rows, self.writes, self.first_write = [], 0, None
+
+    def append_rows(self, rows):
+        time.sleep(self.latency_s)
+        self.rows.extend(rows)
+        self.writes += 1
+        self.first_write = self.first_write or time.perf_counter()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--leads", type=int, default=500)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--write-latency-ms", type=float, default=300)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[8, 32])
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--baseline-sample", type=int, default=5)
+    args = parser.parse_args()
+
+    leads = fake_leads(args.leads)
+    server, base_url = start_server(latency_ms=args.latency_ms)
+    print(f"🧪 Stub LLM at {base_url} (latency {args.latency_ms:.0f} ms), {args.leads} leads")
+
+    client = OpenAI(api_key="stub", base_url=base_url)
+    t0 = time.perf_counter()
+    for lead in leads[:args.baseline_sample]:
+        client.chat.completions.create(model="gpt-4o-mini", temperature=0.6,
+                                       messages=[{"role": "user", "content": build_prompt(lead)}])
+        time.sleep(0.3)
+    per_lead = (time.perf_counter() - t0) / args.baseline_sample
+    print(f"🐢 serial + sleep(0.3): {1 / per_lead:6.2f} leads/s → ~{per_lead * args.leads / 60:.1f} min, "
+          f"nothing written until the end")
+
+    for c in args.concurrency:
+        sheet = TimedSheet(args.write_latency_ms / 1000)
+        t0 = time.perf_counter()
+        stats = generate_templates(leads, sheet.append_rows, concurrency=c, batch_size=args.batch_size,
+                                   progress=lambda msg, **counts: None, api_key="stub", base_url=base_url, rpm=100_000)
+        print(f"⚡ concurrency {c:>3}: {stats['leads_per_s']:7.2f} leads/s   {stats['seconds']:6.1f}s   "
+              f"first batch written after {sheet.first_write - t0:5.1f}s   {sheet.writes} writes   "
+              f"{len(sheet.rows)} rows   failed {stats['failed']}")
+    server.shutdown()
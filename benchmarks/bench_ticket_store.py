@@ -0,0 +1,71 @@
+# benchmarks/bench_ticket_store.py
+"""
+Per-ticket write cost: append-only JSONL log vs. legacy read/rewrite JSON array.
+
+    python benchmarks/bench_ticket_store.py --tickets 100000
+
+The JSONL store should report a flat per-write time from the first to the
+last window; the legacy path grows linearly with history size, so it is only
+sampled at a few sizes.
+"""
+
+import os, sys, json, time, argparse, tempfile
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from support_agent.ticket_store import TicketStore
+
+
+def _ticket(i: int) -> dict:
+    return {
+        "timestamp": f"2025-11-06T01:{i % 60:02d}:00",
+        "user_query": f"What's your refund policy? #{i}",
+        "assistant_response": "We offer a 30-day satisfaction guarantee on unopened tins. " * 3,
+    }
+
+
+def bench_jsonl(total: int, window: int, root: str) -> list[tuple[int, float]]:
+    store = TicketStore(ticket_dir=os.path.join(root, "tickets"),
+                        legacy_path=os.path.join(root, "missing.json"),
+                        max_segment_bytes=4 * 1024 * 1024)
+    results = []
+    for start in range(0, total, window):
+        t0 = time.perf_counter()
+        for i in range(start, min(start + window, total)):
+            store.append(_ticket(i))
+        per_write = (time.perf_counter() - t0) / window
+        results.append((start + window, per_write * 1e6))
+    assert len(store.load_all()) == total
+    return results
+
+
+def bench_legacy(sizes: list[int], root: str, samples: int = 20) -> list[tuple[int, float]]:
+    path = os.path.join(root, "support_tickets.json")
+    results = []
+    for size in sizes:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump([_ticket(i) for i in range(size)], f, indent=2)
+        t0 = time.perf_counter()
+        for i in range(samples):
+            with open(path, "r", encoding="utf-8") as f:
+                tickets = json.load(f)
+            tickets.append(_ticket(size + i))
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(tickets, f, indent=2)
+        results.append((size, (time.perf_counter() - t0) / samples * 1e6))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickets", type=int, default=100_000)
+    parser.add_argument("--window", type=int, default=10_000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        print(f"📝 JSONL append log — {args.tickets:,} tickets")
+        for count, us in bench_jsonl(args.tickets, args.window, root):
+            print(f"  after {count:>7,} tickets: {us:8.1f} µs/write")
+
+        print("📝 Legacy JSON rewrite (sampled)")
+        for size, us in bench_legacy([100, 1_000, 10_000], root):
+            print(f"  at {size:>7,} tickets:    {us:8.1f} µs/write")
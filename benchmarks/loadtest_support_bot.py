@@ -0,0 +1,73 @@
+# benchmarks/loadtest_support_bot.py
+"""
+Load test for the async support bot handler against a local stub LLM.
+
+    python benchmarks/loadtest_support_bot.py --users 1 10 50 --requests 5
+
+Starts `stub_openai_server` in-process, points the bot at it, and drives
+`generate_answer` with N concurrent simulated users. Reports requests/sec
+plus p50 time-to-first-token and total latency per level. Tickets, the
+Chroma index and the embedding cache go to a temp dir.
+"""
+
+import os, sys, time, asyncio, argparse, tempfile, statistics
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(ROOT, "support_agent"))
+sys.path.append(os.path.dirname(__file__))
+
+from stub_openai_server import start_server
+
+QUESTIONS = [
+    "What's your refund policy?", "How do I brew masala chai?", "Do you ship internationally?",
+    "What's the best chai for first-time buyers?", "Tell me about the founders.",
+]
+
+
+async def simulated_user(handler, user: int, n: int, results: list):
+    for i in range(n):
+        question = f"{QUESTIONS[(user + i) % len(QUESTIONS)]} (user {user}, #{i})"
+        t0 = time.perf_counter()
+        ttft = None
+        async for _ in handler(question, []):
+            if ttft is None:
+                ttft = time.perf_counter() - t0
+        results.append((ttft, time.perf_counter() - t0))
+
+
+async def run_levels(handler, levels: list[int], per_user: int):
+    for users in levels:
+        results = []
+        t0 = time.perf_counter()
+        await asyncio.gather(*(simulated_user(handler, u, per_user, results) for u in range(users)))
+        wall = time.perf_counter() - t0
+        ttfts = [r[0] * 1000 for r in results if r[0] is not None]
+        totals = [r[1] * 1000 for r in results]
+        print(f"👥 {users:>3} users: {len(results) / wall:6.1f} req/s   "
+              f"p50 TTFT {statistics.median(ttfts):7.1f} ms   p50 total {statistics.median(totals):7.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--requests", type=int, default=5, help="requests per user per level")
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--token-interval-ms", type=float, default=5)
+    args = parser.parse_args()
+
+    server, base_url = start_server(latency_ms=args.latency_ms, token_interval_ms=args.token_interval_ms)
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.update({
+            "OPENAI_BASE_URL": base_url,
+            "OPENAI_API_KEY": "stub",
+            "CHROMADB_PATH": os.path.join(tmp, "chroma"),
+            "SUPPORT_TICKET_DIR": os.path.join(tmp, "tickets"),
+            "EMBEDDING_CACHE_PATH": os.path.join(tmp, "embeddings"),
+            "SUPPORT_ANSWER_CACHE": "0",
+            "SUPPORT_MAX_CONCURRENCY": str(max(args.users)),
+        })
+        import rag_support_bot  # noqa: E402 — must import after env points at the stub
+
+        print(f"🧪 Stub LLM at {base_url} (latency {args.latency_ms:.0f} ms)")
+        asyncio.run(run_levels(rag_support_bot.generate_answer, args.users, args.requests))
+    server.shutdown()
@@ -0,0 +1,386 @@
+# benchmarks/run_benchmarks.py
+"""
+End-to-end pipeline benchmarks at several data scales, with JSON results.
+
+    python benchmarks/run_benchmarks.py                                    # every pipeline at 100 / 1k / 10k rows
+    python benchmarks/run_benchmarks.py --pipelines marketing fulfillment --scales 100 100000
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/before.json benchmarks/results/after.json
+
+Pipelines (the rows are seeded synthetically before timing starts):
+- marketing: Instagram_Engagement_Raw → lead_scoring.py → template_generator.py
+- fulfillment: shipped orders in PostPurchase_Engagement_Log → email_generator.py
+- insights: Customer_Insights_Data → segments → Customer_Segments → LLM report → Insights_Report
+- finance: financial_data.csv-shaped CSV → generate_financial_metrics + summarize_financials
+- rag: FAQ index sync, then one `rag_support_bot.generate_answer` per row (question)
+
+Everything runs against local stand-ins: `stub_openai_server` in this
+process (`LLM_STUB=1`) and the in-memory Sheets emulator
+(`SHEETS_BACKEND=memory`, `--sheets-latency-ms` per call). Each
+(pipeline, scale) runs in a fresh child process with its own LLM cache,
+watermark, Chroma DB and ticket dir in a temp dir, so runs are cold and peak
+RSS belongs to that run alone.
+
+Each result reports wall time, Sheets calls by kind, LLM requests/tokens
+(from the stub's `/stats`), and peak RSS, overall and per stage. Results go to
+`benchmarks/results/<timestamp>-<commit>.json` with sorted keys, so two runs
+can be diffed directly or with `--compare`. A run that exceeds `--timeout`
+is recorded as "timeout" and the suite moves on.
+"""
+
+import os, sys, json, time, runpy, random, asyncio, argparse, platform, resource, tempfile, subprocess
+import urllib.request
+from contextlib import contextmanager
+from datetime import datetime
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(ROOT)
+sys.path.append(os.path.dirname(__file__))
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+PIPELINES = ["marketing", "fulfillment", "insights", "finance", "rag"]
+DEFAULT_SCALES = [100, 1000, 10000]
+
+COMMENTS = ["This chai just made my morning ☕️✨", "Need this in a bulk pack 😍", "Loved the saffron notes!",
+            "Best chai I’ve ever had!", "Can you ship internationally?", "The ritual is everything. Beautiful blend.",
+            "meh", "Where can I buy this in Denver?"]
+FIRST_NAMES = ["Asha", "Hannah", "Raj", "Sophia", "Ethan", "Maya", "Noah", "Leah", "Kiran", "Zoe"]
+LAST_NAMES = ["Verma", "Singh", "Patel", "Sharma", "Miller", "Gupta", "Nair", "Rao", "Moore", "Iyer"]
+PRODUCTS = ["Signature Masala Chai", "Rose Radiance Chai", "Golden Glow Chai", "Saffron Infused Chai",
+            "Assam Breakfast Chai", "Tulsi Serenity Chai", "Ginger Zest Chai"]
+CHANNELS = ["Shopify", "Amazon", "Wholesale", "Instagram"]
+QUESTIONS = ["What's your refund policy?", "How do I brew masala chai?", "Do you ship internationally?",
+             "What's the best chai for first-time buyers?", "Tell me about the founders."]
+
+
+# ------------------------------------------------------------
+# Child side: seed, run one pipeline, measure
+# ------------------------------------------------------------
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def llm_stats() -> dict:
+    with urllib.request.urlopen(os.environ["LLM_STUB_URL"] + "/stats", timeout=10) as resp:
+        return json.loads(resp.read())
+
+
+def _delta(after: dict, before: dict) -> dict:
+    return {k: after[k] - before.get(k, 0) for k in sorted(after) if after[k] - before.get(k, 0)}
+
+
+class Recorder:
+    """Per-stage wall time, Sheets calls and LLM traffic for one pipeline run."""
+
+    def __init__(self):
+        self.stages = []
+
+    @contextmanager
+    def stage(self, name: str):
+        from shared.sheets_gateway import api_calls
+        sheets0, llm0, t0 = api_calls(), llm_stats(), time.perf_counter()
+        info = {}
+        yield info
+        self.stages.append({"name": name, "seconds": round(time.perf_counter() - t0, 3),
+                            "sheets_calls": _delta(api_calls(), sheets0), "llm": _delta(llm_stats(), llm0),
+                            **info})
+
+
+def run_script(relpath: str, *argv: str):
+    """Run an agent script in this process as `python <relpath> <argv>` would."""
+    path = os.path.join(ROOT, relpath)
+    saved = sys.argv
+    sys.argv = [path, *argv]
+    try:
+        runpy.run_path(path, run_name="__main__")
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            raise
+    finally:
+        sys.argv = saved
+
+
+def seed_sheet(title: str, headers: list[str], rows: list[list]):
+    from shared.sheets_gateway import get_gateway
+    ws = get_gateway().worksheet(title, headers=headers)
+    if rows:
+        ws.append_rows(rows, value_input_option="RAW")
+
+
+def run_marketing(rec: Recorder, n: int, workdir: str):
+    with rec.stage("seed") as info:
+        seed_sheet("Instagram_Engagement_Raw", ["timestamp", "username", "comment", "likes", "followers"],
+                   [[f"2025-10-{1 + i % 28:02d}T09:00:00-06:00", f"chai_fan_{i}", random.choice(COMMENTS),
+                     random.randint(10, 100), random.randint(500, 5000)] for i in range(n)])
+        info["rows"] = n
+    with rec.stage("lead_scoring"):
+        run_script("marketing_agent/lead_scoring.py")
+    with rec.stage("template_generator"):
+        run_script("marketing_agent/template_generator.py")
+    from shared.sheets_gateway import get_gateway
+    return {"qualified_leads": len(get_gateway().worksheet("Qualified_Leads").get_all_values()) - 1,
+            "templates": len(get_gateway().worksheet("Marketing_Templates").get_all_values()) - 1}
+
+
+def run_fulfillment(rec: Recorder, n: int, workdir: str):
+    with rec.stage("seed") as info:
+        statuses = ["SHIPPED"] * 8 + ["DELIVERED", "PENDING"]
+        seed_sheet("PostPurchase_Engagement_Log",
+                   ["timestamp", "order_id", "email", "first_name", "products", "total", "status", "email_message_id"],
+                   [["2025-10-01 09:00:00", f"TP{100000 + i}", f"customer{i}@example.com",
+                     random.choice(FIRST_NAMES), random.choice(PRODUCTS), random.randint(20, 120),
+                     random.choice(statuses), ""] for i in range(n)])
+        info["rows"] = n
+    with rec.stage("email_generator"):
+        run_script("fulfillment_agent/email_generator.py")
+    from shared.sheets_gateway import get_gateway
+    return {"emails": len(get_gateway().worksheet("Fulfillment_Templates").get_all_values()) - 1}
+
+
+def run_insights(rec: Recorder, n: int, workdir: str):
+    from insights_agent.segment_customers import load_customer_data, segment_customers, save_to_sheets
+    from insights_agent.summarize_insights import load_segment_data, generate_insight_summary
+    from insights_agent.summarize_insights import save_to_sheets as save_report
+    customers = max(1, n // 3)
+    with rec.stage("seed") as info:
+        headers = ["Name", "Email", "Financial Status", "Fulfillment Status", "Created at", "Paid at",
+                   "Fulfilled at", "Currency", "Subtotal", "Shipping", "Total", "Lineitem quantity",
+                   "Lineitem name", "Lineitem price", "Shipping City", "Shipping Province", "Shipping Country",
+                   "Customer First Name", "Customer Last Name", "Notes", "Tags"]
+        rows = []
+        for i in range(n):
+            c = random.randrange(customers)
+            day = f"2025-{random.randint(6, 10):02d}-{random.randint(1, 28):02d}"
+            qty, price = random.randint(1, 3), random.choice([24, 30, 35, 40, 45])
+            rows.append([f"Order #{1000 + i}", f"customer{c}@example.com", "Paid", "Delivered", day, day, day,
+                         "USD", qty * price, 5, qty * price + 5, qty, random.choice(PRODUCTS), price, "Boulder",
+                         "CO", "US", FIRST_NAMES[c % 10], LAST_NAMES[c // 10 % 10], "", "Returning"])
+        seed_sheet("Customer_Insights_Data", headers, rows)
+        info["rows"] = n
+    with rec.stage("segment_customers") as info:
+        segments = segment_customers(load_customer_data())
+        save_to_sheets(segments)
+        info["segments"] = len(segments)
+    with rec.stage("summarize_insights"):
+        report = generate_insight_summary(load_segment_data())
+        save_report(report)
+    return {"customers": len(segments), "report_chars": len(report)}
+
+
+def run_finance(rec: Recorder, n: int, workdir: str):
+    import pandas as pd
+    from finance_agent.generate_financial_report import generate_financial_metrics
+    from finance_agent.summarize_financials import summarize_financials
+    path = os.path.join(workdir, "financial_data.csv")
+    with rec.stage("seed") as info:
+        revenue = [round(random.uniform(20, 200), 2) for _ in range(n)]
+        pd.DataFrame({
+            "date": [f"2025-{1 + i % 12:02d}-{1 + i % 28:02d}" for i in range(n)],
+            "order_id": range(1001, 1001 + n),
+            "customer_id": [f"C{100 + i % 5000}" for i in range(n)],
+            "revenue": revenue,
+            "cogs": [round(r * random.uniform(0.3, 0.4), 2) for r in revenue],
+            "ads": [round(r * random.uniform(0.05, 0.1), 2) for r in revenue],
+            "fulfillment": [round(random.uniform(1, 10), 2) for _ in range(n)],
+            "shipping": [round(random.uniform(1, 5), 2) for _ in range(n)],
+            "overhead": [round(random.uniform(1, 3), 2) for _ in range(n)],
+            "profit_margin": [round(random.uniform(0.3, 0.6), 2) for _ in range(n)],
+            "channel": [random.choice(CHANNELS) for _ in range(n)],
+        }).to_csv(path, index=False)
+        info["rows"] = n
+    with rec.stage("load_csv"):
+        df = pd.read_csv(path)
+    with rec.stage("financial_metrics") as info:
+        metrics = generate_financial_metrics(df)
+        summary = summarize_financials(df)
+        info["total_orders"] = metrics["Total Orders"]
+    return {"total_orders": metrics["Total Orders"], "summary_chars": len(summary)}
+
+
+def run_rag(rec: Recorder, n: int, workdir: str):
+    sys.path.append(os.path.join(ROOT, "support_agent"))
+    with rec.stage("faq_index"):
+        import rag_support_bot  # syncs the FAQ index into the empty temp Chroma DB on import
+
+    async def ask(question: str) -> int:
+        answer = ""
+        async for answer in rag_support_bot.generate_answer(question, []):
+            pass
+        return len(answer)
+
+    async def ask_all() -> list[int]:
+        lengths = await asyncio.gather(*(ask(f"{QUESTIONS[i % len(QUESTIONS)]} (#{i})") for i in range(n)))
+        while rag_support_bot._background:  # let the ticket writes finish inside the stage
+            await asyncio.sleep(0.01)
+        return lengths
+
+    with rec.stage("answers") as info:
+        lengths = asyncio.run(ask_all())
+        info["questions"] = n
+    return {"answers": sum(1 for length in lengths if length)}
+
+
+RUNNERS = {"marketing": run_marketing, "fulfillment": run_fulfillment, "insights": run_insights,
+           "finance": run_finance, "rag": run_rag}
+
+
+def child_main(pipeline: str, rows: int, out_path: str, workdir: str):
+    random.seed(rows)
+    started_rss = peak_rss_mb()
+    rec = Recorder()
+    output = RUNNERS[pipeline](rec, rows, workdir)
+    timed = [s for s in rec.stages if s["name"] != "seed"]
+    totals = {"sheets_calls": {}, "llm": {}}
+    for s in timed:
+        for key in totals:
+            for k, v in s[key].items():
+                totals[key][k] = totals[key].get(k, 0) + v
+    result = {
+        "status": "ok",
+        "wall_s": round(sum(s["seconds"] for s in timed), 3),
+        "setup_s": round(sum(s["seconds"] for s in rec.stages if s["name"] == "seed"), 3),
+        **totals,
+        "peak_rss_mb": peak_rss_mb(),
+        "startup_rss_mb": started_rss,
+        "stages": rec.stages,
+        "output": output,
+    }
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(result, f)
+
+
+# ------------------------------------------------------------
+# Parent side: stub server, one child per case, JSON report
+# ------------------------------------------------------------
+def run_case(pipeline: str, rows: int, args, stub_url: str) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        out_path = os.path.join(tmp, "result.json")
+        env = {
+            **os.environ,
+            "SHEETS_BACKEND": "memory",
+            "SHEETS_SPREADSHEET_NAME": "Benchmark",
+            "SHEETS_LATENCY_MS": str(args.sheets_latency_ms),
+            "SHEETS_REVISION_CHECK_SECONDS": "0",
+            "LLM_STUB": "1",
+            "LLM_STUB_URL": stub_url,
+            "LLM_CACHE_PATH": os.path.join(tmp, "llm_cache.sqlite"),
+            "LEAD_SCORING_STATE_PATH": os.path.join(tmp, "lead_scoring_state.json"),
+            "SCORING_RPM": str(args.scoring_rpm),
+            "CHROMADB_PATH": os.path.join(tmp, "chroma"),
+            "EMBEDDING_CACHE_PATH": os.path.join(tmp, "embeddings"),
+            "SUPPORT_TICKET_DIR": os.path.join(tmp, "tickets"),
+            "SUPPORT_ANSWER_CACHE": "0",
+            "SUPPORT_MAX_CONCURRENCY": str(args.concurrency),
+            "TEMPLATE_CONCURRENCY": str(args.concurrency),
+            "SCORING_CONCURRENCY": str(args.concurrency),
+        }
+        cmd = [sys.executable, os.path.abspath(__file__), "--child", pipeline, str(rows), out_path, tmp]
+        log_path = os.path.join(tmp, "child.log")
+        started = time.perf_counter()
+        with open(log_path, "w", encoding="utf-8") as log:
+            try:
+                proc = subprocess.run(cmd, cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+                                      timeout=args.timeout)
+                status = "ok" if proc.returncode == 0 and os.path.exists(out_path) else "error"
+            except subprocess.TimeoutExpired:
+                status = "timeout"
+        elapsed = round(time.perf_counter() - started, 3)
+        if status == "ok":
+            with open(out_path, encoding="utf-8") as f:
+                return json.load(f)
+        with open(log_path, encoding="utf-8", errors="replace") as f:
+            tail = f.read().splitlines()[-15:]
+        if status == "error" or args.verbose:
+            print("\n".join(f"      {line}" for line in tail))
+        return {"status": status, "wall_s": elapsed, "log_tail": tail}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=30).stdout.strip() or "unknown"
+    except Exception:
+        return "unknown"
+
+
+def compare(old_path: str, new_path: str):
+    with open(old_path, encoding="utf-8") as f:
+        old = {(r["pipeline"], r["rows"]): r for r in json.load(f)["results"]}
+    with open(new_path, encoding="utf-8") as f:
+        new = json.load(f)["results"]
+
+    def change(a, b):
+        if a is None or b is None:
+            return "     n/a"
+        return f"{(b - a) / a * 100:+7.1f}%" if a else f"{b - a:+8}"
+
+    print(f"{'pipeline':<12}{'rows':>8}  {'wall s':>19}  {'LLM requests':>19}  {'Sheets calls':>19}  {'peak RSS MB':>19}")
+    for r in new:
+        o = old.get((r["pipeline"], r["rows"]))
+        if not o or "ok" not in (o["status"], r["status"]):
+            continue
+        cols = [(o.get("wall_s"), r.get("wall_s")),
+                (o.get("llm", {}).get("requests"), r.get("llm", {}).get("requests")),
+                (o.get("sheets_calls", {}).get("total"), r.get("sheets_calls", {}).get("total")),
+                (o.get("peak_rss_mb"), r.get("peak_rss_mb"))]
+        print(f"{r['pipeline']:<12}{r['rows']:>8}  " + "  ".join(f"{b!s:>10} {change(a, b)}" for a, b in cols))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        _, _, pipeline, rows, out_path, workdir = sys.argv
+        child_main(pipeline, int(rows), out_path, workdir)
+        raise SystemExit(0)
+
+    parser = argparse.ArgumentParser(description="Benchmark the agent pipelines end to end")
+    parser.add_argument("--pipelines", nargs="+", choices=PIPELINES, default=PIPELINES)
+    parser.add_argument("--scales", type=int, nargs="+", default=DEFAULT_SCALES, help="rows per run (100 … 100000)")
+    parser.add_argument("--latency-ms", type=float, default=20, help="stub LLM time to first token")
+    parser.add_argument("--token-interval-ms", type=float, default=1, help="stub LLM delay per streamed token")
+    parser.add_argument("--sheets-latency-ms", type=float, default=50, help="delay per emulated Sheets call")
+    parser.add_argument("--concurrency", type=int, default=16, help="parallel LLM requests in the agents")
+    parser.add_argument("--scoring-rpm", type=float, default=60000, help="lead-scoring request budget per minute")
+    parser.add_argument("--timeout", type=float, default=900, help="seconds before a run is recorded as timeout")
+    parser.add_argument("--output", default=None, help="result JSON path (default benchmarks/results/…)")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="print changes between two result files")
+    parser.add_argument("--verbose", action="store_true", help="show the log tail of timed-out runs too")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        raise SystemExit(0)
+
+    from stub_openai_server import start_server
+    server, stub_url = start_server(latency_ms=args.latency_ms, token_interval_ms=args.token_interval_ms)
+    commit = git_commit()
+    print(f"🧪 Stub LLM at {stub_url} ({args.latency_ms:.0f} ms), Sheets emulator ({args.sheets_latency_ms:.0f} ms/call)")
+
+    results = []
+    for pipeline in args.pipelines:
+        for rows in sorted(args.scales):
+            print(f"⏱️  {pipeline:<12}{rows:>8} rows … ", end="", flush=True)
+            result = {"pipeline": pipeline, "rows": rows, **run_case(pipeline, rows, args, stub_url)}
+            results.append(result)
+            if result["status"] == "ok":
+                print(f"{result['wall_s']:8.2f}s  {result['llm'].get('requests', 0):>7} LLM req  "
+                      f"{result['llm'].get('prompt_tokens', 0) + result['llm'].get('completion_tokens', 0):>9} tok  "
+                      f"{result['sheets_calls'].get('total', 0):>4} Sheets calls  {result['peak_rss_mb']:7.1f} MB")
+            else:
+                print(f"{result['status']} after {result['wall_s']:.1f}s")
+    server.shutdown()
+
+    report = {
+        "meta": {
+            "commit": commit,
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "settings": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "verbose")},
+        },
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"{datetime.now():%Y%m%d-%H%M%S}-{commit}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, sort_keys=True, ensure_ascii=False)
+    print(f"📄 Results → {os.path.relpath(output, os.getcwd())}")
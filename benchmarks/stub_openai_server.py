@@ -0,0 +1,295 @@
+# benchmarks/stub_openai_server.py
+"""
+OpenAI-compatible stub for offline load tests.
+
+Serves `POST /v1/chat/completions` (plain and `stream=true` SSE),
+`POST /v1/embeddings` and `GET /v1/models` with deterministic content:
+- Lead-scoring prompts get a `SCORE: n | REASON: ...` reply. Packed prompts
+  get the same scores as a `{"scores": [...]}` JSON answer.
+- Outreach-template prompts get a subject line plus a short message.
+- Everything else gets a fixed support answer.
+- Embeddings are derived from a hash of the text.
+
+Timing is drawn from configurable distributions (seeded, so runs repeat):
+- time to first token: `--latency-ms` with `--latency-dist`
+  fixed|uniform|normal|lognormal|exponential and `--latency-jitter-ms`
+- generation speed: `--tokens-per-s` paces streamed tokens and adds
+  tokens/speed to non-streamed answers. Without it, streams send one token
+  per `--token-interval-ms` and plain answers return after the latency.
+
+Failures can be injected:
+- `--rpm` enforces a per-minute budget with `x-ratelimit-*-requests` headers,
+  and 429 + `retry-after` once it is spent
+- `--rate-limit-rate` / `--error-rate` return random 429s / 5xx (500, 502, 503)
+
+`GET /stats` returns request, error and token counts for benchmark reports.
+
+    python benchmarks/stub_openai_server.py --port 8089 --latency-ms 400 --error-rate 0.02
+    export LLM_STUB=1        # every agent (shared/llm_clients.py) now talks to the stub
+"""
+
+import re, sys, json, time, random, hashlib, argparse, threading
+from collections import Counter, deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ANSWER = ("Thanks for reaching out to Two Peaks Chai Co.! Our Founder's Ritual Sampler Box is a lovely "
+          "way to start, and refunds are accepted within 14 days of delivery. Enjoy your chai ritual!")
+
+
+def _embedding(text: str, dims: int) -> list[float]:
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [((digest[i % 32] + i) % 255) / 255 - 0.5 for i in range(dims)]
+
+
+def _stub_score(comment: str) -> int:
+    return 1 + hashlib.sha256(comment.encode("utf-8")).digest()[0] % 10
+
+
+def _score_reply(prompt: str) -> str | None:
+    packed = re.search(r"Comments \(JSON\):\s*(\[.*\])\s*Reply with JSON", prompt, re.S)
+    if packed:
+        items = json.loads(packed.group(1))
+        return json.dumps({"scores": [{"id": it["id"], "score": _stub_score(it["comment"]),
+                                       "reason": "Stub assessment of purchase intent."} for it in items]})
+    user = re.search(r"to user @(\S+)", prompt)
+    if user and "subject line" in prompt:
+        return (f"A Warm Cup of Thanks for {user.group(1)}\n\n"
+                f"Hi @{user.group(1)}, your comment made our kettle sing! Come explore the Founder's Ritual "
+                f"Sampler Box and find your next favourite Two Peaks blend.")
+    m = re.search(r'Comment:\s*"(.*?)"', prompt, re.S)
+    if "SCORE:" not in prompt or not m:
+        return None
+    return f"SCORE: {_stub_score(m.group(1))} | REASON: Stub assessment of purchase intent."
+
+
+class RateWindow:
+    """Sliding one-minute request window shared by all handler threads."""
+
+    def __init__(self, rpm: int):
+        self.rpm = rpm
+        self.sent = deque()
+        self.lock = threading.Lock()
+
+    def admit(self) -> tuple[bool, dict]:
+        with self.lock:
+            now = time.monotonic()
+            while self.sent and now - self.sent[0] >= 60:
+                self.sent.popleft()
+            allowed = len(self.sent) < self.rpm
+            if allowed:
+                self.sent.append(now)
+            reset = 60 - (now - self.sent[0]) if self.sent else 0
+            return allowed, {
+                "x-ratelimit-limit-requests": str(self.rpm),
+                "x-ratelimit-remaining-requests": str(self.rpm - len(self.sent)),
+                "x-ratelimit-reset-requests": f"{reset:.3f}s",
+            }
+
+
+class Profile:
+    """Seeded latency / throughput / failure sampling shared by all handler threads."""
+
+    def __init__(self, latency_ms: float = 400, latency_dist: str = "fixed", latency_jitter_ms: float = 0,
+                 tokens_per_s: float = 0, token_interval_ms: float = 10, error_rate: float = 0,
+                 rate_limit_rate: float = 0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.jitter_ms = latency_jitter_ms
+        self.tokens_per_s = tokens_per_s
+        self.token_interval_s = 1 / tokens_per_s if tokens_per_s else token_interval_ms / 1000
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = Counter()
+
+    def first_token_s(self) -> float:
+        mean, spread = self.latency_ms, self.jitter_ms
+        with self.lock:
+            if self.latency_dist == "uniform":
+                ms = self.rng.uniform(mean - spread, mean + spread)
+            elif self.latency_dist == "normal":
+                ms = self.rng.gauss(mean, spread)
+            elif self.latency_dist == "lognormal" and mean > 0:
+                sigma = (spread / mean) if spread else 0.5
+                ms = mean * self.rng.lognormvariate(-sigma * sigma / 2, sigma)   # keeps the mean
+            elif self.latency_dist == "exponential" and mean > 0:
+                ms = self.rng.expovariate(1 / mean)
+            else:
+                ms = mean
+        return max(0.0, ms) / 1000
+
+    def injected_failure(self) -> int | None:
+        """HTTP status to fail this request with, or None."""
+        with self.lock:
+            roll = self.rng.random()
+            if roll < self.rate_limit_rate:
+                return 429
+            if roll < self.rate_limit_rate + self.error_rate:
+                return self.rng.choice((500, 502, 503))
+        return None
+
+    def count(self, **values):
+        with self.lock:
+            self.stats.update(values)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    dims = 256
+    rate = None              # RateWindow when --rpm is set
+    profile = Profile()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.endswith("/models"):
+            return self._json({"object": "list", "data": [
+                {"id": m, "object": "model", "created": 0, "owned_by": "stub"}
+                for m in ("gpt-4o-mini", "gpt-4-turbo", "gpt-3.5-turbo", "text-embedding-3-small")]})
+        if self.path.rstrip("/").endswith("/stats"):
+            with self.profile.lock:
+                return self._json(dict(self.profile.stats))
+        self.send_error(404)
+
+    def _json(self, payload: dict, status: int = 200, headers: dict | None = None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _chunk(self, data: str):
+        raw = data.encode()
+        self.wfile.write(f"{len(raw):x}\r\n".encode() + raw + b"\r\n")
+        self.wfile.flush()
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        req = json.loads(self.rfile.read(length) or b"{}")
+        model = req.get("model", "stub")
+        kind = "embeddings" if self.path.endswith("/embeddings") else "chat"
+        self.profile.count(requests=1, **{f"{kind}_requests": 1})
+        limit_headers = {}
+        if self.rate:
+            allowed, limit_headers = self.rate.admit()
+            if not allowed:
+                self.profile.count(rate_limited=1)
+                return self._json({"error": {"message": "Rate limit reached (stub)", "type": "requests",
+                                             "code": "rate_limit_exceeded"}},
+                                  status=429, headers={**limit_headers, "retry-after": limit_headers[
+                                      "x-ratelimit-reset-requests"].rstrip("s")})
+        failure = self.profile.injected_failure()
+        if failure == 429:
+            self.profile.count(rate_limited=1)
+            return self._json({"error": {"message": "Injected rate limit (stub)", "type": "requests",
+                                         "code": "rate_limit_exceeded"}},
+                              status=429, headers={**limit_headers, "retry-after": "0.2"})
+        if failure:
+            self.profile.count(server_errors=1)
+            return self._json({"error": {"message": f"Injected {failure} (stub)", "type": "server_error"}},
+                              status=failure, headers=limit_headers)
+
+        if kind == "embeddings":
+            inputs = req.get("input", [])
+            inputs = [inputs] if isinstance(inputs, str) else inputs
+            time.sleep(self.profile.first_token_s() / 4)
+            self.profile.count(embedded_inputs=len(inputs),
+                               prompt_tokens=sum(len(str(t).split()) for t in inputs))
+            return self._json({
+                "object": "list", "model": model,
+                "data": [{"object": "embedding", "index": i, "embedding": _embedding(t, self.dims)}
+                         for i, t in enumerate(inputs)],
+                "usage": {"prompt_tokens": sum(len(t.split()) for t in inputs), "total_tokens": 0},
+            }, headers=limit_headers)
+
+        if not self.path.endswith("/chat/completions"):
+            self.send_error(404)
+            return
+
+        created = int(time.time())
+        prompt = "\n".join(str(m.get("content", "")) for m in req.get("messages", []))
+        answer = _score_reply(prompt) or ANSWER
+        words = answer.split(" ")
+        self.profile.count(prompt_tokens=len(prompt.split()), completion_tokens=len(words))
+        time.sleep(self.profile.first_token_s())
+        if not req.get("stream"):
+            if self.profile.tokens_per_s:
+                time.sleep(len(words) / self.profile.tokens_per_s)
+            return self._json({
+                "id": "chatcmpl-stub", "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": answer}}],
+                "usage": {"prompt_tokens": len(prompt.split()), "completion_tokens": len(answer.split()),
+                          "total_tokens": 0},
+            }, headers=limit_headers)
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        for k, v in limit_headers.items():
+            self.send_header(k, v)
+        self.end_headers()
+        for word in words:
+            event = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": created,
+                     "model": model, "choices": [{"index": 0, "delta": {"content": word + " "},
+                                                  "finish_reason": None}]}
+            self._chunk(f"data: {json.dumps(event)}\n\n")
+            time.sleep(self.profile.token_interval_s)
+        self._chunk("data: [DONE]\n\n")
+        self._chunk("")
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients dropping keep-alive connections mid-load-test is expected noise
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+def start_server(port: int = 0, latency_ms: float = 400, token_interval_ms: float = 10, dims: int = 256,
+                 rpm: int = 0, **profile_opts):
+    """
+    Start the stub in a daemon thread; returns (server, base_url).
+
+    `rpm=0` disables rate limiting. `profile_opts` go to `Profile`
+    (latency_dist, latency_jitter_ms, tokens_per_s, error_rate, rate_limit_rate, seed).
+    `server.profile.stats` holds the request/token counters.
+    """
+    profile = Profile(latency_ms=latency_ms, token_interval_ms=token_interval_ms, **profile_opts)
+    handler = type("ConfiguredStub", (StubHandler,), {
+        "dims": dims, "rate": RateWindow(rpm) if rpm else None, "profile": profile,
+    })
+    server = StubServer(("127.0.0.1", port), handler)
+    server.profile = profile
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/v1"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=400)
+    parser.add_argument("--token-interval-ms", type=float, default=10)
+    parser.add_argument("--latency-dist", default="fixed",
+                        choices=["fixed", "uniform", "normal", "lognormal", "exponential"])
+    parser.add_argument("--latency-jitter-ms", type=float, default=0, help="spread / std-dev of the latency")
+    parser.add_argument("--tokens-per-s", type=float, default=0, help="generation speed (overrides --token-interval-ms)")
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before 429s (0 = unlimited)")
+    parser.add_argument("--error-rate", type=float, default=0, help="share of requests failing with 500/502/503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0, help="share of requests failing with 429")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    server, url = start_server(args.port, args.latency_ms, args.token_interval_ms, rpm=args.rpm,
+                               latency_dist=args.latency_dist, latency_jitter_ms=args.latency_jitter_ms,
+                               tokens_per_s=args.tokens_per_s, error_rate=args.error_rate,
+                               rate_limit_rate=args.rate_limit_rate, seed=args.seed)
+    print(f"🧪 Stub OpenAI server on {url}")
+    print(f"   export LLM_STUB=1 LLM_STUB_URL={url}")
+    threading.Event().wait()
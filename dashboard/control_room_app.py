@@ -11,8 +11,6 @@ from dotenv import load_dotenv
 import random
 import time
 from datetime import datetime
-import gspread
-from google.oauth2.service_account import Credentials
 
 # Tabs & Agents
 from tabs.insights_tab import render_insights_tab
@@ -20,6 +18,9 @@ from tabs import finance_tab
 from tabs.finance_chat import finance_chat_interface
 from tabs.marketing_tab import render_marketing_tab
 from dashboard.tabs.render_human_review_tab import render_human_review_tab
+from shared.llm_cache import get_cache
+from shared.sheets_gateway import api_calls, reset_api_calls
+from shared.sheet_cache import get_sheet_cache
 
 # -----------------------------------
 # LOAD ENVIRONMENT VARIABLES
@@ -43,61 +44,20 @@ st.set_page_config(
 # -----------------------------------
 # GOOGLE SHEETS HELPERS (shared)
 # -----------------------------------
-SHEET_NAME = os.getenv("SHEETS_SPREADSHEET_NAME", "TwoPeaks_Marketing")
-SERVICE_ACCOUNT = os.getenv("GOOGLE_SVC_JSON", "service_account.json")
-
-def _gs_client():
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive",
-    ]
-    creds = Credentials.from_service_account_file(SERVICE_ACCOUNT, scopes=scopes)
-    return gspread.authorize(creds)
-
-def _get_ws(title: str):
-    """Return a worksheet by title, creating it with headers if needed."""
-    headers_map = {
-        "PostPurchase_Engagement_Log": ["timestamp","order_id","email","first_name","products","total","status","email_message_id"]
-    }
-    gc = _gs_client()
-    ss = gc.open(SHEET_NAME)
-    try:
-        ws = ss.worksheet(title)
-    except gspread.exceptions.WorksheetNotFound:
-        ws = ss.add_worksheet(title=title, rows="1000", cols=str(len(headers_map[title])+2))
-        ws.append_row(headers_map[title])
-    return ws
+HEADERS_MAP = {
+    "PostPurchase_Engagement_Log": ["timestamp","order_id","email","first_name","products","total","status","email_message_id"]
+}
 
 def _ws_df(title: str):
-    ws = _get_ws(title)
-    records = ws.get_all_records()
-    return pd.DataFrame(records)
+    """Worksheet records as a DataFrame, served from the snapshot cache unless the sheet changed."""
+    return get_sheet_cache().frame(title, headers=HEADERS_MAP.get(title))
 
 def _append_rows(title: str, rows: list[list]):
-    ws = _get_ws(title)
-    if rows:
-        ws.append_rows(rows, value_input_option="RAW")
+    get_sheet_cache().append_rows(title, rows, headers=HEADERS_MAP.get(title))
 
 def _update_status_by_order_ids(title: str, order_ids: list[str], new_status: str):
-    """Update 'status' for matching order_ids in the sheet."""
-    ws = _get_ws(title)
-    data = ws.get_all_values()
-    if not data:
-        return 0
-    headers = [h.strip().lower() for h in data[0]]
-    try:
-        id_idx = headers.index("order_id")
-        status_idx = headers.index("status")
-    except ValueError:
-        return 0
-    count = 0
-    # Build batch updates
-    for i, row in enumerate(data[1:], start=2):  # 1-based with header row
-        if len(row) > id_idx and row[id_idx] in set(order_ids):
-            # Update status cell
-            ws.update_cell(i, status_idx+1, new_status)
-            count += 1
-    return count
+    """Update 'status' for matching order_ids in one batch write; returns a per-ID report."""
+    return get_sheet_cache().update_status_by_order_ids(title, order_ids, new_status)
 
 def _generate_mock_orders(n: int = 10) -> pd.DataFrame:
     """Return a DataFrame of realistic mock Shopify orders."""
@@ -260,6 +220,8 @@ st.markdown("<hr>", unsafe_allow_html=True)
 # -----------------------------------
 # TAB LOGIC
 # -----------------------------------
+reset_api_calls()  # count Sheets requests made by this render only
+
 if choice == "🏠 Dashboard Overview":
     st.header("🏠 Overview Dashboard")
     st.write("A unified summary of all AI agents' key metrics.")
@@ -270,6 +232,15 @@ if choice == "🏠 Dashboard Overview":
         st.markdown("<div class='metric-card'><h3>Automations Today</h3><span>14</span></div>", unsafe_allow_html=True)
     with col3:
         st.markdown("<div class='metric-card'><h3>Avg Response Time</h3><span>2.1 s</span></div>", unsafe_allow_html=True)
+
+    # Shared LLM response cache (all agents write to the same SQLite file)
+    cache_stats = get_cache().stats()
+    st.markdown("#### 🧠 LLM Response Cache")
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Hit Rate", f"{cache_stats['hit_rate']:.0%}")
+    m2.metric("Calls Saved", cache_stats["hits"])
+    m3.metric("Cached Responses", cache_stats["entries"])
+    m4.metric("Evictions", cache_stats["evictions"])
     render_human_review_tab()
 
 # -------------------------------------------------
@@ -310,6 +281,14 @@ elif choice == "💬 Support Agent":
 # -----------------------------------
 # FOOTER
 # -----------------------------------
+calls = api_calls()
+st.sidebar.caption(
+    f"📡 Sheets API calls this render: {calls['total']} "
+    f"(read {calls.get('read', 0)} · write {calls.get('write', 0)} · "
+    f"metadata {calls.get('metadata', 0) + calls.get('drive', 0)})"
+)
+sheet_stats = get_sheet_cache().stats
+st.sidebar.caption(f"🗂️ Sheet snapshots: {sheet_stats['hits']} local reads · {sheet_stats['reloads']} reloads")
 st.markdown(
     "<br><center><small>© 2025 Two Peaks Chai Co. • Built with ❤️ & AI</small></center>",
     unsafe_allow_html=True
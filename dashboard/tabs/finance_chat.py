@@ -1,7 +1,7 @@
 import streamlit as st
 import pandas as pd
-from openai import OpenAI
 from dotenv import load_dotenv
+from shared.llm_clients import openai_client
 import os
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
@@ -11,7 +11,7 @@ import pickle
 # Setup
 # -----------------------------
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = openai_client()
 
 # Cache embeddings and vector store
 @st.cache_data(show_spinner=False)
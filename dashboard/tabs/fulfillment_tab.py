@@ -3,84 +3,46 @@ import streamlit as st
 import pandas as pd
 import random, os, time
 from datetime import datetime
-from google.oauth2.service_account import Credentials
-import gspread
 from dotenv import load_dotenv
+from shared.sheet_cache import get_sheet_cache
 
 # ------------------------------------------------------------
 # CONFIG
 # ------------------------------------------------------------
 load_dotenv()
-SHEET_NAME = os.getenv("SHEETS_SPREADSHEET_NAME", "TwoPeaks_Marketing")
-SERVICE_ACCOUNT = os.getenv("GOOGLE_SVC_JSON", "service_account.json")
 
 # ------------------------------------------------------------
 # GOOGLE SHEETS HELPERS
 # ------------------------------------------------------------
-def _gs_client():
-    scopes = [
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive",
+HEADERS_MAP = {
+    "PostPurchase_Engagement_Log": [
+        "timestamp", "order_id", "email", "first_name",
+        "products", "total", "status", "email_message_id"
+    ],
+    "Fulfillment_Templates": [
+        "timestamp", "order_id", "email", "first_name", "subject", "message", "status", "reviewed_by", "sent_at"
     ]
-    creds = Credentials.from_service_account_file(SERVICE_ACCOUNT, scopes=scopes)
-    return gspread.authorize(creds)
-
-def _get_ws(title: str):
-    """Return worksheet by title, creating with headers if needed."""
-    headers_map = {
-        "PostPurchase_Engagement_Log": [
-            "timestamp", "order_id", "email", "first_name",
-            "products", "total", "status", "email_message_id"
-        ],
-        "Fulfillment_Templates": [
-            "timestamp", "order_id", "email", "first_name", "subject", "message", "status", "reviewed_by", "sent_at"
-        ]
-    }
-    gc = _gs_client()
-    ss = gc.open(SHEET_NAME)
-    try:
-        ws = ss.worksheet(title)
-    except gspread.exceptions.WorksheetNotFound:
-        ws = ss.add_worksheet(title=title, rows="1000", cols=str(len(headers_map[title]) + 2))
-        ws.append_row(headers_map[title])
-    return ws
+}
 
 def _ws_df(title: str):
-    ws = _get_ws(title)
-    records = ws.get_all_records()
-    df = pd.DataFrame(records)
-    return df
+    """Worksheet records from the snapshot cache; re-read only when the spreadsheet changed."""
+    return get_sheet_cache().frame(title, headers=HEADERS_MAP.get(title))
 
 def _append_rows(title: str, rows: list[list]):
-    ws = _get_ws(title)
-    if rows:
-        ws.append_rows(rows, value_input_option="RAW")
+    get_sheet_cache().append_rows(title, rows, headers=HEADERS_MAP.get(title))
 
-def _update_status_by_order_ids(title: str, order_ids: list[str], new_status: str):
-    """Update 'status' for matching order_ids in the sheet."""
-    ws = _get_ws(title)
-    data = ws.get_all_values()
-    if not data:
-        return 0
-    headers = [h.strip().lower() for h in data[0]]
-    try:
-        id_idx = headers.index("order_id")
-        status_idx = headers.index("status")
-    except ValueError:
-        return 0
-    count = 0
-    for i, row in enumerate(data[1:], start=2):
-        if len(row) > id_idx and row[id_idx] in set(order_ids):
-            ws.update_cell(i, status_idx + 1, new_status)
-            count += 1
-    return count
+def _update_status_by_order_ids(title: str, order_ids: list[str], new_status: str, where: dict | None = None,
+                                **extra_columns):
+    """Update 'status' (and any extra columns) for matching order_ids in one batch write; returns a per-ID report."""
+    return get_sheet_cache().update_status_by_order_ids(title, order_ids, new_status, where=where, **extra_columns)
 
 # ------------------------------------------------------------
 # GPT Email Generation (Post-Purchase Fulfillment)
 # ------------------------------------------------------------
-from openai import OpenAI
+from shared.llm_cache import get_cache
+from shared.llm_clients import openai_client
 
-def _generate_postpurchase_email(first_name, products, video_url):
+def _generate_postpurchase_email(first_name, products, video_url, bypass_cache=False):
     prompt = f"""You are a friendly chai brand fulfillment agent. Write a warm, personalized post-purchase email for a customer named {first_name} who ordered: {products}.
 Requirements:
 - Thank them for their order and support.
@@ -98,18 +60,25 @@ Format:
 Subject: (short, friendly)
 Body: (plain text, 3-6 sentences, include video link and signature above)
 """
-    # Use OpenAI GPT (assumes API key in env var)
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    response = client.chat.completions.create(
-        model="gpt-3.5-turbo",
-        messages=[
-            {"role": "system", "content": "You are an expert in customer engagement for a chai DTC brand."},
-            {"role": "user", "content": prompt}
-        ],
-        max_tokens=400,
-        temperature=0.8,
-    )
-    text = response.choices[0].message.content
+    messages = [
+        {"role": "system", "content": "You are an expert in customer engagement for a chai DTC brand."},
+        {"role": "user", "content": prompt}
+    ]
+
+    def _complete():
+        # Use OpenAI GPT (assumes API key in env var)
+        client = openai_client()
+        response = client.chat.completions.create(
+            model="gpt-3.5-turbo",
+            messages=messages,
+            max_tokens=400,
+            temperature=0.8,
+        )
+        return response.choices[0].message.content
+
+    # Same customer + products -> same prompt; reuse the earlier draft unless a fresh one is requested
+    text = get_cache().get_or_create("gpt-3.5-turbo", 0.8, messages, _complete,
+                                     bypass=bypass_cache, max_tokens=400)
     # Split subject/body
     subject = ""
     message = ""
@@ -168,6 +137,7 @@ def render_fulfillment_tab():
 
     # --- Fulfillment Workflow Button ---
     st.markdown("#### Full Fulfillment Workflow")
+    fresh_copy = st.checkbox("✨ Write fresh copy (skip the LLM response cache)", value=False)
     workflow_btn = st.button("▶️ Run Fulfillment Workflow (Delivered Orders Only)")
     if workflow_btn:
         # (Optional) Generate mock orders if none
@@ -185,7 +155,7 @@ def render_fulfillment_tab():
         now = datetime.now()
         for _, row in to_generate.iterrows():
             subject, message = _generate_postpurchase_email(
-                row["first_name"], row["products"], video_url
+                row["first_name"], row["products"], video_url, bypass_cache=fresh_copy
             )
             rows.append([
                 now.strftime("%Y-%m-%d %H:%M:%S"),
@@ -220,7 +190,7 @@ def render_fulfillment_tab():
             now = datetime.now()
             for _, row in to_generate.iterrows():
                 subject, message = _generate_postpurchase_email(
-                    row["first_name"], row["products"], video_url
+                    row["first_name"], row["products"], video_url, bypass_cache=fresh_copy
                 )
                 rows.append([
                     now.strftime("%Y-%m-%d %H:%M:%S"),
@@ -242,6 +212,17 @@ def render_fulfillment_tab():
     df_templates = _ws_df("Fulfillment_Templates")
     review_df = df_templates[df_templates["status"].str.upper() == "QUEUED"] if not df_templates.empty else pd.DataFrame()
     if not review_df.empty:
+        if st.button(f"✅ Approve all {len(review_df)} queued emails"):
+            report = _update_status_by_order_ids(
+                "Fulfillment_Templates", review_df["order_id"].astype(str).tolist(), "APPROVED",
+                where={"status": "QUEUED"}, reviewed_by=os.getenv("USER", "HITL"),
+            )
+            updated = sum(r["result"] == "updated" for r in report.values())
+            missing = [oid for oid, r in report.items() if r["result"] == "not_found"]
+            st.success(f"Approved {updated} emails in one update.")
+            if missing:
+                st.warning(f"Not found in sheet: {', '.join(missing)}")
+            st.rerun()
         for idx, row in review_df.iterrows():
             with st.expander(f"Order {row['order_id']} — {row['first_name']} ({row['email']})"):
                 subject = st.text_input(
@@ -258,22 +239,14 @@ def render_fulfillment_tab():
                     "❌ Reject", key=f"reject_{row['order_id']}"
                 )
                 if approved or rejected:
-                    ws = _get_ws("Fulfillment_Templates")
-                    ws_all = ws.get_all_values()
-                    headers = [h.strip().lower() for h in ws_all[0]]
-                    oid_idx = headers.index("order_id")
-                    subj_idx = headers.index("subject")
-                    msg_idx = headers.index("message")
-                    status_idx = headers.index("status")
-                    reviewed_by_idx = headers.index("reviewed_by")
-                    # Find row to update
-                    for i, row_ws in enumerate(ws_all[1:], start=2):
-                        if len(row_ws) > oid_idx and row_ws[oid_idx] == row["order_id"]:
-                            ws.update_cell(i, subj_idx + 1, subject)
-                            ws.update_cell(i, msg_idx + 1, message)
-                            ws.update_cell(i, status_idx + 1, "APPROVED" if approved else "REJECTED")
-                            ws.update_cell(i, reviewed_by_idx + 1, os.getenv("USER", "HITL"))
-                            break
+                    # Subject, message, status and reviewer go out in a single batch write,
+                    # only on the QUEUED draft (older REJECTED/SENT rows for the order stay as they are)
+                    get_sheet_cache().update_rows_by_key("Fulfillment_Templates", "order_id", {str(row["order_id"]): {
+                        "subject": subject,
+                        "message": message,
+                        "status": "APPROVED" if approved else "REJECTED",
+                        "reviewed_by": os.getenv("USER", "HITL"),
+                    }}, where={"status": "QUEUED"})
                     st.success("Email template updated.")
                     st.rerun()
     else:
@@ -5,13 +5,11 @@
 # ============================================================
 
 import streamlit as st
-import gspread
 import pandas as pd
-from google.oauth2.service_account import Credentials
 import os
-import time
-import subprocess
 from dotenv import load_dotenv
+from shared.sheet_cache import get_sheet_cache
+from marketing_agent.pipeline import run_marketing_pipeline
 
 # ------------------------------------------------------------
 # CONFIG & SETUP
@@ -20,24 +18,12 @@ os.environ.pop("GOOGLE_APPLICATION_CREDENTIALS", None)
 os.environ.pop("GSPREAD_OAUTH_CREDENTIALS_PATH", None)
 os.environ.pop("GSPREAD_CREDENTIALS_FILENAME", None)
 
-SHEET_NAME = os.getenv("SHEETS_SPREADSHEET_NAME", "TwoPeaks_Marketing")
-SERVICE_ACCOUNT = os.getenv("GOOGLE_SVC_JSON", "service_account.json")
-
 # ------------------------------------------------------------
 # Helper — Fetch Google Sheet Data
 # ------------------------------------------------------------
 def get_sheet_data(sheet_name):
     try:
-        SCOPES = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive",
-        ]
-        creds = Credentials.from_service_account_file(SERVICE_ACCOUNT, scopes=SCOPES)
-        client = gspread.authorize(creds)
-        sheet = client.open(SHEET_NAME)
-        worksheet = sheet.worksheet(sheet_name)
-        data = worksheet.get_all_records()
-        return pd.DataFrame(data)
+        return get_sheet_cache().frame(sheet_name)
     except Exception as e:
         st.error(f"❌ Error fetching data from {sheet_name}: {e}")
         return pd.DataFrame()
@@ -45,98 +31,77 @@ def get_sheet_data(sheet_name):
 # ------------------------------------------------------------
 # Full Marketing Workflow (Autonomous)
 # ------------------------------------------------------------
-def run_marketing_workflow():
-    try:
-        with st.spinner("🚀 Running full Marketing Automation pipeline..."):
-            # ------------------------------------------------------------
-            # 0️⃣ Setup paths & environment
-            # ------------------------------------------------------------
-            base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
-            agent_dir = os.path.join(base_path, "marketing_agent")
-            env_path = os.path.join(base_path, ".env")
-
-            # ✅ Load environment variables (for Sheets + service account)
-            if os.path.exists(env_path):
-                load_dotenv(env_path, override=True)
-                st.info(f"✅ Environment variables loaded from {env_path}")
-            else:
-                st.warning("⚠️ .env file not found — subprocesses may fail.")
-
-            # ------------------------------------------------------------
-            # 1️⃣ Simulated cross-platform engagement fetch
-            # ------------------------------------------------------------
-            st.toast("📡 Simulating cross-platform engagement fetch...")
-            time.sleep(0.6)
-            st.write("🔒 Authenticating with Instagram API (simulated)...")
-            time.sleep(0.4)
-            st.write("🔒 Authenticating with LinkedIn API (simulated)...")
-            time.sleep(0.4)
-            st.write("✅ Auth OK — requesting recent comments and likes...")
-            time.sleep(0.6)
-            st.write("⬇️  Received 5 new engagement rows (total 5)")
-            time.sleep(0.3)
-            st.write("✨ Finished simulated API sync — inserting into sheet...")
-
-            # ------------------------------------------------------------
-            # 2️⃣ Generate fake engagement data
-            # ------------------------------------------------------------
-            st.toast("📸 Generating engagement data...")
-            add_cmd = ["python", f"{agent_dir}/add_fake_engagement.py"]
-            result1 = subprocess.run(add_cmd, capture_output=True, text=True, env=os.environ.copy())
-            st.code(result1.stdout or result1.stderr)
-            if result1.returncode == 0:
-                st.success("✅ Engagement data added successfully.")
-            else:
-                st.error("❌ Engagement data script failed.")
-                st.stop()
-
-            # ------------------------------------------------------------
-            # 3️⃣ Run lead scoring agent
-            # ------------------------------------------------------------
-            st.toast("🧠 Running lead scoring agent...")
-            lead_cmd = ["python", f"{agent_dir}/lead_scoring.py"]
-            result2 = subprocess.run(lead_cmd, capture_output=True, text=True, env=os.environ.copy())
-            st.code(result2.stdout or result2.stderr)
-            if result2.returncode == 0:
-                st.success("✅ Lead scoring complete — Qualified_Leads updated.")
-            else:
-                st.error("❌ Lead scoring failed.")
-                st.stop()
-
-            # ------------------------------------------------------------
-            # 4️⃣ Generate personalized marketing templates
-            # ------------------------------------------------------------
-            st.toast("✉️ Creating marketing templates...")
-            tpl_cmd = ["python", f"{agent_dir}/template_generator.py"]
-            result3 = subprocess.run(tpl_cmd, capture_output=True, text=True, env=os.environ.copy())
-            st.code(result3.stdout or result3.stderr)
-            if result3.returncode == 0:
-                st.success("✅ Templates generated — Marketing_Templates updated (QUEUED).")
-            else:
-                st.error("❌ Template generation failed.")
-                st.stop()
-
-            # ------------------------------------------------------------
-            # 5️⃣ Simulated n8n Heartbeat (UI only)
-            # ------------------------------------------------------------
-            st.info("🌐 Simulating sync with n8n marketing pipeline...")
-            time.sleep(0.6)
-            st.success("✅ [Simulated] n8n heartbeat acknowledged — all agents in sync.")
-
-            # ------------------------------------------------------------
-            # 6️⃣ Refresh dashboard
-            # ------------------------------------------------------------
-            st.toast("🔄 Refreshing dashboard view...")
-            time.sleep(3)
-            # Use modern rerun function
-            if hasattr(st, "rerun"):
-                st.rerun()
-            else:
-                # Backward compatibility for older Streamlit versions
-                st.experimental_rerun()
+STAGE_LABELS = {
+    "engagement": "📸 Engagement capture",
+    "scoring": "🧠 Lead scoring",
+    "templates": "✉️ Outreach templates",
+}
+
+def _stage_line(event: dict) -> str:
+    label = STAGE_LABELS.get(event["stage"], event["stage"])
+    if event["event"] == "stage_failed":
+        return f"❌ **{label}** — failed after {event['seconds']:.1f}s: {event['error']}"
+    counts = " · ".join(f"{k.replace('_', ' ')} {v}" for k, v in event["counts"].items())
+    return f"✅ **{label}** — {event['seconds']:.1f}s · {counts}"
+
+def _live_event_renderer(container):
+    """Pipeline event listener: one title, progress bar and latest message per stage, updated in place."""
+    stages = {}
+
+    def render(event):
+        kind, name = event["event"], event.get("stage")
+        if kind == "stage_started":
+            box = container.container()
+            stages[name] = {"title": box.empty(), "bar": box.progress(0.0), "note": box.empty()}
+            stages[name]["title"].markdown(f"⏳ **{STAGE_LABELS.get(name, name)}** — running…")
+        elif kind == "progress":
+            ui = stages[name]
+            if event.get("total"):
+                ui["bar"].progress(min(1.0, event["done"] / event["total"]), text=f"{event['done']}/{event['total']}")
+            if event.get("message"):
+                ui["note"].caption(event["message"])
+        elif kind in ("stage_finished", "stage_failed"):
+            ui = stages[name]
+            if kind == "stage_finished":
+                ui["bar"].progress(1.0)
+            ui["title"].markdown(_stage_line(event))
+
+    return render
 
-    except Exception as e:
-        st.error(f"❌ Marketing workflow error: {e}")
+def run_marketing_workflow():
+    # ✅ Load environment variables (for Sheets + service account)
+    base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+    env_path = os.path.join(base_path, ".env")
+    if os.path.exists(env_path):
+        load_dotenv(env_path, override=True)
+    else:
+        st.warning("⚠️ .env file not found — using the current environment.")
+
+    # Engagement → lead scoring → templates, rendered live from the pipeline's events
+    with st.status("🚀 Running full Marketing Automation pipeline...", expanded=True) as status:
+        try:
+            result = run_marketing_pipeline(n_engagement=5, on_event=_live_event_renderer(status))
+        except Exception as e:
+            status.update(label="❌ Marketing pipeline failed", state="error")
+            st.error(f"❌ Marketing workflow error: {e}")
+            return
+        status.update(label=f"✅ Marketing pipeline finished in {result['events'][-1]['seconds']:.1f}s",
+                      state="complete")
+
+    # The stages wrote to Sheets directly; drop the dashboard's snapshots and refresh right away
+    get_sheet_cache().invalidate()
+    st.session_state["marketing_last_run"] = result["events"]
+    st.rerun()
+
+def render_last_run(events: list[dict] | None):
+    """Summary of the previous pipeline run (kept across the rerun that refreshes the metrics)."""
+    if not events:
+        return
+    done = events[-1]
+    with st.expander(f"🧾 Last pipeline run — {done['seconds']:.1f}s", expanded=True):
+        for event in events:
+            if event["event"] in ("stage_finished", "stage_failed"):
+                st.markdown(_stage_line(event))
 
 # ------------------------------------------------------------
 # Render Marketing Agent Tab
@@ -157,4 +122,5 @@ def render_marketing_tab():
 
     st.markdown("###")
     if st.button("▶️ Call Maketing AI Agent (End-to-End)"):
-        run_marketing_workflow()
\ No newline at end of file
+        run_marketing_workflow()
+    render_last_run(st.session_state.get("marketing_last_run"))
\ No newline at end of file
@@ -1,9 +1,8 @@
 import streamlit as st
 import os
 import pandas as pd
-import gspread
-from google.oauth2.service_account import Credentials
 from dotenv import load_dotenv
+from shared.sheet_cache import get_sheet_cache
 
 load_dotenv()
 
@@ -32,23 +31,13 @@ def render_human_review_tab():
     else:
         st.session_state.refresh_flag += 1
 
-    # Clear cache so latest data always loads when tab is reopened
-    st.cache_data.clear()
-
     if not hasattr(st, "rerun"):
         st.rerun = st.experimental_rerun
 
     try:
-        # ---- Google Sheets Connection ----
-        SCOPES = [
-            "https://www.googleapis.com/auth/spreadsheets",
-            "https://www.googleapis.com/auth/drive",
-        ]
-        creds = Credentials.from_service_account_file(SERVICE_ACCOUNT, scopes=SCOPES)
-        client = gspread.authorize(creds)
-        sheet = client.open(SHEET_NAME)
-        tpl_ws = sheet.worksheet("Marketing_Templates")
-        templates_df = pd.DataFrame(tpl_ws.get_all_records())
+        # ---- Google Sheets (snapshot reloads only when the spreadsheet changed) ----
+        sheet_cache = get_sheet_cache()
+        templates_df = sheet_cache.frame("Marketing_Templates")
 
         # ---- Diagnostics ----
         st.caption(f"📊 Loaded {len(templates_df)} templates from Google Sheets.")
@@ -77,6 +66,7 @@ def render_human_review_tab():
 
             # ---- Refresh ----
             if st.button("🔄 Refresh Queue"):
+                sheet_cache.invalidate("Marketing_Templates")
                 st.rerun()
 
             # ---- Show Results ----
@@ -98,28 +88,16 @@ def render_human_review_tab():
 
                         c1, c2 = st.columns([1, 1])
                         if c1.button("✅ Approve & Send", key=f"approve_{idx}"):
-                            tpl_ws.update_cell(
-                                idx + 2, templates_df.columns.get_loc("subject") + 1, subject
-                            )
-                            tpl_ws.update_cell(
-                                idx + 2, templates_df.columns.get_loc("message") + 1, message
-                            )
-                            tpl_ws.update_cell(
-                                idx + 2,
-                                templates_df.columns.get_loc("status") + 1,
-                                "APPROVED",
-                            )
+                            sheet_cache.update_row("Marketing_Templates", idx + 2, {
+                                "subject": subject, "message": message, "status": "APPROVED",
+                            })
                             st.success(
                                 f"Approved ✅ @{row['username']} — Gmail automation will send shortly."
                             )
                             st.rerun()
 
                         if c2.button("🗑️ Reject", key=f"reject_{idx}"):
-                            tpl_ws.update_cell(
-                                idx + 2,
-                                templates_df.columns.get_loc("status") + 1,
-                                "REJECTED",
-                            )
+                            sheet_cache.update_row("Marketing_Templates", idx + 2, {"status": "REJECTED"})
                             st.warning(f"Rejected ❌ @{row['username']} removed from queue.")
                             st.rerun()
 
@@ -1,13 +1,14 @@
 # dashboard/tabs/support_tab.py
 import os, json, re, time
-from collections import Counter, deque
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
-from openai import OpenAI
-from support_agent.support_shared import load_tickets
+from shared.llm_clients import openai_client
+from support_agent.ticket_analytics import get_analytics
+from support_agent.owner_context import build_owner_context
 
 # ---------------------------------------------------------
 # AUTO REFRESH (every 10 seconds)
@@ -18,33 +19,18 @@ if hasattr(st, "autorefresh"):
 # ---------------------------------------------------------
 # HELPER FUNCTIONS
 # ---------------------------------------------------------
-def _extract_keywords(text: str):
-    stop = {
-        "the","and","a","to","of","in","is","on","for","or","it","my","are","with","can","you","your",
-        "how","what","who","when","where","why","which","about","from","this","that","our","me","do",
-        "we","an","if","will","order","orders","help"
-    }
-    words = re.findall(r"\b\w+\b", (text or "").lower())
-    return [w for w in words if w not in stop and len(w) > 2]
-
-def _topic_dataframe(tickets):
-    counter = Counter()
-    for t in tickets:
-        counter.update(_extract_keywords(t.get("user_query","")))
-    top = counter.most_common(5)
+def _topic_dataframe(analytics):
+    top = analytics.top_keywords(5)
     if not top:
         top = [("Shipping",18), ("Status",10), ("Refunds",7), ("Product",4), ("Payment",3)]
     df = pd.DataFrame(top, columns=["Topic","Tickets"])
     df["Topic"] = df["Topic"].str.title()
     return df
 
-def _recent_items(tickets, n=3):
-    return tickets[-n:] if tickets else []
-
 # ---------------------------------------------------------
 # OPENAI CLIENT
 # ---------------------------------------------------------
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+client = openai_client()
 MODEL = "gpt-4-turbo"
 
 # ---------------------------------------------------------
@@ -54,11 +40,14 @@ def show():
     st.markdown("<h2 style='color:#3A4D39;'>💼 Support Command Center (Owner View)</h2>", unsafe_allow_html=True)
     st.caption("Monitor sentiment, trends, and customer requests in real time. Ask your AI assistant for insights, summaries, and next steps.")
 
-    # Load ticket data
-    tickets = load_tickets()
-    total = len(tickets)
-    topic_df = _topic_dataframe(tickets)
-    recent = _recent_items(tickets, 3)
+    # Load ticket aggregates (only tickets added since the last rerun are read)
+    analytics = get_analytics()
+    analytics.refresh()
+    total = analytics.total
+    topic_df = _topic_dataframe(analytics)
+    recent = analytics.recent(3)
+    avg_total = analytics.avg_latency("total_ms")
+    avg_ttft = analytics.avg_latency("ttft_ms")
 
     # Layout
     col_analytics, col_chatbot = st.columns([1, 2], gap="large")
@@ -76,7 +65,9 @@ def show():
         with col1:
             st.markdown(f"<div style='font-size:1.7em;font-weight:700;color:#b99746;'>{total}</div><div style='font-size:0.96em;color:#3A4D39;'>Tickets</div>", unsafe_allow_html=True)
         with col2:
-            st.markdown("<div style='font-size:1.7em;font-weight:700;color:#b99746;'>—</div><div style='font-size:0.96em;color:#3A4D39;'>Avg. Response Time</div>", unsafe_allow_html=True)
+            avg_label = f"{avg_total / 1000:.1f}s" if avg_total is not None else "—"
+            ttft_label = f"first token {avg_ttft / 1000:.1f}s" if avg_ttft is not None else ""
+            st.markdown(f"<div style='font-size:1.7em;font-weight:700;color:#b99746;'>{avg_label}</div><div style='font-size:0.96em;color:#3A4D39;'>Avg. Response Time</div><div style='font-size:0.8em;color:#3A4D39;'>{ttft_label}</div>", unsafe_allow_html=True)
         with col3:
             top_topic = topic_df.iloc[0]["Topic"] if not topic_df.empty else "—"
             st.markdown(f"<div style='font-size:1.7em;font-weight:700;color:#b99746;'>{top_topic}</div><div style='font-size:0.96em;color:#3A4D39;'>Top Topic</div>", unsafe_allow_html=True)
@@ -92,6 +83,11 @@ def show():
         plt.tight_layout()
         st.pyplot(fig)
 
+        daily = analytics.daily_volume(14)
+        if daily:
+            st.markdown("<div style='color:#3A4D39;font-weight:600;margin-top:0.6rem;'>Tickets per Day</div>", unsafe_allow_html=True)
+            st.bar_chart(pd.DataFrame(daily, columns=["Day","Tickets"]).set_index("Day"), color="#b99746", height=140)
+
         st.markdown("<div style='color:#3A4D39;font-weight:600;margin-top:0.6rem;'>Recent Tickets</div>", unsafe_allow_html=True)
         if recent:
             for t in recent:
@@ -188,10 +184,8 @@ def show():
                     status = order_statuses[found_id]
                     answer = f"Order **{found_id}** status: <span style='color:#3A4D39;font-weight:700'>{status}</span>."
 
-            # Build context summary
-            context = ""
-            for t in tickets[-10:]:
-                context += f"- {t.get('timestamp','')}: {t.get('user_query','')}\n"
+            # Build context summary (rolled-up daily/weekly aggregates within a fixed token budget)
+            context = build_owner_context(query, analytics)
 
             # If no order match, fall back to OpenAI completion
             if not answer:
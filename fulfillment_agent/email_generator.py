@@ -2,41 +2,32 @@
 # ------------------------------------------------------------
 # Two Peaks – Fulfillment Email Generator (GPT-personalized)
 # ------------------------------------------------------------
-import os, time
+import os, sys, time
+import argparse
 import pandas as pd
-import gspread
 from dotenv import load_dotenv
-from google.oauth2.service_account import Credentials
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from shared.llm_cache import cached_invoke
+from shared.llm_clients import chat_model
+from shared.sheets_gateway import get_gateway
+
 # ------------------------------------------------------------
 # ENV + SHEETS CONFIG
 # ------------------------------------------------------------
 load_dotenv()
-SHEET_NAME = os.getenv("SHEETS_SPREADSHEET_NAME", "TwoPeaks_Marketing")
-SERVICE_JSON = os.getenv("GOOGLE_SVC_JSON", "service_account.json")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-
-SCOPES = [
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive"
-]
-
-creds = Credentials.from_service_account_file(SERVICE_JSON, scopes=SCOPES)
-gc = gspread.authorize(creds)
-ss = gc.open(SHEET_NAME)
+parser = argparse.ArgumentParser(description="Generate thank-you emails for shipped orders")
+parser.add_argument("--regenerate", action="store_true", help="write fresh copy instead of reusing cached drafts")
+args = parser.parse_args()
 
 # ------------------------------------------------------------
-# Source + Destination Sheets
+# Source + Destination Sheets (Google Sheets or the local SHEETS_BACKEND)
 # ------------------------------------------------------------
-src_ws = ss.worksheet("PostPurchase_Engagement_Log")
-
-try:
-    dest_ws = ss.worksheet("Fulfillment_Templates")
-except gspread.exceptions.WorksheetNotFound:
-    dest_ws = ss.add_worksheet(title="Fulfillment_Templates", rows="500", cols="7")
-    dest_ws.append_row(["timestamp", "order_id", "first_name", "email", "subject", "message", "status"])
+sheets = get_gateway()
+src_ws = sheets.worksheet("PostPurchase_Engagement_Log")
+dest_ws = sheets.worksheet("Fulfillment_Templates",
+                           headers=["timestamp", "order_id", "first_name", "email", "subject", "message", "status"])
 
 # ------------------------------------------------------------
 # Load shipped orders
@@ -51,7 +42,7 @@ if shipped.empty:
 # ------------------------------------------------------------
 # LLM Setup
 # ------------------------------------------------------------
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.7, api_key=OPENAI_API_KEY)
+llm = chat_model("gpt-4o-mini", temperature=0.7)
 
 prompt = PromptTemplate.from_template("""
 You are a warm, grateful brand founder writing a personalized thank-you email
@@ -80,7 +71,7 @@ Message: <personalized body text>
 rows = []
 for _, r in shipped.iterrows():
     text = prompt.format(first_name=r["first_name"], product=r["products"])
-    response = llm.invoke(text).content
+    response = cached_invoke(llm, text, bypass=args.regenerate)
 
     subject = "Your chai is on its way ☕️"
     message = response.strip()
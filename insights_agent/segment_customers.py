@@ -1,16 +1,12 @@
 
 import pandas as pd
 from datetime import datetime, timezone
-import gspread
 
-def load_customer_data():
-    import pandas as pd
-    import gspread
+from shared.sheets_gateway import get_gateway
 
+def load_customer_data():
     try:
-        gc = gspread.service_account(filename="service_account.json")
-        sh = gc.open("TwoPeaks_Marketing")
-        ws = sh.worksheet("Customer_Insights_Data")
+        ws = get_gateway().worksheet("Customer_Insights_Data")
         data = ws.get_all_records()
 
         if not data:
@@ -104,14 +100,7 @@ def save_to_sheets(df: pd.DataFrame, worksheet_name="Customer_Segments"):
         df (pd.DataFrame): Segmented customer DataFrame.
         worksheet_name (str): Name of the worksheet/tab to write to.
     """
-    gc = gspread.service_account(filename="service_account.json")
-    ss = gc.open("TwoPeaks_Marketing")
-    try:
-        ws_old = ss.worksheet(worksheet_name)
-        ss.del_worksheet(ws_old)
-    except Exception:
-        pass
-    ws_new = ss.add_worksheet(title=worksheet_name, rows=100, cols=10)
+    ws_new = get_gateway().replace_worksheet(worksheet_name, rows=100, cols=10)
     df_copy = df.copy()
     if "last_order" in df_copy.columns:
         # Convert datetimes to string for upload
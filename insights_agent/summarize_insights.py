@@ -5,18 +5,18 @@ for Two Peaks Chai Co. using GPT-4o-mini and Google Sheets.
 
 import os
 import pandas as pd
-import gspread
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 
+from shared.llm_cache import cached_invoke
+from shared.llm_clients import chat_model
+from shared.sheets_gateway import get_gateway
+
 # ------------------------------------------------------------
 # ENVIRONMENT & GLOBAL CONFIG
 # ------------------------------------------------------------
 load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY", "")
-SHEET_NAME = "TwoPeaks_Marketing"
 
 # ------------------------------------------------------------
 # 1️⃣ LOAD CUSTOMER SEGMENT DATA
@@ -29,9 +29,7 @@ def load_segment_data():
         pd.DataFrame: Clean DataFrame of customer segments.
     """
     try:
-        gc = gspread.service_account(filename="service_account.json")
-        ss = gc.open(SHEET_NAME)
-        seg_ws = ss.worksheet("Customer_Segments")
+        seg_ws = get_gateway().worksheet("Customer_Segments")
         seg_df = pd.DataFrame(seg_ws.get_all_records())
         return seg_df
     except Exception as e:
@@ -41,19 +39,20 @@ def load_segment_data():
 # ------------------------------------------------------------
 # 2️⃣ GENERATE INSIGHT SUMMARY (GPT-4o-mini)
 # ------------------------------------------------------------
-def generate_insight_summary(segment_df):
+def generate_insight_summary(segment_df, bypass_cache=False):
     """
     Generates a marketing insights report using GPT-4o-mini based on segment data.
     For Two Peaks Chai Co. brand context.
     Args:
         segment_df (pd.DataFrame): DataFrame containing customer segment data.
+        bypass_cache (bool): Skip the cached report for this snapshot and write a fresh one.
     Returns:
         str: AI-generated marketing insights report text.
     """
     if segment_df.empty:
         return "⚠️ No customer data available to generate insights."
 
-    llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.4, api_key=OPENAI_API_KEY)
+    llm = chat_model("gpt-4o-mini", temperature=0.4)
     parser = StrOutputParser()
 
     prompt_text = """
@@ -77,9 +76,8 @@ End with a one-line summary headline.
     ].head(20).to_string(index=False)
 
     final_prompt = prompt.format(segment_table=segment_table)
-    response = llm.invoke(final_prompt)
-
-    response_text = getattr(response, "content", str(response))
+    # Same segment snapshot -> same prompt; reuse the cached report
+    response_text = cached_invoke(llm, final_prompt, bypass=bypass_cache)
     return response_text.strip()
 
 # ------------------------------------------------------------
@@ -94,17 +92,8 @@ def save_to_sheets(report_text, worksheet_name="Insights_Report"):
         worksheet_name (str): The worksheet/tab name (default: "Insights_Report").
     """
     try:
-        gc = gspread.service_account(filename="service_account.json")
-        ss = gc.open(SHEET_NAME)
-
-        # Delete if exists
-        try:
-            ws_old = ss.worksheet(worksheet_name)
-            ss.del_worksheet(ws_old)
-        except Exception:
-            pass
-
-        ws_new = ss.add_worksheet(title=worksheet_name, rows=100, cols=1)
+        # Recreate the tab so only the latest report is kept
+        ws_new = get_gateway().replace_worksheet(worksheet_name, rows=100, cols=1)
         ws_new.update([["Generated Report"], [report_text]])
         print(f"✅ Report saved successfully to '{worksheet_name}' tab.")
 
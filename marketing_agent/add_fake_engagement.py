@@ -2,26 +2,17 @@
 import random
 from datetime import datetime
 from zoneinfo import ZoneInfo
-import gspread
-import os, requests, time
+import os, re, sys, requests
+import pandas as pd
 
-# --- Sheets auth (service_account.json must be in project root) ---
-gc = gspread.service_account(filename="service_account.json")
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-# Open sheet/tab
-ss = gc.open("TwoPeaks_Marketing")
-ws = ss.worksheet("Instagram_Engagement_Raw")
+from shared.pipeline_events import print_progress
+from shared.sheets_gateway import get_gateway
 
-# Safety: verify headers are exactly 5 and in order
+# --- Sheets (Google via service_account.json, or the local SHEETS_BACKEND) ---
+RAW_SHEET = "Instagram_Engagement_Raw"
 expected_headers = ["timestamp", "username", "comment", "likes", "followers"]
-headers = ws.row_values(1)
-if [h.strip().lower() for h in headers[:5]] != expected_headers:
-    raise RuntimeError(
-        f"Header mismatch.\nExpected: {expected_headers}\nFound: {headers[:5]}"
-    )
-
-# Build a uniqueness set from existing usernames (col B)
-existing_usernames = set([u for u in ws.col_values(2)[1:] if u.strip()])
 
 # Pools
 comment_pool = [
@@ -45,32 +36,28 @@ PLATFORMS = [
     "linkedin",
 ]
 
-def simulate_fetch(platform=None, n=5):
-    """Prints a friendly simulated fetch progress so callers (and Streamlit) see
-    a believable API flow without actually calling external services.
-    This output is printed to stdout and will be captured by the parent app.
+def simulate_fetch(platform=None, n=5, progress=print_progress):
+    """Reports a simulated fetch from a social platform (no external calls).
+
+    The steps go to `progress` as they happen; there are no artificial
+    delays, so callers (and Streamlit) show real timing.
     """
     if platform is None:
         platform = random.choice(PLATFORMS)
 
-    print(f"📡 Simulating fetch from {platform} engagement API...")
-    time.sleep(0.6)
-    print("🔒 Authenticating (simulated)...")
-    time.sleep(0.4)
-    print("✅ Auth OK — requesting recent comments and likes")
-    time.sleep(0.6)
+    progress(f"📡 Simulating fetch from {platform} engagement API...")
 
     # Simulate pagination / streaming fetch
     fetched = 0
     for i in range(n):
         chunk = random.randint(1, 3)
         fetched += chunk
-        print(f"⬇️  Received {chunk} new engagement rows (total {fetched})")
-        time.sleep(0.35)
+        progress(f"⬇️  Received {chunk} new engagement rows (total {fetched})", done=i + 1, total=n)
 
-    print(f"✨ Finished simulated fetch from {platform}: {fetched} items ready to insert into sheet.")
+    progress(f"✨ Finished simulated fetch from {platform}: {fetched} items ready to insert into sheet.")
+    return fetched
 
-def unique_username():
+def unique_username(existing_usernames: set):
     # Try base+random until unique
     for _ in range(1000):
         handle = random.choice(base_handles)
@@ -85,21 +72,46 @@ def unique_username():
 def iso_mountain():
     return datetime.now(ZoneInfo("America/Denver")).isoformat(timespec="seconds")
 
-def add_rows(n=5):
+def add_engagement(n=5, sheets=None, progress=print_progress) -> pd.DataFrame:
+    """
+    Append `n` fake engagement rows to Instagram_Engagement_Raw and return them.
+
+    The header check and the username set come from one `batch_get`. The
+    returned DataFrame has the sheet columns plus `sheet_row` (1-based row
+    each record landed on, or None if the API did not report it), so the
+    scoring stage can take the rows without reading the sheet again.
+    """
+    ws = (sheets or get_gateway()).worksheet(RAW_SHEET, headers=expected_headers)
+
+    # Safety: verify headers are exactly 5 and in order
+    header, usernames = ws.batch_get(["1:1", "B2:B"])
+    headers = header[0] if header else []
+    if [h.strip().lower() for h in headers[:5]] != expected_headers:
+        raise RuntimeError(
+            f"Header mismatch.\nExpected: {expected_headers}\nFound: {headers[:5]}"
+        )
+    # Build a uniqueness set from existing usernames (col B)
+    existing_usernames = {row[0] for row in usernames if row and row[0].strip()}
+
     rows = []
     for _ in range(n):
         row = [
-            iso_mountain(),                   # timestamp (A)
-            unique_username(),                # username  (B)
-            random.choice(comment_pool),      # comment   (C)
-            random.randint(10, 100),          # likes     (D)
-            random.randint(500, 5000),        # followers (E)
+            iso_mountain(),                          # timestamp (A)
+            unique_username(existing_usernames),     # username  (B)
+            random.choice(comment_pool),             # comment   (C)
+            random.randint(10, 100),                 # likes     (D)
+            random.randint(500, 5000),               # followers (E)
         ]
         rows.append(row)
     # Single batch append = faster, less error-prone
-    ws.append_rows(rows, value_input_option="RAW")
-    for r in rows:
-        print("✅ Added:", r)
+    resp = ws.append_rows(rows, value_input_option="RAW")
+    for i, r in enumerate(rows, start=1):
+        progress(f"✅ Added: {r}", done=i, total=len(rows))
+
+    m = re.search(r"!A(\d+)", str((resp or {}).get("updates", {}).get("updatedRange", "")))
+    df = pd.DataFrame(rows, columns=expected_headers)
+    df["sheet_row"] = [int(m.group(1)) + i for i in range(len(rows))] if m else None
+    return df
 
 #Optionally trigger n8n after new data
 # ============================================================
@@ -109,21 +121,15 @@ WEBHOOK_URL = os.getenv("N8N_MARKETING_URL", "").strip()
 
 if __name__ == "__main__":
     print("📡 Simulating cross-platform engagement sync…")
-    time.sleep(0.8)
     print("🔒 Authenticating with Instagram (simulated)...")
-    time.sleep(0.6)
     print("🔒 Authenticating with LinkedIn (simulated)...")
-    time.sleep(0.6)
     print("✅ Auth OK — fetching engagement data streams...")
-    time.sleep(0.6)
 
     # Run the actual row creation logic
-    add_rows(n=5)
+    add_engagement(n=5)
 
     # Simulate “posting to webhook” logs (no real request sent)
     print("🌐 Posting engagement payload to n8n webhook (simulated)...")
-    time.sleep(0.8)
     print("📦 Sending 5 engagement objects to processing pipeline...")
-    time.sleep(0.6)
     print("✅ [Mock] Webhook accepted 5 events successfully.")
     print("✨ Simulation complete — engagement data inserted locally (no real webhook call).")
@@ -0,0 +1,217 @@
+# ------------------------------------------------------------
+# Two Peaks – Concurrent, rate-limit-aware LLM batch scorer
+# ------------------------------------------------------------
+"""
+Runs many small chat prompts concurrently instead of one `llm.invoke` +
+`time.sleep()` at a time.
+
+- A bounded pool of async workers (`concurrency`) pulls prompts off a queue.
+- A token bucket paces requests. It starts from a configured RPM and is
+  re-tuned from the API's `x-ratelimit-*` response headers, so the pool
+  slows down before it hits 429s.
+- 429 / 5xx / connection errors are retried with jittered exponential
+  backoff (honouring `retry-after`). A row that still fails is reported as
+  failed without stopping the rest of the batch.
+- Answers go through the shared LLM response cache (`shared/llm_cache.py`),
+  so a re-run with identical prompts costs no requests.
+
+    scorer = BatchScorer(model="gpt-4o-mini", temperature=0.2)
+    results = scorer.run(prompts)      # [{index, text, error, attempts}, ...] in input order
+    print(scorer.stats)                # rows/sec, retries, failures
+"""
+
+import os, re, time, random, asyncio
+
+import httpx
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError, APITimeoutError
+
+from shared.llm_cache import get_cache
+from shared.llm_clients import llm_settings
+
+SCORING_CONCURRENCY = int(os.getenv("SCORING_CONCURRENCY", "16"))
+SCORING_RPM = float(os.getenv("SCORING_RPM", "500"))
+SCORING_MAX_RETRIES = int(os.getenv("SCORING_MAX_RETRIES", "5"))
+
+_DURATION_RE = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h)")
+_UNIT_SECONDS = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_reset(value: str | None) -> float | None:
+    """Parse OpenAI reset durations such as '1s', '6m0s', '20ms' into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        parts = _DURATION_RE.findall(value)
+        return sum(float(n) * _UNIT_SECONDS[u] for n, u in parts) if parts else None
+
+
+class TokenBucket:
+    """Async token bucket; `acquire()` waits until a request may be sent."""
+
+    def __init__(self, rate_per_s: float, capacity: float | None = None):
+        self.rate = rate_per_s
+        self.capacity = capacity or max(1.0, rate_per_s)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def update_from_headers(self, headers):
+        """Re-tune from `x-ratelimit-{limit,remaining,reset}-requests`."""
+        limit = headers.get("x-ratelimit-limit-requests")
+        remaining = headers.get("x-ratelimit-remaining-requests")
+        reset = parse_reset(headers.get("x-ratelimit-reset-requests"))
+        try:
+            limit = float(limit) if limit is not None else None
+            remaining = float(remaining) if remaining is not None else None
+        except ValueError:
+            return
+        self._refill()
+        if limit:
+            # The limit header is per minute; keep some headroom for other clients.
+            self.rate = max(0.1, 0.9 * limit / 60)
+            self.capacity = max(1.0, min(limit, self.rate * 2))
+        if remaining is not None:
+            self.tokens = min(self.tokens, remaining)
+            if remaining < 1 and reset:
+                # Window exhausted: hold everyone until it resets.
+                self.tokens = -reset * self.rate
+
+    def pause(self, seconds: float):
+        """Drain the bucket so nothing is sent for `seconds` (e.g. after a 429)."""
+        self._refill()
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+
+def _retryable(exc: Exception) -> bool:
+    if isinstance(exc, (APIConnectionError, APITimeoutError)):
+        return True
+    return isinstance(exc, APIStatusError) and (exc.status_code == 429 or exc.status_code >= 500)
+
+
+def _retry_after(exc: Exception) -> float | None:
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    return parse_reset(response.headers.get("retry-after")) or parse_reset(
+        response.headers.get("x-ratelimit-reset-requests"))
+
+
+class BatchScorer:
+    """Send a list of prompts through a bounded, rate-limited async worker pool."""
+
+    def __init__(self, model: str = "gpt-4o-mini", temperature: float = 0.2,
+                 concurrency: int = SCORING_CONCURRENCY, rpm: float = SCORING_RPM,
+                 max_retries: int = SCORING_MAX_RETRIES, base_delay: float = 0.5, max_delay: float = 30.0,
+                 api_key: str | None = None, base_url: str | None = None, request_options: dict | None = None,
+                 cache=None, bypass_cache: bool = False):
+        self.model = model
+        self.temperature = temperature
+        self.concurrency = concurrency
+        self.rpm = rpm
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        settings = llm_settings()  # honours LLM_STUB / OPENAI_BASE_URL
+        self.api_key = api_key or settings["api_key"]
+        self.base_url = base_url or settings["base_url"]
+        self.request_options = request_options or {}  # e.g. {"response_format": {"type": "json_object"}}
+        self.cache = cache or get_cache()
+        self.bypass_cache = bypass_cache
+        self.stats = {}
+
+    async def _complete(self, client, bucket, prompt: str):
+        messages = [{"role": "user", "content": prompt}]
+        cached = self.cache.get(self.model, self.temperature, messages, bypass=self.bypass_cache,
+                                **self.request_options)
+        if cached is not None:
+            self.stats["cache_hits"] += 1
+            return cached
+        await bucket.acquire()
+        raw = await client.chat.completions.with_raw_response.create(
+            model=self.model, temperature=self.temperature, messages=messages, **self.request_options,
+        )
+        bucket.update_from_headers(raw.headers)
+        completion = raw.parse()
+        if completion.usage:
+            self.stats["prompt_tokens"] += completion.usage.prompt_tokens or 0
+            self.stats["completion_tokens"] += completion.usage.completion_tokens or 0
+        text = completion.choices[0].message.content or ""
+        self.cache.put(self.model, self.temperature, messages, text, **self.request_options)
+        return text
+
+    async def _score_one(self, client, bucket, index: int, prompt: str) -> dict:
+        result = {"index": index, "text": None, "error": None, "attempts": 0}
+        for attempt in range(self.max_retries + 1):
+            result["attempts"] = attempt + 1
+            try:
+                result["text"] = await self._complete(client, bucket, prompt)
+                result["error"] = None
+                return result
+            except Exception as e:
+                result["error"] = f"{type(e).__name__}: {e}"
+                if not _retryable(e) or attempt == self.max_retries:
+                    return result
+                self.stats["retries"] += 1
+                # Full jitter, but never earlier than the server asked for.
+                delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                hinted = _retry_after(e)
+                if hinted:
+                    delay = max(delay, hinted)
+                    if getattr(e, "status_code", None) == 429:
+                        bucket.pause(hinted)
+                await asyncio.sleep(delay)
+        return result
+
+    async def score_all(self, prompts: list[str], on_result=None) -> list[dict]:
+        """Score `prompts`; results come back in input order. `on_result(result)` fires as each finishes."""
+        self.stats = {"rows": len(prompts), "ok": 0, "failed": 0, "retries": 0,
+                      "prompt_tokens": 0, "completion_tokens": 0, "cache_hits": 0}
+        results = [None] * len(prompts)
+        queue = asyncio.Queue()
+        for item in enumerate(prompts):
+            queue.put_nowait(item)
+
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        bucket = TokenBucket(self.rpm / 60, capacity=min(self.concurrency, max(1.0, self.rpm / 60)))
+        t0 = time.perf_counter()
+        async with httpx.AsyncClient(limits=limits, timeout=60) as http:
+            client = AsyncOpenAI(api_key=self.api_key, base_url=self.base_url, http_client=http, max_retries=0)
+
+            async def worker():
+                while True:
+                    try:
+                        index, prompt = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
+                    result = await self._score_one(client, bucket, index, prompt)
+                    results[index] = result
+                    self.stats["failed" if result["error"] else "ok"] += 1
+                    if on_result:
+                        on_result(result)
+
+            await asyncio.gather(*(worker() for _ in range(min(self.concurrency, len(prompts)) or 1)))
+
+        elapsed = time.perf_counter() - t0
+        self.stats["seconds"] = round(elapsed, 3)
+        self.stats["rows_per_s"] = round(len(prompts) / elapsed, 2) if elapsed else 0.0
+        return results
+
+    def run(self, prompts: list[str], on_result=None) -> list[dict]:
+        """Blocking wrapper around `score_all` for the command-line agents."""
+        return asyncio.run(self.score_all(prompts, on_result))
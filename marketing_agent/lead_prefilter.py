@@ -0,0 +1,111 @@
+# ------------------------------------------------------------
+# Two Peaks – Local heuristic lead pre-filter
+# ------------------------------------------------------------
+"""
+Scores engagement rows locally before any LLM call.
+
+Features are computed column-wise over the whole DataFrame (pandas string
+and numeric ops, no Python loop):
+- purchase-intent phrases ("bulk pack", "where can I buy", "ship", "price")
+- positive product sentiment ("best chai", "loved the saffron")
+- noise / spam patterns ("follow me", "check my page", links, emoji-only)
+- reach: log-scaled followers and likes
+
+The heuristic score is clipped to 1–10. Rows at or above `high` or at or below
+`low` are confident and keep the heuristic score. Only the middle band is
+routed to the LLM. `agreement_report` compares heuristic and LLM scores on
+rows that got both, so the thresholds can be tuned.
+"""
+
+import os
+import numpy as np
+import pandas as pd
+
+PREFILTER_LOW = float(os.getenv("LEAD_PREFILTER_LOW", "3"))
+PREFILTER_HIGH = float(os.getenv("LEAD_PREFILTER_HIGH", "8"))
+MQL_THRESHOLD = 7
+
+INTENT_PATTERNS = [
+    r"\bbulk\b", r"\bbuy\b", r"\bpurchas", r"\border(?:ing)?\b", r"\bneed (?:this|it|some)\b",
+    r"\bwhere (?:can|do) i (?:get|buy|find)\b", r"\bship(?:ping)?\b", r"\bprice\b", r"\bcost\b",
+    r"\brestock", r"\bsubscri", r"\bgift", r"\bwholesale\b", r"\bin stock\b", r"\bhow much\b",
+]
+INTEREST_PATTERNS = [
+    r"\blove[ds]?\b", r"\bbest\b", r"\bamazing\b", r"\bdelicious\b", r"\bobsessed\b", r"\bfavou?rite\b",
+    r"\bbeautiful\b", r"\bnotes?\b", r"\bblend\b", r"\britual\b", r"\bmade my\b",
+]
+NOISE_PATTERNS = [
+    r"\bfollow (?:me|back)\b", r"\bcheck (?:out )?my\b", r"\bdm (?:me|for)\b", r"https?://", r"\bpromo\b",
+    r"\bgiveaway\b", r"\bcollab\b", r"\bf4f\b", r"\bl4l\b",
+]
+
+
+def _matches(comments: pd.Series, patterns: list[str]) -> pd.Series:
+    """Number of distinct patterns each comment matches."""
+    return sum(comments.str.contains(p, regex=True).astype(int) for p in patterns)
+
+
+def heuristic_features(df: pd.DataFrame) -> pd.DataFrame:
+    comments = df["comment"].fillna("").astype(str).str.lower()
+    letters = comments.str.count(r"[a-z]")
+    return pd.DataFrame({
+        "intent": _matches(comments, INTENT_PATTERNS),
+        "interest": _matches(comments, INTEREST_PATTERNS),
+        "noise": _matches(comments, NOISE_PATTERNS),
+        "question": comments.str.contains(r"\?", regex=True).astype(int),
+        "no_text": (letters < 3).astype(int),
+        "followers_log": np.log10(pd.to_numeric(df["followers"], errors="coerce").fillna(0).clip(lower=0) + 1),
+        "likes_log": np.log10(pd.to_numeric(df["likes"], errors="coerce").fillna(0).clip(lower=0) + 1),
+    }, index=df.index)
+
+
+def heuristic_scores(df: pd.DataFrame) -> pd.Series:
+    """Vectorized 1–10 purchase-interest estimate."""
+    f = heuristic_features(df)
+    raw = (
+        4.0
+        + 2.5 * f["intent"].clip(upper=2)
+        + 1.0 * f["interest"].clip(upper=2)
+        + 0.5 * f["question"] * (f["intent"] > 0)
+        - 3.0 * f["noise"].clip(upper=1)
+        - 2.0 * f["no_text"]
+        + 0.4 * (f["followers_log"] - 3).clip(-1, 1.5)
+        + 0.3 * (f["likes_log"] - 1.5).clip(-1, 1)
+    )
+    return raw.round().clip(1, 10).astype(int)
+
+
+def prefilter(df: pd.DataFrame, low: float = PREFILTER_LOW, high: float = PREFILTER_HIGH) -> pd.DataFrame:
+    """
+    Add `heuristic_score` and `route` columns to a copy of `df`.
+
+    route: "auto_high" (score >= high), "auto_low" (score <= low) or "llm" (ambiguous band).
+    """
+    out = df.copy()
+    out["heuristic_score"] = heuristic_scores(df)
+    out["route"] = np.select(
+        [out["heuristic_score"] >= high, out["heuristic_score"] <= low], ["auto_high", "auto_low"], default="llm")
+    return out
+
+
+def heuristic_reason(route: str) -> str:
+    if route == "auto_high":
+        return "Heuristic: clear purchase-intent language."
+    return "Heuristic: low-intent or promotional comment."
+
+
+def agreement_report(heuristic: pd.Series, llm: pd.Series, threshold: int = MQL_THRESHOLD) -> dict:
+    """Compare heuristic vs LLM scores on rows that have both."""
+    both = pd.DataFrame({"h": heuristic, "l": llm}).dropna()
+    if both.empty:
+        return {"rows": 0}
+    h_mql, l_mql = both["h"] >= threshold, both["l"] >= threshold
+    return {
+        "rows": int(len(both)),
+        "exact": round(float((both["h"] == both["l"]).mean()), 3),
+        "within_1": round(float(((both["h"] - both["l"]).abs() <= 1).mean()), 3),
+        "mean_abs_error": round(float((both["h"] - both["l"]).abs().mean()), 2),
+        "mql_agreement": round(float((h_mql == l_mql).mean()), 3),
+        "false_mql": int((h_mql & ~l_mql).sum()),     # heuristic would queue, LLM would not
+        "missed_mql": int((~h_mql & l_mql).sum()),    # LLM would queue, heuristic would not
+    }
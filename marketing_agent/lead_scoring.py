@@ -1,53 +1,41 @@
 # ------------------------------------------------------------
 # Two Peaks – Marketing Lead Scoring Agent (Autonomous Edition)
 # ------------------------------------------------------------
-import os, re, time
+import os, re, time, json
+import sys, argparse
 import pandas as pd
 from dotenv import load_dotenv
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from shared.pipeline_events import print_progress
+from shared.sheets_gateway import get_gateway
+
+try:
+    from marketing_agent.batch_scorer import BatchScorer
+    from marketing_agent.packed_scoring import score_rows
+    from marketing_agent.scoring_watermark import ScoringWatermark, RAW_FIELDS
+    from marketing_agent.lead_prefilter import (
+        prefilter, heuristic_reason, agreement_report, PREFILTER_LOW, PREFILTER_HIGH,
+    )
+except ImportError:  # running as a script from inside marketing_agent/
+    from batch_scorer import BatchScorer
+    from packed_scoring import score_rows
+    from scoring_watermark import ScoringWatermark, RAW_FIELDS
+    from lead_prefilter import prefilter, heuristic_reason, agreement_report, PREFILTER_LOW, PREFILTER_HIGH
 
 # ------------------------------------------------------------
 # Setup
 # ------------------------------------------------------------
 load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-SHEET_NAME = os.getenv("SHEETS_SPREADSHEET_NAME", "TwoPeaks_Marketing")
-SERVICE_JSON = os.getenv("GOOGLE_SVC_JSON", "service_account.json")
-
-# --- Google Auth ---
-scope = [
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive"
-]
-creds = ServiceAccountCredentials.from_json_keyfile_name(SERVICE_JSON, scope)
-gc = gspread.authorize(creds)
-ss = gc.open(SHEET_NAME)
-
-def ensure_ws(title, headers):
-    """Ensure a worksheet exists and has the correct headers."""
-    try:
-        ws = ss.worksheet(title)
-    except gspread.exceptions.WorksheetNotFound:
-        ws = ss.add_worksheet(title=title, rows="1000", cols=str(len(headers)+3))
-        ws.append_row(headers)
-    return ws
 
-raw_ws = ss.worksheet("Instagram_Engagement_Raw")
-ql_ws = ensure_ws("Qualified_Leads", ["timestamp","username","comment","likes","followers","score","reason"])
-mt_ws = ensure_ws("Marketing_Templates", ["timestamp","username","channel","subject","message","status"])
+RAW_SHEET = "Instagram_Engagement_Raw"
+QL_HEADERS = ["timestamp", "username", "comment", "likes", "followers", "score", "reason"]
+MT_HEADERS = ["timestamp", "username", "channel", "subject", "message", "status"]
+PLACEHOLDER_SUBJECT = "Two Peaks Chai — Hello!"
+PLACEHOLDER_MESSAGE = "Personalized message queued"
 
-data = pd.DataFrame(raw_ws.get_all_records())
-if data.empty:
-    print("⚠️ No engagement data found.")
-    exit()
-
-# ------------------------------------------------------------
-# LLM scoring setup
-# ------------------------------------------------------------
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.2, api_key=OPENAI_API_KEY)
 prompt = PromptTemplate.from_template("""
 Evaluate this Instagram comment for purchase interest (1–10).
 
@@ -66,31 +54,198 @@ def parse_score(resp):
     reason = re.sub(r".*REASON:\s*", "", resp).strip()
     return score, reason or "Neutral comment."
 
+def _appended(new_rows: pd.DataFrame) -> list[tuple[int, dict]]:
+    """[(sheet_row, record)] for rows handed over by the engagement stage (cell text, like a sheet read)."""
+    if new_rows is None or new_rows.empty or "sheet_row" not in new_rows or new_rows["sheet_row"].isna().any():
+        return []
+    return [(int(r["sheet_row"]), {f: str(r[f]) for f in RAW_FIELDS}) for r in new_rows.to_dict("records")]
+
 # ------------------------------------------------------------
-# Process and score rows
+# Stage: score pending engagement → Qualified_Leads
 # ------------------------------------------------------------
-now = time.strftime("%Y-%m-%d %H:%M:%S")
-qualified, queued = [], []
-
-print(f"🧠 Evaluating {len(data)} engagement rows...")
-for _, row in data.iterrows():
-    msg = prompt.format(**row)
-    resp = llm.invoke(msg).content
-    score, reason = parse_score(resp)
-
-    qualified.append([
-        now, row["username"], row["comment"], row["likes"], row["followers"], score, reason
-    ])
-
-    if score >= 7:
-        queued.append([
-            now, row["username"], "instagram", "Two Peaks Chai — Hello!", "Personalized message queued", "QUEUED"
+def score_leads(new_rows: pd.DataFrame | None = None, sheets=None, scorer=None, pack_size: int = 1,
+                use_prefilter: bool = False, prefilter_low: float = PREFILTER_LOW,
+                prefilter_high: float = PREFILTER_HIGH, audit_share: float = 0.1,
+                agreement_report_path: str | None = None, full_rescore: bool = False,
+                queue_placeholders: bool = True, bypass_cache: bool = False, progress=print_progress,
+                **scorer_opts) -> tuple[pd.DataFrame, dict]:
+    """
+    Score engagement rows not scored yet and append them to Qualified_Leads.
+
+    `new_rows` is what `add_engagement` just appended (with `sheet_row`). If
+    those rows start at the watermark they are scored as-is, with no read of
+    the engagement sheet; otherwise the sheet is read as in a standalone run.
+    `scorer` is a shared `BatchScorer`; without one a new one is built from
+    `scorer_opts`. With `queue_placeholders`, leads scoring 7+ also get a QUEUED
+    placeholder row in Marketing_Templates (the command-line flow, where the
+    template generator replaces them later).
+
+    Returns (scored leads with the Qualified_Leads columns, stats).
+    """
+    sheets = sheets or get_gateway()
+    ql_ws = sheets.worksheet("Qualified_Leads", QL_HEADERS)
+
+    # --- Select rows to score (only new engagement unless full_rescore) ---
+    watermark = ScoringWatermark()
+    pending = None
+    if full_rescore:
+        watermark.reset()
+        watermark.exists = False
+    elif new_rows is not None:
+        pending = watermark.take_appended(_appended(new_rows))
+    if pending is None:
+        raw_ws = sheets.worksheet(RAW_SHEET)
+        if not full_rescore and not watermark.exists:
+            # First incremental run: treat leads already in Qualified_Leads as scored.
+            scored = {(str(r.get("username", "")), str(r.get("comment", ""))) for r in ql_ws.get_all_records()}
+            if scored:
+                existing = raw_ws.get_all_records(numericise_ignore=["all"])
+                watermark.mark_seen([r for r in existing
+                                     if (str(r.get("username", "")), str(r.get("comment", ""))) in scored])
+        pending = watermark.new_rows(raw_ws)
+
+    stats = {"processed": 0, "queued": 0, "failed": 0}
+    if not pending:
+        progress("✨ No new engagement rows since the last run.")
+        watermark.advance([], set())
+        watermark.save()
+        return pd.DataFrame(columns=QL_HEADERS), stats
+
+    data = pd.DataFrame([r for _, r in pending])
+    for col in ("likes", "followers"):
+        data[col] = pd.to_numeric(data[col], errors="coerce").fillna(0).astype(int)
+
+    # --- LLM scoring setup (one shared scorer when the pipeline passes it in) ---
+    if scorer is None:
+        scorer = BatchScorer(model="gpt-4o-mini", temperature=0.2, bypass_cache=bypass_cache, **scorer_opts)
+    saved_temperature, scorer.temperature = scorer.temperature, 0.2
+
+    # --- Process and score rows ---
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    qualified, queued, failed = [], [], []
+
+    mode = "full rescore" if full_rescore else "new rows only"
+    progress(f"🧠 Evaluating {len(data)} engagement rows [{mode}] ({scorer.concurrency} concurrent, "
+             f"{pack_size} per request)...")
+    rows = data.to_dict("records")
+    results = [None] * len(rows)
+    to_llm = list(range(len(rows)))
+
+    if use_prefilter:
+        routed = prefilter(data, low=prefilter_low, high=prefilter_high).reset_index(drop=True)
+        auto = routed.index[routed["route"] != "llm"]
+        audit = set(routed.loc[auto].sample(frac=min(1.0, audit_share), random_state=7).index) if len(auto) else set()
+        for i in auto:
+            if i not in audit:
+                results[i] = (int(routed.at[i, "heuristic_score"]), heuristic_reason(routed.at[i, "route"]))
+        to_llm = [i for i in to_llm if results[i] is None]
+        progress(f"🔎 Pre-filter: {len(auto)} clear-cut rows scored locally ({len(audit)} audited), "
+                 f"{len(to_llm) - len(audit)} ambiguous → LLM.")
+
+    answered = {"requests": 0}
+
+    def on_result(result, total):
+        # Live count for the event stream; printed runs only see every 10th step
+        answered["requests"] += 1
+        done = answered["requests"]
+        if done % max(1, total // 10) == 0 or done == total:
+            progress(f"🧠 {done}/{total} scoring requests answered", done=done, total=total)
+        if done == total:
+            answered["requests"] = 0  # next round (single-row fallbacks) counts from zero
+
+    try:
+        llm_results = score_rows(scorer, [rows[i] for i in to_llm], lambda row: prompt.format(**row), parse_score,
+                                 pack_size=pack_size, on_result=on_result)
+    finally:
+        scorer.temperature = saved_temperature
+    for i, result in zip(to_llm, llm_results):
+        results[i] = result
+
+    if use_prefilter:
+        llm_scores = pd.Series({i: r[0] for i, r in zip(to_llm, llm_results) if r is not None}, dtype=float)
+        report = {
+            "thresholds": {"low": prefilter_low, "high": prefilter_high},
+            "llm_calls_saved": len(auto) - len(audit),
+            "audited_auto_rows": agreement_report(routed.loc[list(audit), "heuristic_score"], llm_scores),
+            "ambiguous_band": agreement_report(routed.loc[routed["route"] == "llm", "heuristic_score"], llm_scores),
+        }
+        progress(f"📏 Heuristic vs LLM on audited rows: {report['audited_auto_rows']}")
+        if agreement_report_path:
+            with open(agreement_report_path, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2)
+
+    failed_rows = set()
+    for (sheet_row, _), row, result in zip(pending, rows, results):
+        if result is None:
+            # Isolate the failure: the row is left out of Qualified_Leads and the batch carries on.
+            failed.append(row["username"])
+            failed_rows.add(sheet_row)
+            continue
+        score, reason = result
+
+        qualified.append([
+            now, row["username"], row["comment"], row["likes"], row["followers"], score, reason
         ])
-    time.sleep(0.3)
 
-if qualified:
-    ql_ws.append_rows(qualified, value_input_option="RAW")
-if queued:
-    mt_ws.append_rows(queued, value_input_option="RAW")
+        if score >= 7:
+            queued.append([
+                now, row["username"], "instagram", PLACEHOLDER_SUBJECT, PLACEHOLDER_MESSAGE, "QUEUED"
+            ])
+
+    if failed:
+        progress(f"⚠️ Could not score {len(failed)} rows (e.g. @{failed[0]}); they will be retried on the next run.")
+
+    if full_rescore:
+        ql_ws.batch_clear([f"A2:G{max(ql_ws.row_count, 2)}"])  # replaced below, not duplicated
+    if qualified:
+        ql_ws.append_rows(qualified, value_input_option="RAW")
+    if queued and queue_placeholders:
+        mt_ws = sheets.worksheet("Marketing_Templates", MT_HEADERS)
+        # One placeholder per lead: a full rescore (or a lead engaging again) must not queue it twice.
+        waiting = {str(r.get("username", "")) for r in mt_ws.get_all_records()
+                   if str(r.get("subject", "")).strip() == PLACEHOLDER_SUBJECT
+                   and str(r.get("message", "")).strip().lower() == PLACEHOLDER_MESSAGE.lower()}
+        fresh = []
+        for row in queued:
+            if str(row[1]) not in waiting:
+                waiting.add(str(row[1]))
+                fresh.append(row)
+        if fresh:
+            mt_ws.append_rows(fresh, value_input_option="RAW")
+
+    # Only move the watermark once the results are safely in the sheet.
+    watermark.advance(pending, failed_rows)
+    watermark.save()
+
+    s = scorer.stats
+    progress(f"⚡ {s['rows_per_s']} rows/sec over {s['seconds']}s — {s['requests']} requests "
+             f"({s['fallback_rows']} single-row fallbacks, {s['cache_hits']} cache hits), {s['retries']} retries.")
+    progress(f"✨ Lead scoring complete — {len(qualified)} processed, {len(queued)} queued for outreach, "
+             f"{len(failed)} failed.")
+    stats.update(processed=len(qualified), queued=len(queued), failed=len(failed), llm=dict(s))
+    return pd.DataFrame(qualified, columns=QL_HEADERS), stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score Instagram engagement rows for purchase intent")
+    parser.add_argument("--concurrency", type=int, default=None, help="parallel LLM requests (default SCORING_CONCURRENCY)")
+    parser.add_argument("--rpm", type=float, default=None, help="starting request budget per minute (default SCORING_RPM)")
+    parser.add_argument("--pack-size", type=int, default=int(os.getenv("SCORING_PACK_SIZE", "1")),
+                        help="comments per LLM request (1 = one request per comment)")
+    parser.add_argument("--prefilter", action="store_true", default=os.getenv("LEAD_PREFILTER", "0") == "1",
+                        help="score clear-cut comments locally and send only the ambiguous band to the LLM")
+    parser.add_argument("--prefilter-low", type=float, default=PREFILTER_LOW, help="heuristic score at/below = confident no")
+    parser.add_argument("--prefilter-high", type=float, default=PREFILTER_HIGH, help="heuristic score at/above = confident yes")
+    parser.add_argument("--audit-share", type=float, default=float(os.getenv("LEAD_PREFILTER_AUDIT", "0.1")),
+                        help="share of auto-scored rows also sent to the LLM for the agreement report")
+    parser.add_argument("--agreement-report", default=None, help="write the heuristic-vs-LLM report to this JSON path")
+    parser.add_argument("--no-cache", action="store_true", help="skip cached LLM answers (fresh answers are still cached)")
+    parser.add_argument("--full-rescore", action="store_true",
+                        help="ignore the watermark, rescore every engagement row and rewrite Qualified_Leads")
+    args = parser.parse_args()
 
-print(f"✨ Lead scoring complete — {len(qualified)} processed, {len(queued)} queued for outreach.")
\ No newline at end of file
+    scorer_opts = {k: v for k, v in {"concurrency": args.concurrency, "rpm": args.rpm}.items() if v is not None}
+    score_leads(pack_size=args.pack_size, use_prefilter=args.prefilter, prefilter_low=args.prefilter_low,
+                prefilter_high=args.prefilter_high, audit_share=args.audit_share,
+                agreement_report_path=args.agreement_report, full_rescore=args.full_rescore,
+                bypass_cache=args.no_cache, **scorer_opts)
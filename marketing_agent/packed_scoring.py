@@ -0,0 +1,113 @@
+# ------------------------------------------------------------
+# Two Peaks – Packed (multi-row) lead scoring
+# ------------------------------------------------------------
+"""
+Scores several Instagram comments per LLM request.
+
+Each request carries up to `pack_size` rows as a JSON list with ids, and the
+model must answer with `{"scores": [{"id", "score", "reason"}, ...]}`.
+Results are mapped back to rows by id, so a reordered or partial answer
+still lands on the right lead. A pack that fails to parse and any ids
+missing from an answer are re-scored one row at a time with the regular
+single-row prompt.
+
+    results = score_rows(scorer, rows, single_prompt, parse_score, pack_size=20)
+    # -> [(score, reason) | None, ...] in row order (None = failed)
+"""
+
+import re, json
+
+PACKED_PROMPT = """
+Evaluate each Instagram comment below for purchase interest (1–10).
+
+Comments (JSON):
+{items}
+
+Reply with JSON only, exactly one entry per id:
+{{"scores": [{{"id": <id>, "score": <1-10>, "reason": "<short reason>"}}, ...]}}
+"""
+
+_FENCE_RE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def build_packed_prompt(pack: list[tuple[int, dict]]) -> str:
+    items = [{"id": i, "username": str(r.get("username", "")), "comment": str(r.get("comment", "")),
+              "followers": r.get("followers", ""), "likes": r.get("likes", "")} for i, r in pack]
+    return PACKED_PROMPT.format(items=json.dumps(items, ensure_ascii=False, indent=0))
+
+
+def parse_packed(text: str | None, ids: set[int]) -> dict[int, tuple[int, str]]:
+    """Map id -> (score, reason) for every valid entry; unknown ids and bad scores are dropped."""
+    if not text:
+        return {}
+    try:
+        data = json.loads(_FENCE_RE.sub("", text.strip()))
+    except json.JSONDecodeError:
+        return {}
+    if isinstance(data, dict):
+        data = data.get("scores", [])
+    if not isinstance(data, list):
+        return {}
+    parsed = {}
+    for entry in data:
+        if not isinstance(entry, dict):
+            continue
+        try:
+            row_id, score = int(entry["id"]), int(entry["score"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        if row_id in ids and 1 <= score <= 10:
+            parsed[row_id] = (score, str(entry.get("reason", "")).strip() or "Neutral comment.")
+    return parsed
+
+
+def score_rows(scorer, rows: list[dict], single_prompt, parse_single, pack_size: int = 20,
+               on_result=None) -> list:
+    """
+    Score `rows` with `scorer` (a BatchScorer), `pack_size` rows per request.
+
+    `single_prompt(row)` / `parse_single(text)` are the one-row prompt and parser
+    used for pack_size <= 1 and as the fallback. `on_result(result, total)`
+    fires as each request of a round finishes. Returns one (score, reason)
+    or None per row, in order. `scorer.stats` is updated with the request totals.
+    """
+    results = [None] * len(rows)
+    pending = list(range(len(rows)))
+    totals = {"requests": 0, "packed_requests": 0, "fallback_rows": 0, "retries": 0,
+              "prompt_tokens": 0, "completion_tokens": 0, "cache_hits": 0, "seconds": 0.0}
+
+    def run(prompts):
+        out = scorer.run(prompts, on_result=(lambda r: on_result(r, len(prompts))) if on_result else None)
+        totals["requests"] += len(prompts) - scorer.stats["cache_hits"]
+        for key in ("retries", "prompt_tokens", "completion_tokens", "cache_hits", "seconds"):
+            totals[key] += scorer.stats[key]
+        return out
+
+    if pack_size > 1 and rows:
+        packs = [pending[i:i + pack_size] for i in range(0, len(pending), pack_size)]
+        saved_options = scorer.request_options
+        scorer.request_options = {**saved_options, "response_format": {"type": "json_object"}}
+        try:
+            answers = run([build_packed_prompt([(i, rows[i]) for i in pack]) for pack in packs])
+        finally:
+            scorer.request_options = saved_options
+        totals["packed_requests"] = len(packs)
+        for pack, answer in zip(packs, answers):
+            for row_id, value in parse_packed(answer["text"], set(pack)).items():
+                results[row_id] = value
+        pending = [i for i in pending if results[i] is None]
+        totals["fallback_rows"] = len(pending)
+
+    if pending:
+        answers = run([single_prompt(rows[i]) for i in pending])
+        for i, answer in zip(pending, answers):
+            if not answer["error"]:
+                results[i] = parse_single(answer["text"])
+
+    totals["rows"] = len(rows)
+    totals["ok"] = sum(r is not None for r in results)
+    totals["failed"] = len(rows) - totals["ok"]
+    totals["seconds"] = round(totals["seconds"], 3)
+    totals["rows_per_s"] = round(len(rows) / totals["seconds"], 2) if totals["seconds"] else 0.0
+    scorer.stats = totals
+    return results
@@ -0,0 +1,106 @@
+# ------------------------------------------------------------
+# Two Peaks – In-process marketing pipeline
+# ------------------------------------------------------------
+"""
+Engagement → lead scoring → outreach templates in one process.
+
+The dashboard used to start `add_fake_engagement.py`, `lead_scoring.py` and
+`template_generator.py` as three `python` subprocesses. Each one paid
+interpreter start-up, the pandas / langchain / gspread imports, a fresh
+Sheets auth, and a re-read of the sheet the previous stage had just written.
+Here the same stage functions run back to back:
+
+- One Sheets gateway (client, spreadsheet and worksheet handles) and one
+  `BatchScorer` (LLM settings, response cache, rate budget) serve all stages.
+- DataFrames pass between stages in memory. The new engagement rows go
+  straight to scoring (the watermark takes them without a sheet read), and
+  the scored leads go straight to template generation.
+- Sheets are only written at the edges: the engagement append, the
+  Qualified_Leads append and the Marketing_Templates appends. No QUEUED
+  placeholders are written, so there is nothing to clean up afterwards.
+- Every stage reports through a structured event stream
+  (`shared/pipeline_events.py`): stage started, progress with done/total
+  counts, and stage finished with counts and timings. Each `on_event`
+  listener (e.g. the dashboard renderer) gets the events as they happen.
+
+    result = run_marketing_pipeline(n_engagement=5, on_event=render)
+"""
+
+import os, sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from shared.pipeline_events import PipelineEvents, print_event
+from shared.sheets_gateway import get_gateway
+
+try:
+    from marketing_agent.batch_scorer import BatchScorer
+    from marketing_agent.add_fake_engagement import add_engagement
+    from marketing_agent.lead_scoring import score_leads
+    from marketing_agent.template_generator import generate_outreach
+except ImportError:  # running as a script from inside marketing_agent/
+    from batch_scorer import BatchScorer
+    from add_fake_engagement import add_engagement
+    from lead_scoring import score_leads
+    from template_generator import generate_outreach
+
+
+def run_marketing_pipeline(n_engagement: int = 5, on_event=print_event, sheets=None, scorer=None,
+                           pack_size: int | None = None, use_prefilter: bool | None = None,
+                           template_concurrency: int | None = None, batch_size: int | None = None,
+                           bypass_cache: bool = False) -> dict:
+    """
+    Run all three stages and return their outputs.
+
+    Returns {"engagement": DataFrame, "leads": DataFrame, "scoring": stats,
+    "templates": stats, "seconds": {stage: s}, "events": [...]}. A stage
+    that raises emits `stage_failed` and stops the pipeline. Rows already
+    written stay written, and the scoring watermark picks up unscored rows
+    on the next run.
+
+    Unset options come from the environment when the run starts:
+    SCORING_PACK_SIZE, LEAD_PREFILTER, TEMPLATE_CONCURRENCY and
+    TEMPLATE_BATCH_SIZE. The shared scorer runs the template stage at
+    `template_concurrency`.
+    """
+    if pack_size is None:
+        pack_size = int(os.getenv("SCORING_PACK_SIZE", "1"))
+    if use_prefilter is None:
+        use_prefilter = os.getenv("LEAD_PREFILTER", "0") == "1"
+    events = PipelineEvents(*([on_event] if on_event else []))
+    sheets = sheets or get_gateway()
+    scorer = scorer or BatchScorer(model="gpt-4o-mini", bypass_cache=bypass_cache)
+
+    with events.stage("engagement") as stage:
+        engagement = add_engagement(n_engagement, sheets=sheets, progress=stage.progress)
+        stage.counts.update(rows=len(engagement))
+
+    with events.stage("scoring") as stage:
+        leads, scoring = score_leads(engagement, sheets=sheets, scorer=scorer, pack_size=pack_size,
+                                     use_prefilter=use_prefilter, queue_placeholders=False,
+                                     progress=stage.progress)
+        stage.counts.update(processed=scoring["processed"], qualified=scoring["queued"], failed=scoring["failed"],
+                            requests=scoring.get("llm", {}).get("requests", 0))
+
+    with events.stage("templates") as stage:
+        templates = generate_outreach(leads, sheets=sheets, scorer=scorer, concurrency=template_concurrency,
+                                      batch_size=batch_size, clean_placeholders=False, progress=stage.progress)
+        stage.counts.update(leads=templates["leads"], rows_written=templates["rows_written"],
+                            failed=templates["failed"])
+
+    events.finish(engagement=len(engagement), scored=scoring["processed"],
+                  templates=templates["rows_written"])
+    return {"engagement": engagement, "leads": leads, "scoring": scoring, "templates": templates,
+            "seconds": events.seconds(), "events": events.events}
+
+
+if __name__ == "__main__":
+    import argparse
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Run engagement → scoring → templates in one process")
+    parser.add_argument("--rows", type=int, default=5, help="fake engagement rows to add")
+    parser.add_argument("--regenerate", action="store_true", help="skip cached LLM answers")
+    args = parser.parse_args()
+    run_marketing_pipeline(n_engagement=args.rows, bypass_cache=args.regenerate)
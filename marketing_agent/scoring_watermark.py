@@ -0,0 +1,105 @@
+# ------------------------------------------------------------
+# Two Peaks – Lead scoring watermark (incremental runs)
+# ------------------------------------------------------------
+"""
+Remembers which `Instagram_Engagement_Raw` rows have already been scored so
+`lead_scoring.py` only pays for new engagement.
+
+Two pieces of state are persisted to a small JSON file:
+- `next_row`: the first sheet row not yet processed. The raw sheet is
+  append-only, so a run only fetches rows from there on, plus the row just
+  before it as an anchor.
+- `seen`: content hashes of every scored row. If the anchor row no longer
+  matches (rows edited, deleted or re-sorted), the run falls back to reading
+  the whole sheet and skips anything already in `seen`.
+
+Rows that fail to score are not marked, and `next_row` never moves past
+them, so they are retried on the next run.
+"""
+
+import os, json, hashlib
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+WATERMARK_PATH = os.getenv("LEAD_SCORING_STATE_PATH", os.path.join(BASE_DIR, "lead_scoring_state.json"))
+RAW_FIELDS = ["timestamp", "username", "comment", "likes", "followers"]
+
+
+def row_hash(row: dict) -> str:
+    payload = "\x1f".join(str(row.get(f, "")).strip() for f in RAW_FIELDS)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class ScoringWatermark:
+    """Persisted processed-row watermark for the engagement sheet."""
+
+    def __init__(self, path: str = WATERMARK_PATH):
+        self.path = path
+        self.exists = os.path.exists(path)
+        self.next_row = 2  # row 1 holds the headers
+        self.anchor = None
+        self.seen = set()
+        self._fetched = {}  # sheet_row -> record from the last new_rows() call
+        if self.exists:
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    state = json.load(f)
+                self.next_row = state["next_row"]
+                self.anchor = state["anchor"]
+                self.seen = set(state["seen"])
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️ Ignoring unreadable scoring watermark ({e}); scanning the full sheet.")
+                self.exists = False
+
+    def reset(self):
+        self.next_row, self.anchor, self.seen = 2, None, set()
+
+    def save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"next_row": self.next_row, "anchor": self.anchor, "seen": sorted(self.seen)}, f)
+        os.replace(tmp, self.path)
+
+    # -----------------------------------------------------
+    # Reading new rows
+    # -----------------------------------------------------
+    def new_rows(self, ws) -> list[tuple[int, dict]]:
+        """Return [(sheet_row, record), ...] not yet scored, fetching only the tail when possible."""
+        if self.exists and self.next_row > 2:
+            anchor_row = self.next_row - 1
+            header, tail = ws.batch_get(["1:1", f"A{anchor_row}:{chr(ord('A') + len(RAW_FIELDS) - 1)}"])
+            headers = [h.strip().lower() for h in (header[0] if header else [])]
+            records = [dict(zip(headers, values)) for values in tail]
+            if records and row_hash(records[0]) == self.anchor:
+                self._fetched = {anchor_row + i: r for i, r in enumerate(records)}
+                return [(i, r) for i, r in self._fetched.items() if i > anchor_row and row_hash(r) not in self.seen]
+            print("↺ Engagement sheet changed above the watermark — rescanning all rows.")
+        # Keep cell text as-is so hashes match the tail reads above.
+        records = ws.get_all_records(numericise_ignore=["all"])
+        self._fetched = dict(enumerate(records, start=2))
+        return [(i, r) for i, r in self._fetched.items() if row_hash(r) not in self.seen]
+
+    def take_appended(self, rows: list[tuple[int, dict]]) -> list[tuple[int, dict]] | None:
+        """
+        Use rows the caller has just appended as the unscored set, without reading the sheet.
+
+        This only applies when the rows start exactly at `next_row`, which means
+        nothing older is still pending. Otherwise it returns None and the caller
+        falls back to `new_rows()`.
+        """
+        if not (self.exists and rows and rows[0][0] == self.next_row):
+            return None
+        self._fetched = dict(rows)
+        return [(i, r) for i, r in rows if row_hash(r) not in self.seen]
+
+    def mark_seen(self, records: list[dict]):
+        self.seen.update(row_hash(r) for r in records)
+
+    def advance(self, rows: list[tuple[int, dict]], failed_rows: set[int]):
+        """Record scored rows and move `next_row` up to the first failure (or past the last fetched row)."""
+        self.mark_seen([r for i, r in rows if i not in failed_rows])
+        if not self._fetched:
+            return
+        stop = min(failed_rows) if failed_rows else max(self._fetched) + 1
+        if stop - 1 in self._fetched:
+            self.next_row = stop
+            self.anchor = row_hash(self._fetched[stop - 1])
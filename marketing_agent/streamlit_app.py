@@ -1,29 +1,22 @@
 # ------------------------------------------------------------
 # Two Peaks – Marketing Agent Dashboard (Streamlit)
 # ------------------------------------------------------------
-import os
+import os, sys
 import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from dotenv import load_dotenv
 import streamlit as st
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from shared.sheets_gateway import get_gateway
+
 # --- Load environment ---
 load_dotenv()
-SHEET_NAME = os.getenv("SHEETS_SPREADSHEET_NAME")
-SERVICE_JSON = os.getenv("GOOGLE_SVC_JSON")
-
-scope = [
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive"
-]
-creds = ServiceAccountCredentials.from_json_keyfile_name(SERVICE_JSON, scope)
-gc = gspread.authorize(creds)
-ss = gc.open(SHEET_NAME)
 
-# --- Read data ---
-ql_ws = ss.worksheet("Qualified_Leads")
-tpl_ws = ss.worksheet("Marketing_Templates")
+# --- Read data (Google Sheets or the local SHEETS_BACKEND) ---
+sheets = get_gateway()
+ql_ws = sheets.worksheet("Qualified_Leads")
+tpl_ws = sheets.worksheet("Marketing_Templates")
 
 leads_df = pd.DataFrame(ql_ws.get_all_records())
 records = tpl_ws.get_all_records(expected_headers=["timestamp", "username", "channel", "subject", "message", "status"])
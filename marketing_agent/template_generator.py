@@ -2,57 +2,33 @@
 # Two Peaks – Marketing Template Generator (Personalized & Clean Edition)
 # ------------------------------------------------------------
 
-import os
-import time
+import os, sys
+import argparse
 import pandas as pd
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
 from dotenv import load_dotenv
-from langchain_core.prompts import PromptTemplate
-from langchain_openai import ChatOpenAI
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from shared.sheets_bulk import delete_rows_bulk
+from shared.pipeline_events import print_progress
+from shared.sheets_gateway import get_gateway
+
+try:
+    from marketing_agent.template_pipeline import generate_templates
+except ImportError:  # running as a script from inside marketing_agent/
+    from template_pipeline import generate_templates
 
 # ------------------------------------------------------------
 # Load environment & configure
 # ------------------------------------------------------------
 load_dotenv()
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-SHEET_NAME = os.getenv("SHEETS_SPREADSHEET_NAME", "TwoPeaks_Marketing")
-SERVICE_JSON = os.getenv("GOOGLE_SVC_JSON", "service_account.json")
 
-# ------------------------------------------------------------
-# Google Sheets auth & worksheet handles
-# ------------------------------------------------------------
-scope = [
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive",
-]
-creds = ServiceAccountCredentials.from_json_keyfile_name(SERVICE_JSON, scope)
-gc = gspread.authorize(creds)
-ss = gc.open(SHEET_NAME)
-
-# Ensure Marketing_Templates exists with correct headers
-try:
-    tpl_ws = ss.worksheet("Marketing_Templates")
-except gspread.exceptions.WorksheetNotFound:
-    tpl_ws = ss.add_worksheet(title="Marketing_Templates", rows="1000", cols="6")
-    tpl_ws.append_row(["timestamp", "username", "channel", "subject", "message", "status"])
-
-# Load qualified leads (keep only strong scores)
-ql_ws = ss.worksheet("Qualified_Leads")
-df = pd.DataFrame(ql_ws.get_all_records())
-if df.empty:
-    print("⚠️  No qualified leads data found in 'Qualified_Leads'.")
-    raise SystemExit(0)
-
-mqls = df[df.get("score", 0) >= 7].copy()
-if mqls.empty:
-    print("⚠️  No qualified leads (score ≥ 7).")
-    raise SystemExit(0)
+TEMPLATE_HEADERS = ["timestamp", "username", "channel", "subject", "message", "status"]
 
 # ------------------------------------------------------------
 # Helper: Cleanup placeholder rows
 # ------------------------------------------------------------
-def clean_placeholder_rows():
+def clean_placeholder_rows(tpl_ws, progress=print_progress):
     try:
         all_rows = tpl_ws.get_all_records()
         delete_indices = []
@@ -63,98 +39,79 @@ def clean_placeholder_rows():
                 delete_indices.append(i)
 
         if delete_indices:
-            print(f"🧹 Cleaning up {len(delete_indices)} placeholder rows...")
-            for idx in sorted(delete_indices, reverse=True):
-                tpl_ws.delete_rows(idx)
-            print("✅ Placeholder rows removed successfully.")
+            progress(f"🧹 Cleaning up {len(delete_indices)} placeholder rows...")
+            # One batchUpdate: contiguous rows collapse into a single deleteDimension range
+            delete_rows_bulk(tpl_ws, delete_indices)
+            progress("✅ Placeholder rows removed successfully.")
         else:
-            print("✨ No placeholder rows found — sheet already clean.")
+            progress("✨ No placeholder rows found — sheet already clean.")
     except Exception as e:
-        print(f"⚠️ Cleanup failed: {e}")
-
-# Initial cleanup before generating new templates
-clean_placeholder_rows()
+        progress(f"⚠️ Cleanup failed: {e}")
 
 # ------------------------------------------------------------
-# LLM setup for copy generation
+# Stage: qualified leads → Marketing_Templates
 # ------------------------------------------------------------
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.6, api_key=OPENAI_API_KEY)
-
-prompt = PromptTemplate.from_template("""
-You are a warm, emotionally intelligent social media copywriter for Two Peaks Chai Co.
-
-Your goal is to write a *personalized, thoughtful outreach message* to user @{username}
-based on their engagement with our brand.
-
-Here’s what we know about them:
-- Their comment: "{comment}"
-- Likes: {likes}
-- Followers: {followers}
-- Reason for scoring: {reason}
-
-Tone: friendly, authentic, and chai-inspired — include warmth, gratitude, and subtle humor.
-Each note should feel hand-crafted, like a genuine human message.
-
-Return two lines:
-1️⃣ A creative subject line (5–8 words, no emojis).
-2️⃣ A personal message (2–3 sentences) that connects to their comment and gently invites them to explore or revisit Two Peaks Chai.
-Separate the two lines with a blank line.
-""")
-
-# ------------------------------------------------------------
-# Generate personalized templates
-# ------------------------------------------------------------
-rows = []
-print(f"✉️ Generating personalized messages for {len(mqls)} leads...")
-
-for _, r in mqls.iterrows():
-    text = prompt.format(
-        username=r["username"],
-        comment=r["comment"],
-        likes=r["likes"],
-        followers=r["followers"],
-        reason=r["reason"],
+def generate_outreach(leads: pd.DataFrame, sheets=None, scorer=None, concurrency: int | None = None,
+                      batch_size: int | None = None, bypass_cache: bool = False,
+                      clean_placeholders: bool = True, progress=print_progress) -> dict:
+    """
+    Draft personalized outreach for the leads scoring 7+ and append it to Marketing_Templates.
+
+    `leads` has the Qualified_Leads columns: the sheet for a standalone run,
+    or the scoring stage's output in the pipeline. `scorer` is a shared
+    `BatchScorer`, run at this stage's `concurrency`. `concurrency` and
+    `batch_size` default to TEMPLATE_CONCURRENCY / TEMPLATE_BATCH_SIZE.
+    `clean_placeholders` removes the QUEUED placeholders that lead scoring
+    writes, before and after drafting. Returns the `generate_templates` stats.
+    """
+    concurrency = concurrency or int(os.getenv("TEMPLATE_CONCURRENCY", "16"))
+    batch_size = batch_size or int(os.getenv("TEMPLATE_BATCH_SIZE", "50"))
+    sheets = sheets or get_gateway()
+    # Ensure Marketing_Templates exists with correct headers
+    tpl_ws = sheets.worksheet("Marketing_Templates", headers=TEMPLATE_HEADERS)
+
+    mqls = leads[leads["score"] >= 7].copy() if "score" in leads else leads.iloc[0:0]
+    if mqls.empty:
+        progress("⚠️  No qualified leads (score ≥ 7).")
+        return {"leads": 0, "ok": 0, "failed": 0, "rows_written": 0, "batches": 0}
+
+    # Initial cleanup before generating new templates
+    if clean_placeholders:
+        clean_placeholder_rows(tpl_ws, progress)
+
+    # Generate personalized templates (concurrent, written in batches)
+    progress(f"✉️ Generating personalized messages for {len(mqls)} leads "
+             f"({concurrency} concurrent)...")
+    stats = generate_templates(
+        mqls.to_dict("records"),
+        lambda rows: tpl_ws.append_rows(rows, value_input_option="RAW"),
+        concurrency=concurrency,
+        batch_size=batch_size,
+        bypass_cache=bypass_cache,
+        progress=progress,
+        scorer=scorer,
     )
-
-    resp = llm.invoke(text).content.strip()
-
-    # Split at first double newline (subject + message)
-    if "\n\n" in resp:
-        parts = resp.split("\n\n", 1)
-        subject = parts[0].strip()
-        message = parts[1].strip()
-    else:
-        subject = "Two Peaks Chai — Hello!"
-        message = resp.strip()
-
-    # Fallback for short or invalid messages
-    if not message or len(message) < 25:
-        message = (
-            f"Hey @{r['username']}! We absolutely love your chai energy — "
-            "thank you for spreading the warmth! Come explore the cozy world of Two Peaks Chai ☕️✨"
-        )
-
-    # Add both email + instagram versions
-    rows.append([
-        time.strftime("%Y-%m-%d %H:%M:%S"),
-        r["username"],
-        "email",
-        subject,
-        message,
-        "QUEUED",
-    ])
-    rows.append([
-        time.strftime("%Y-%m-%d %H:%M:%S"),
-        r["username"],
-        "instagram",
-        subject,
-        message,
-        "QUEUED",
-    ])
-    time.sleep(0.3)
-
-tpl_ws.append_rows(rows, value_input_option="RAW")
-print(f"✅ Templates generated → {len(rows)} total messages added to Marketing_Templates.")
-
-# Final cleanup after adding rows
-clean_placeholder_rows()
\ No newline at end of file
+    progress(f"✅ Templates generated → {stats['rows_written']} total messages added to Marketing_Templates "
+             f"in {stats['batches']} batches ({stats['leads_per_s']} leads/sec, {stats['failed']} failed).")
+
+    # Final cleanup after adding rows
+    if clean_placeholders:
+        clean_placeholder_rows(tpl_ws, progress)
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate personalized outreach for qualified leads")
+    parser.add_argument("--regenerate", action="store_true", help="write fresh copy instead of reusing cached drafts")
+    parser.add_argument("--concurrency", type=int, help="parallel LLM requests (default: TEMPLATE_CONCURRENCY)")
+    parser.add_argument("--batch-size", type=int,
+                        help="leads per Marketing_Templates write (default: TEMPLATE_BATCH_SIZE)")
+    args = parser.parse_args()
+
+    # Load qualified leads (Google Sheets or the local SHEETS_BACKEND)
+    df = pd.DataFrame(get_gateway().worksheet("Qualified_Leads").get_all_records())
+    if df.empty:
+        print("⚠️  No qualified leads data found in 'Qualified_Leads'.")
+        raise SystemExit(0)
+
+    generate_outreach(df, concurrency=args.concurrency, batch_size=args.batch_size, bypass_cache=args.regenerate)
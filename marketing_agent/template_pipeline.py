@@ -0,0 +1,146 @@
+# ------------------------------------------------------------
+# Two Peaks – Concurrent outreach template generation
+# ------------------------------------------------------------
+"""
+Generates personalized outreach for many leads at once.
+
+`BatchScorer` runs in a worker thread and provides bounded parallelism,
+rate limiting, retries and the shared response cache. The calling thread
+consumes results as they finish. It reports progress and hands completed
+rows to `write_rows` in batches of `batch_size`, or every `flush_seconds`,
+so a crash halfway through keeps everything already written.
+
+    stats = generate_templates(leads, tpl_ws.append_rows, concurrency=16, batch_size=50)
+"""
+
+import time, queue, threading
+
+from shared.pipeline_events import print_progress
+
+try:
+    from marketing_agent.batch_scorer import BatchScorer
+except ImportError:  # running as a script from inside marketing_agent/
+    from batch_scorer import BatchScorer
+
+FALLBACK_SUBJECT = "Two Peaks Chai — Hello!"
+CHANNELS = ("email", "instagram")
+
+PROMPT = """
+You are a warm, emotionally intelligent social media copywriter for Two Peaks Chai Co.
+
+Your goal is to write a *personalized, thoughtful outreach message* to user @{username}
+based on their engagement with our brand.
+
+Here’s what we know about them:
+- Their comment: "{comment}"
+- Likes: {likes}
+- Followers: {followers}
+- Reason for scoring: {reason}
+
+Tone: friendly, authentic, and chai-inspired — include warmth, gratitude, and subtle humor.
+Each note should feel hand-crafted, like a genuine human message.
+
+Return two lines:
+1️⃣ A creative subject line (5–8 words, no emojis).
+2️⃣ A personal message (2–3 sentences) that connects to their comment and gently invites them to explore or revisit Two Peaks Chai.
+Separate the two lines with a blank line.
+"""
+
+
+def build_prompt(lead: dict) -> str:
+    return PROMPT.format(username=lead["username"], comment=lead["comment"], likes=lead["likes"],
+                         followers=lead["followers"], reason=lead["reason"])
+
+
+def parse_template(resp: str, username: str) -> tuple[str, str]:
+    """Split the model answer into (subject, message), with the original fallbacks."""
+    resp = (resp or "").strip()
+    # Split at first double newline (subject + message)
+    if "\n\n" in resp:
+        subject, message = (part.strip() for part in resp.split("\n\n", 1))
+    else:
+        subject, message = FALLBACK_SUBJECT, resp
+    # Fallback for short or invalid messages
+    if not message or len(message) < 25:
+        message = (
+            f"Hey @{username}! We absolutely love your chai energy — "
+            "thank you for spreading the warmth! Come explore the cozy world of Two Peaks Chai ☕️✨"
+        )
+    return subject, message
+
+
+def template_rows(lead: dict, subject: str, message: str) -> list[list]:
+    """One QUEUED row per outreach channel (the copy is written once and shared)."""
+    now = time.strftime("%Y-%m-%d %H:%M:%S")
+    return [[now, lead["username"], channel, subject, message, "QUEUED"] for channel in CHANNELS]
+
+
+def generate_templates(leads: list[dict], write_rows, concurrency: int = 16, batch_size: int = 50,
+                       flush_seconds: float = 5.0, bypass_cache: bool = False, progress=print_progress,
+                       model: str = "gpt-4o-mini", temperature: float = 0.6, scorer=None, **scorer_opts) -> dict:
+    """
+    Generate copy for `leads` concurrently and stream finished rows to `write_rows(rows)`.
+
+    `scorer` reuses an existing `BatchScorer` (run at `temperature` and
+    `concurrency`, then restored); otherwise one is built from `concurrency`
+    and `scorer_opts`.
+    Returns stats: leads, ok, failed, rows_written, batches, seconds, leads_per_s.
+    """
+    if scorer is None:
+        scorer = BatchScorer(model=model, temperature=temperature, concurrency=concurrency,
+                             bypass_cache=bypass_cache, **scorer_opts)
+    saved = (scorer.temperature, scorer.concurrency)
+    done = queue.Queue()
+    outcome = {}
+
+    def produce():
+        scorer.temperature, scorer.concurrency = temperature, concurrency
+        try:
+            scorer.run([build_prompt(lead) for lead in leads], on_result=done.put)
+        except Exception as e:  # surfaced to the caller below
+            outcome["error"] = e
+        finally:
+            scorer.temperature, scorer.concurrency = saved
+            done.put(None)
+
+    stats = {"leads": len(leads), "ok": 0, "failed": 0, "rows_written": 0, "batches": 0}
+    buffer, last_flush = [], time.perf_counter()
+
+    def flush():
+        nonlocal buffer, last_flush
+        if buffer:
+            write_rows(buffer)
+            stats["rows_written"] += len(buffer)
+            stats["batches"] += 1
+            buffer = []
+        last_flush = time.perf_counter()
+
+    t0 = time.perf_counter()
+    worker = threading.Thread(target=produce, daemon=True)
+    worker.start()
+    while True:
+        result = done.get()
+        if result is None:
+            break
+        lead = leads[result["index"]]
+        if result["error"]:
+            stats["failed"] += 1
+            progress(f"⚠️ @{lead['username']}: {result['error']}")
+        else:
+            stats["ok"] += 1
+            buffer.extend(template_rows(lead, *parse_template(result["text"], lead["username"])))
+        finished = stats["ok"] + stats["failed"]
+        if finished % max(1, len(leads) // 10) == 0 or finished == len(leads):
+            progress(f"✉️ {finished}/{len(leads)} leads drafted ({stats['failed']} failed)",
+                     done=finished, total=len(leads), failed=stats["failed"])
+        if len(buffer) >= batch_size * len(CHANNELS) or time.perf_counter() - last_flush >= flush_seconds:
+            flush()
+    flush()
+    worker.join()
+    if "error" in outcome:
+        raise outcome["error"]
+
+    stats["seconds"] = round(time.perf_counter() - t0, 3)
+    stats["leads_per_s"] = round(len(leads) / stats["seconds"], 2) if stats["seconds"] else 0.0
+    stats["cache_hits"] = scorer.stats.get("cache_hits", 0)
+    return stats
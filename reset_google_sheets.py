@@ -1,21 +1,7 @@
-import gspread
-from google.oauth2.service_account import Credentials
-import os
+from shared.sheets_gateway import get_gateway
 
-# Load credentials from service_account.json
-SERVICE_ACCOUNT_FILE = os.getenv("GOOGLE_SVC_JSON", "service_account.json")
-SHEET_NAME = os.getenv("SHEETS_SPREADSHEET_NAME", "TwoPeaks_Marketing")
-
-# Authenticate and open the sheet
-creds = Credentials.from_service_account_file(
-    SERVICE_ACCOUNT_FILE,
-    scopes=[
-        "https://www.googleapis.com/auth/spreadsheets",
-        "https://www.googleapis.com/auth/drive"
-    ]
-)
-client = gspread.authorize(creds)
-spreadsheet = client.open(SHEET_NAME)
+# Google Sheets via GOOGLE_SVC_JSON / SHEETS_SPREADSHEET_NAME, or the local SHEETS_BACKEND
+sheets = get_gateway()
 
 # Tabs to clear
 tabs_to_clear = [
@@ -28,7 +14,7 @@ tabs_to_clear = [
 # Function to clear all rows except the header
 def clear_sheet(sheet_name):
     try:
-        worksheet = spreadsheet.worksheet(sheet_name)
+        worksheet = sheets.worksheet(sheet_name)
         all_values = worksheet.get_all_values()
         if all_values:
             header = all_values[0]
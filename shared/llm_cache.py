@@ -0,0 +1,167 @@
+# shared/llm_cache.py
+"""
+Persistent LLM response cache shared by every agent.
+
+Re-running a pipeline (lead scoring, template or email generation, insight
+summaries) sends the same prompts again; this cache answers those from a
+local SQLite file instead of paying for another completion.
+
+- Key: sha256 over model, temperature, messages and any request options
+  that change the output (max_tokens, response_format, ...).
+- TTL: entries older than `LLM_CACHE_TTL` seconds are ignored and dropped.
+- Size bound: past `LLM_CACHE_MAX_ENTRIES`, the least recently used 10%
+  are evicted.
+- Bypass: `bypass=True` (or `LLM_CACHE_BYPASS=1`) skips the lookup but still
+  stores the fresh answer, for creative regeneration. `LLM_CACHE=0` turns
+  the cache off entirely.
+- Stats (hits, misses, writes, evictions) live in the same database, so
+  the control room can show the hit rate across all agent processes.
+
+    cache = get_cache()
+    text = cache.get_or_create("gpt-4o-mini", 0.2, messages, lambda: call_llm(messages))
+    text = cached_invoke(llm, prompt)   # LangChain chat models
+"""
+
+import os, json, time, sqlite3, hashlib, threading
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_CACHE_PATH = os.path.join(BASE_DIR, "data", "llm_cache.sqlite")
+DEFAULT_TTL = 30 * 24 * 3600
+DEFAULT_MAX_ENTRIES = 50000
+
+STAT_NAMES = ("hits", "misses", "writes", "evictions", "bypassed")
+
+
+def cache_key(model: str, temperature, messages, **options) -> str:
+    payload = json.dumps({"model": model, "temperature": temperature, "messages": messages,
+                          "options": options}, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """SQLite-backed response cache with TTL, LRU eviction and persisted stats."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl: float = DEFAULT_TTL,
+                 max_entries: int = DEFAULT_MAX_ENTRIES, enabled: bool = True, bypass: bool = False):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self.bypass = bypass
+        self._lock = threading.Lock()
+        self._db = None
+
+    @property
+    def db(self):
+        if self._db is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("""CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY, model TEXT, temperature REAL, response TEXT,
+                created REAL, last_used REAL, hits INTEGER DEFAULT 0)""")
+            db.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses(last_used)")
+            db.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+            db.executemany("INSERT OR IGNORE INTO stats VALUES (?, 0)", [(n,) for n in STAT_NAMES])
+            self._db = db
+        return self._db
+
+    def _bump(self, name: str, n: int = 1):
+        self.db.execute("UPDATE stats SET value = value + ? WHERE name = ?", (n, name))
+
+    # -----------------------------------------------------
+    # Lookup / store
+    # -----------------------------------------------------
+    def get(self, model: str, temperature, messages, bypass: bool = False, **options) -> str | None:
+        if not self.enabled:
+            return None
+        with self._lock:
+            if bypass or self.bypass:
+                self._bump("bypassed")
+                return None
+            key = cache_key(model, temperature, messages, **options)
+            now = time.time()
+            row = self.db.execute("SELECT response, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and now - row[1] <= self.ttl:
+                self.db.execute("UPDATE responses SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key))
+                self._bump("hits")
+                return row[0]
+            if row:
+                self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._bump("misses")
+            return None
+
+    def put(self, model: str, temperature, messages, response: str, **options):
+        if not self.enabled or response is None:
+            return
+        with self._lock:
+            now = time.time()
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses (key, model, temperature, response, created, last_used, hits) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (cache_key(model, temperature, messages, **options), model, temperature, response, now, now))
+            self._bump("writes")
+            self._evict()
+
+    def _evict(self):
+        count = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        drop = count - self.max_entries + max(1, self.max_entries // 10)
+        self.db.execute("DELETE FROM responses WHERE key IN "
+                        "(SELECT key FROM responses ORDER BY last_used LIMIT ?)", (drop,))
+        self._bump("evictions", drop)
+
+    def get_or_create(self, model: str, temperature, messages, create, bypass: bool = False, **options) -> str:
+        """Return the cached response, or call `create()` and cache its text."""
+        cached = self.get(model, temperature, messages, bypass=bypass, **options)
+        if cached is not None:
+            return cached
+        response = create()
+        self.put(model, temperature, messages, response, **options)
+        return response
+
+    # -----------------------------------------------------
+    # Maintenance / reporting
+    # -----------------------------------------------------
+    def purge_expired(self) -> int:
+        with self._lock:
+            cur = self.db.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+            return cur.rowcount
+
+    def clear(self):
+        with self._lock:
+            self.db.execute("DELETE FROM responses")
+            self.db.execute("UPDATE stats SET value = 0")
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.db.execute("SELECT name, value FROM stats").fetchall())
+            stats["entries"] = self.db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        lookups = stats.get("hits", 0) + stats.get("misses", 0)
+        stats["hit_rate"] = stats.get("hits", 0) / lookups if lookups else 0.0
+        return stats
+
+
+_cache = None
+
+def get_cache() -> LLMCache:
+    """Process-wide cache; the `LLM_CACHE*` settings are read when it is first built (after `load_dotenv()`)."""
+    global _cache
+    if _cache is None:
+        _cache = LLMCache(path=os.getenv("LLM_CACHE_PATH", DEFAULT_CACHE_PATH),
+                          ttl=float(os.getenv("LLM_CACHE_TTL", str(DEFAULT_TTL))),
+                          max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", str(DEFAULT_MAX_ENTRIES))),
+                          enabled=os.getenv("LLM_CACHE", "1") == "1",
+                          bypass=os.getenv("LLM_CACHE_BYPASS", "0") == "1")
+    return _cache
+
+
+def cached_invoke(llm, prompt: str, bypass: bool = False) -> str:
+    """`llm.invoke(prompt).content` for a LangChain chat model, through the shared cache."""
+    model = getattr(llm, "model_name", None) or getattr(llm, "model", "unknown")
+    messages = [{"role": "user", "content": prompt}]
+    return get_cache().get_or_create(
+        model, getattr(llm, "temperature", None), messages,
+        lambda: getattr(llm.invoke(prompt), "content", ""), bypass=bypass)
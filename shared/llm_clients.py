@@ -0,0 +1,55 @@
+# shared/llm_clients.py
+"""
+One place that decides which OpenAI-compatible endpoint the agents talk to.
+
+Every agent builds its clients here instead of calling `OpenAI(...)` /
+`ChatOpenAI(...)` with its own settings, so one switch redirects them all:
+
+- `LLM_STUB=1` points every client at the local stub server
+  (`benchmarks/stub_openai_server.py`, `LLM_STUB_URL`, default
+  http://127.0.0.1:8089/v1) with a dummy key. No money is spent and no
+  request leaves the machine.
+- Otherwise `OPENAI_BASE_URL` (if set) and `OPENAI_API_KEY` are used, as
+  the OpenAI SDK does by default.
+
+Settings are read when a client is built, after the caller's `load_dotenv()`.
+
+    client = openai_client()
+    llm = chat_model("gpt-4o-mini", temperature=0.4)
+"""
+
+import os
+
+DEFAULT_STUB_URL = "http://127.0.0.1:8089/v1"
+
+
+def llm_settings() -> dict:
+    """{"api_key", "base_url"} for the configured endpoint (base_url None = api.openai.com)."""
+    if os.getenv("LLM_STUB", "0") == "1":
+        return {"api_key": os.getenv("OPENAI_API_KEY") or "stub",
+                "base_url": os.getenv("LLM_STUB_URL", DEFAULT_STUB_URL)}
+    return {"api_key": os.getenv("OPENAI_API_KEY"), "base_url": os.getenv("OPENAI_BASE_URL") or None}
+
+
+def openai_client(**kwargs):
+    """Synchronous `openai.OpenAI` client for the configured endpoint."""
+    from openai import OpenAI
+    return OpenAI(**{**llm_settings(), **kwargs})
+
+
+def async_openai_client(**kwargs):
+    """`openai.AsyncOpenAI` client for the configured endpoint (pass `http_client=` to share a pool)."""
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(**{**llm_settings(), **kwargs})
+
+
+def chat_model(model: str = "gpt-4o-mini", temperature: float = 0.2, **kwargs):
+    """LangChain `ChatOpenAI` for the configured endpoint."""
+    from langchain_openai import ChatOpenAI
+    return ChatOpenAI(model=model, temperature=temperature, **{**llm_settings(), **kwargs})
+
+
+def embeddings_model(model: str = "text-embedding-3-small", **kwargs):
+    """LangChain `OpenAIEmbeddings` for the configured endpoint."""
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings(model=model, **{**llm_settings(), **kwargs})
@@ -0,0 +1,97 @@
+# shared/pipeline_events.py
+"""
+Structured progress events for multi-stage agent pipelines.
+
+Stage functions report through a `progress(message, **counts)` callback. The
+command-line default, `print_progress`, prints the line and drops the
+counts. `PipelineEvents` turns the same calls into events and adds stage
+start and finish with timings. Every event goes to each listener (e.g. the
+Streamlit renderer) as it happens and is also kept in `.events`:
+
+    {"event": "stage_started",     "stage": "scoring", "ts": ...}
+    {"event": "progress",          "stage": "scoring", "message": "...", "done": 10, "total": 20, "elapsed_s": 0.41, "ts": ...}
+    {"event": "stage_finished",    "stage": "scoring", "seconds": 0.83, "counts": {"processed": 20}, "ts": ...}
+    {"event": "stage_failed",      "stage": "scoring", "seconds": 0.2, "error": "...", "ts": ...}
+    {"event": "pipeline_finished", "seconds": 1.9, "counts": {...}, "ts": ...}
+
+    events = PipelineEvents(print_event)
+    with events.stage("scoring") as stage:
+        leads, stats = score_leads(new_rows, progress=stage.progress)
+        stage.counts.update(processed=stats["processed"])
+"""
+
+import time, threading
+from contextlib import contextmanager
+
+
+def print_progress(message: str = "", **counts):
+    """Default `progress` callback for the command-line agents: print the line, ignore the counts."""
+    if message:
+        print(message)
+
+
+def print_event(event: dict):
+    """Listener that prints events as one line each (for scripts and logs)."""
+    if event["event"] == "progress":
+        if event.get("message"):
+            print(event["message"])
+    elif event["event"] == "stage_started":
+        print(f"▶️ {event['stage']} started")
+    elif event["event"] == "stage_finished":
+        print(f"✅ {event['stage']} finished in {event['seconds']}s {event['counts']}")
+    elif event["event"] == "stage_failed":
+        print(f"❌ {event['stage']} failed after {event['seconds']}s: {event['error']}")
+    elif event["event"] == "pipeline_finished":
+        print(f"🏁 Pipeline done in {event['seconds']}s {event['counts']}")
+
+
+class _Stage:
+    """Handle for one running stage: `progress` callback plus the counts reported when it finishes."""
+
+    def __init__(self, events, name: str):
+        self.events = events
+        self.name = name
+        self.counts = {}
+        self.started = time.perf_counter()
+
+    def progress(self, message: str = "", **counts):
+        self.events.emit("progress", stage=self.name, message=message,
+                         elapsed_s=round(time.perf_counter() - self.started, 3), **counts)
+
+
+class PipelineEvents:
+    """Collects pipeline events and fans them out to listeners."""
+
+    def __init__(self, *listeners):
+        self.listeners = list(listeners)
+        self.events = []
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def emit(self, event: str, **fields) -> dict:
+        record = {"event": event, "ts": round(time.time(), 3), **fields}
+        with self._lock:
+            self.events.append(record)
+        for listener in self.listeners:
+            listener(record)
+        return record
+
+    @contextmanager
+    def stage(self, name: str):
+        handle = _Stage(self, name)
+        self.emit("stage_started", stage=name)
+        try:
+            yield handle
+        except Exception as e:
+            self.emit("stage_failed", stage=name, seconds=round(time.perf_counter() - handle.started, 3),
+                      error=f"{type(e).__name__}: {e}")
+            raise
+        self.emit("stage_finished", stage=name, seconds=round(time.perf_counter() - handle.started, 3),
+                  counts=dict(handle.counts))
+
+    def finish(self, **counts) -> dict:
+        return self.emit("pipeline_finished", seconds=round(time.perf_counter() - self.started, 3), counts=counts)
+
+    def seconds(self) -> dict:
+        """{stage: seconds} for the stages that finished."""
+        return {e["stage"]: e["seconds"] for e in self.events if e["event"] == "stage_finished"}
@@ -0,0 +1,196 @@
+# shared/sheet_cache.py
+"""
+Read-through worksheet snapshots for dashboard renders.
+
+Each Streamlit rerun used to call `get_all_records()` on every worksheet a
+tab shows. This cache keeps one `get_all_values()` snapshot per worksheet and
+only re-reads it when the spreadsheet actually changed:
+
+- Change detection uses the Drive `modifiedTime` of the spreadsheet. It is
+  one small request that covers every worksheet, and it is sent at most once
+  per `SHEETS_REVISION_CHECK_SECONDS`. Within that window, reads are local.
+  If the Drive call fails, snapshots expire when the window ends.
+- Writes made through the cache (`append_rows`, `update_rows_by_key`,
+  `update_row`) re-check the revision first, so they never act on a snapshot
+  that already misses someone else's edit. The written snapshot is then
+  patched in place and the revision is re-read, so the app's own write does
+  not force a reload of every worksheet.
+
+    cache = get_sheet_cache()
+    df = cache.frame("Qualified_Leads")
+    cache.update_status_by_order_ids("Fulfillment_Templates", ids, "APPROVED")
+"""
+
+import os, time, threading
+
+import pandas as pd
+from gspread.utils import numericise_all, to_records, rowcol_to_a1
+
+from shared.sheets_gateway import get_gateway
+from shared.sheets_bulk import update_rows_by_key
+
+SHEETS_REVISION_CHECK_SECONDS = float(os.getenv("SHEETS_REVISION_CHECK_SECONDS", "5"))
+
+
+def records_from_values(values: list[list]) -> list[dict]:
+    """Same result as `Worksheet.get_all_records()` on the given `get_all_values()` output."""
+    if not values:
+        return []
+    width = len(values[0])
+    rows = [numericise_all((row + [""] * width)[:width]) for row in values[1:]]
+    return to_records(values[0], rows)
+
+
+class WorksheetCache:
+    """Per-worksheet value snapshots, keyed by title and tagged with the revision they were read at."""
+
+    def __init__(self, gateway=None, check_interval: float = SHEETS_REVISION_CHECK_SECONDS):
+        self._gateway = gateway
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._snapshots = {}          # title -> {"values": [[...]], "revision": str}
+        self._revision = None
+        self._checked_at = 0.0
+        self.stats = {"hits": 0, "reloads": 0, "revision_checks": 0}
+
+    @property
+    def gateway(self):
+        return self._gateway or get_gateway()
+
+    # -----------------------------------------------------
+    # Revision
+    # -----------------------------------------------------
+    def revision(self, force: bool = False) -> str:
+        """Spreadsheet revision, re-checked at most every `check_interval` seconds."""
+        with self._lock:
+            now = time.monotonic()
+            if force or self._revision is None or now - self._checked_at >= self.check_interval:
+                try:
+                    self._revision = self.gateway.spreadsheet.get_lastUpdateTime()
+                except Exception:
+                    # No Drive access: fall back to time-boxed snapshots
+                    self._revision = f"unchecked-{now}"
+                self._checked_at = now
+                self.stats["revision_checks"] += 1
+            return self._revision
+
+    def _before_write(self) -> str:
+        """Fresh revision taken right before our own write; `_after_write` compares snapshots against it."""
+        return self.revision(force=True)
+
+    def _after_write(self, before: str):
+        """
+        Re-read the revision after our own write and carry snapshots that were
+        current before it over to the new one. Snapshots tagged with an older
+        revision miss some other edit, so they are dropped and reloaded.
+        """
+        current = self.revision(force=True)
+        for name in list(self._snapshots):
+            snap = self._snapshots[name]
+            if snap["revision"] == before:
+                snap["revision"] = current
+            else:
+                del self._snapshots[name]
+
+    # -----------------------------------------------------
+    # Reads
+    # -----------------------------------------------------
+    def values(self, title: str, headers: list[str] | None = None) -> list[list]:
+        """`get_all_values()` for `title`, from the snapshot unless the sheet changed."""
+        with self._lock:
+            revision = self.revision()
+            snap = self._snapshots.get(title)
+            if snap and snap["revision"] == revision:
+                self.stats["hits"] += 1
+                return snap["values"]
+            values = self.gateway.worksheet(title, headers=headers).get_all_values()
+            self._snapshots[title] = {"values": values, "revision": revision}
+            self.stats["reloads"] += 1
+            return values
+
+    def records(self, title: str, headers: list[str] | None = None) -> list[dict]:
+        return records_from_values(self.values(title, headers))
+
+    def frame(self, title: str, headers: list[str] | None = None) -> pd.DataFrame:
+        return pd.DataFrame(self.records(title, headers))
+
+    # -----------------------------------------------------
+    # Writes (update the snapshot in place)
+    # -----------------------------------------------------
+    def append_rows(self, title: str, rows: list[list], headers: list[str] | None = None):
+        if not rows:
+            return
+        with self._lock:
+            before = self._before_write()
+            self.gateway.worksheet(title, headers=headers).append_rows(rows, value_input_option="RAW")
+            snap = self._snapshots.get(title)
+            if snap and snap["revision"] == before:
+                snap["values"].extend([["" if v is None else str(v) for v in row] for row in rows])
+            self._after_write(before)
+
+    def update_rows_by_key(self, title: str, key_column: str, updates: dict, where: dict | None = None) -> dict:
+        """`sheets_bulk.update_rows_by_key` on the snapshot, then the same edits applied locally."""
+        with self._lock:
+            before = self._before_write()
+            data = self.values(title)  # reloads if the sheet changed since the snapshot
+            report = update_rows_by_key(self.gateway.worksheet(title), key_column, updates, data=data, where=where)
+            headers = [h.strip().lower() for h in data[0]] if data else []
+            for key, result in report.items():
+                if result["result"] != "updated":
+                    continue
+                for r in result["rows"]:
+                    for column, value in updates[key].items():
+                        self._set_cell(data, r, headers.index(column.lower()), value)
+            if any(r["result"] == "updated" for r in report.values()):
+                self._after_write(before)
+            return report
+
+    def update_status_by_order_ids(self, title: str, order_ids, new_status: str, where: dict | None = None,
+                                   **extra_columns) -> dict:
+        values = {"status": new_status, **extra_columns}
+        return self.update_rows_by_key(title, "order_id", {str(oid): values for oid in order_ids}, where=where)
+
+    def update_row(self, title: str, row: int, values: dict) -> int:
+        """Set named columns on one 1-based sheet row in a single write; returns cells written."""
+        with self._lock:
+            before = self._before_write()
+            data = self.values(title)
+            headers = [h.strip().lower() for h in data[0]] if data else []
+            cells = []
+            for column, value in values.items():
+                col = headers.index(column.lower())
+                cells.append({"range": rowcol_to_a1(row, col + 1), "values": [[value]]})
+            if cells:
+                self.gateway.worksheet(title).batch_update(cells, value_input_option="RAW")
+                for column, value in values.items():
+                    self._set_cell(data, row, headers.index(column.lower()), value)
+                self._after_write(before)
+            return len(cells)
+
+    @staticmethod
+    def _set_cell(data: list[list], row: int, col: int, value):
+        while len(data) < row:
+            data.append([])
+        current = data[row - 1]
+        if len(current) <= col:
+            current.extend([""] * (col + 1 - len(current)))
+        current[col] = "" if value is None else str(value)
+
+    def invalidate(self, title: str | None = None):
+        with self._lock:
+            if title is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(title, None)
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_sheet_cache() -> WorksheetCache:
+    """Process-wide snapshot cache on top of the shared Sheets gateway."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = WorksheetCache()
+        return _cache
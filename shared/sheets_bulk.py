@@ -0,0 +1,100 @@
+# shared/sheets_bulk.py
+"""
+Bulk Google Sheets operations that cost O(1) API requests instead of O(rows).
+"""
+
+from gspread.utils import rowcol_to_a1
+
+
+def coalesce_rows(rows) -> list[tuple[int, int]]:
+    """Group 1-based row numbers into inclusive (start, end) runs, bottom-most run first."""
+    runs = []
+    for r in sorted(set(rows)):
+        if runs and r == runs[-1][1] + 1:
+            runs[-1][1] = r
+        else:
+            runs.append([r, r])
+    return [(start, end) for start, end in reversed(runs)]
+
+
+def delete_rows_bulk(ws, rows) -> int:
+    """
+    Delete the given 1-based rows with a single `batchUpdate`.
+
+    Contiguous rows become one `deleteDimension` range. Ranges are sent
+    bottom-up so each deletion leaves the indices of the remaining ranges
+    unchanged. Returns the number of rows deleted.
+    """
+    runs = coalesce_rows(rows)
+    if not runs:
+        return 0
+    ws.spreadsheet.batch_update({"requests": [
+        {"deleteDimension": {"range": {
+            "sheetId": ws.id, "dimension": "ROWS", "startIndex": start - 1, "endIndex": end,
+        }}}
+        for start, end in runs
+    ]})
+    return sum(end - start + 1 for start, end in runs)
+
+
+def update_rows_by_key(ws, key_column: str, updates: dict, data: list[list] | None = None,
+                       where: dict | None = None) -> dict:
+    """
+    Set cells on the rows whose `key_column` matches, in one `values:batchUpdate`.
+
+    `updates` maps key -> {column_name: new_value}. `where` limits the match
+    to rows whose current cells equal the given values (case-insensitive),
+    e.g. {"status": "QUEUED"} so other rows sharing the key are left alone.
+    `data` may pass an existing `ws.get_all_values()` result to save the read.
+    Returns a per-key report: "updated" (with the rows touched), "unchanged"
+    (values were already set), "not_found", or "missing_column".
+    """
+    data = ws.get_all_values() if data is None else data
+    report = {key: {"result": "not_found", "rows": []} for key in updates}
+    if not data or not updates:
+        return report
+    headers = [h.strip().lower() for h in data[0]]
+    if key_column.lower() not in headers:
+        return {key: {"result": "missing_column", "rows": []} for key in updates}
+    key_idx = headers.index(key_column.lower())
+    where = where or {}
+    if any(c.lower() not in headers for c in where):
+        return {key: {"result": "missing_column", "rows": [], "columns": list(where)} for key in updates}
+    conditions = [(headers.index(c.lower()), str(v).strip().lower()) for c, v in where.items()]
+
+    # key -> sheet row numbers (passing `where`), built once
+    index = {}
+    for i, row in enumerate(data[1:], start=2):
+        if len(row) > key_idx and all((row[c] if c < len(row) else "").strip().lower() == v
+                                      for c, v in conditions):
+            index.setdefault(row[key_idx], []).append(i)
+
+    cells = []
+    for key, values in updates.items():
+        rows = index.get(str(key), [])
+        if not rows:
+            continue
+        unknown = [c for c in values if c.lower() not in headers]
+        if unknown:
+            report[key] = {"result": "missing_column", "rows": rows, "columns": unknown}
+            continue
+        changed = False
+        for r in rows:
+            current = data[r - 1]
+            for column, value in values.items():
+                col = headers.index(column.lower())
+                if (current[col] if col < len(current) else "") != str(value):
+                    cells.append({"range": rowcol_to_a1(r, col + 1), "values": [[value]]})
+                    changed = True
+        report[key] = {"result": "updated" if changed else "unchanged", "rows": rows}
+
+    if cells:
+        ws.batch_update(cells, value_input_option="RAW")
+    return report
+
+
+def update_status_by_order_ids(ws, order_ids, new_status: str, data: list[list] | None = None,
+                               where: dict | None = None, **extra_columns) -> dict:
+    """Bulk-set `status` (plus any `extra_columns`) for every row whose order_id is listed (and matches `where`)."""
+    values = {"status": new_status, **extra_columns}
+    return update_rows_by_key(ws, "order_id", {str(oid): values for oid in order_ids}, data=data, where=where)
@@ -0,0 +1,161 @@
+# shared/sheets_gateway.py
+"""
+Process-wide Google Sheets gateway.
+
+Every tab used to read the service-account file, authorize gspread, open the
+spreadsheet and look up the worksheet on each call. That is several HTTP
+round-trips before any data moves. The gateway does this setup once per
+process:
+
+- Credentials are loaded once. gspread's `AuthorizedSession` refreshes the
+  access token when it expires and keeps a pooled `requests` session, so
+  connections are reused between calls.
+- The spreadsheet handle is opened once. All worksheet handles come from a
+  single metadata fetch and are cached by title. A missing worksheet is
+  created with its headers.
+- Every HTTP request is counted by kind (read / write / metadata / drive).
+  `reset_api_calls()` at the top of a page render and `api_calls()` at the
+  end give the cost of that render.
+- `SHEETS_BACKEND=memory|sqlite` swaps Google for the local emulator in
+  `shared/sheets_local.py` (same worksheet API, injected latency), so every
+  agent can run offline.
+
+    ws = get_gateway().worksheet("Qualified_Leads")
+    ws = get_gateway().worksheet("Fulfillment_Templates", headers=[...])
+"""
+
+import os, threading
+from collections import Counter
+
+import gspread
+from gspread.http_client import HTTPClient
+from google.oauth2.service_account import Credentials
+
+SCOPES = [
+    "https://www.googleapis.com/auth/spreadsheets",
+    "https://www.googleapis.com/auth/drive",
+]
+
+_calls = Counter()
+_calls_lock = threading.Lock()
+
+
+def _call_kind(method: str, endpoint: str) -> str:
+    if "googleapis.com/drive" in endpoint:
+        return "drive"
+    if "/values" in endpoint:
+        return "read" if method.lower() == "get" else "write"
+    if endpoint.endswith(":batchUpdate"):
+        return "write"
+    return "metadata"
+
+
+def record_api_call(kind: str):
+    with _calls_lock:
+        _calls[kind] += 1
+        _calls["total"] += 1
+
+
+class CountingHTTPClient(HTTPClient):
+    """gspread HTTP client that counts every request it sends."""
+
+    def request(self, method, endpoint, *args, **kwargs):
+        record_api_call(_call_kind(method, endpoint))
+        return super().request(method, endpoint, *args, **kwargs)
+
+
+def api_calls() -> dict:
+    """Sheets/Drive requests since the last `reset_api_calls()`, by kind plus "total"."""
+    with _calls_lock:
+        return {"total": 0, **_calls}
+
+
+def reset_api_calls() -> dict:
+    """Zero the counters and return the values they had."""
+    with _calls_lock:
+        previous = {"total": 0, **_calls}
+        _calls.clear()
+    return previous
+
+
+class SheetsGateway:
+    """One authorized client, spreadsheet handle and worksheet map per process."""
+
+    def __init__(self, spreadsheet_name: str | None = None, service_account: str | None = None,
+                 backend: str | None = None):
+        self.spreadsheet_name = spreadsheet_name or os.getenv("SHEETS_SPREADSHEET_NAME", "TwoPeaks_Marketing")
+        self.service_account = service_account or os.getenv("GOOGLE_SVC_JSON", "service_account.json")
+        self.backend = backend or os.getenv("SHEETS_BACKEND", "gspread")
+        self._lock = threading.RLock()
+        self._client = None
+        self._spreadsheet = None
+        self._worksheets = None
+
+    @property
+    def client(self) -> gspread.Client:
+        with self._lock:
+            if self._client is None:
+                creds = Credentials.from_service_account_file(self.service_account, scopes=SCOPES)
+                self._client = gspread.authorize(creds, http_client=CountingHTTPClient)
+            return self._client
+
+    @property
+    def spreadsheet(self) -> gspread.Spreadsheet:
+        with self._lock:
+            if self._spreadsheet is None:
+                if self.backend == "gspread":
+                    self._spreadsheet = self.client.open(self.spreadsheet_name)
+                else:
+                    from shared.sheets_local import open_local_spreadsheet
+                    self._spreadsheet = open_local_spreadsheet(self.spreadsheet_name, self.backend)
+            return self._spreadsheet
+
+    def _worksheet_map(self) -> dict:
+        if self._worksheets is None:
+            self._worksheets = {ws.title: ws for ws in self.spreadsheet.worksheets()}
+        return self._worksheets
+
+    def worksheet(self, title: str, headers: list[str] | None = None) -> gspread.Worksheet:
+        """
+        Cached worksheet handle by title.
+
+        If the worksheet does not exist and `headers` is given, it is created
+        with that header row. Otherwise `gspread.exceptions.WorksheetNotFound`
+        is raised.
+        """
+        with self._lock:
+            worksheets = self._worksheet_map()
+            if title not in worksheets:
+                if headers is None:
+                    raise gspread.exceptions.WorksheetNotFound(title)
+                ws = self.spreadsheet.add_worksheet(title=title, rows="1000", cols=str(len(headers) + 2))
+                ws.append_row(headers)
+                worksheets[title] = ws
+            return worksheets[title]
+
+    def replace_worksheet(self, title: str, rows: int = 100, cols: int = 10) -> gspread.Worksheet:
+        """Delete `title` if it exists and create it again empty (for full-report tabs)."""
+        with self._lock:
+            worksheets = self._worksheet_map()
+            if title in worksheets:
+                self.spreadsheet.del_worksheet(worksheets.pop(title))
+            ws = self.spreadsheet.add_worksheet(title=title, rows=rows, cols=cols)
+            worksheets[title] = ws
+            return ws
+
+    def invalidate(self):
+        """Drop the cached worksheet map, e.g. after a sheet was deleted or renamed elsewhere."""
+        with self._lock:
+            self._worksheets = None
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+def get_gateway() -> SheetsGateway:
+    """Process-wide gateway using SHEETS_SPREADSHEET_NAME / GOOGLE_SVC_JSON / SHEETS_BACKEND."""
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = SheetsGateway()
+        return _gateway
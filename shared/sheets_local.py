@@ -0,0 +1,499 @@
+# shared/sheets_local.py
+"""
+Local stand-in for a Google spreadsheet, for offline runs and benchmarks.
+
+`LocalSpreadsheet` / `LocalWorksheet` implement the subset of the gspread API
+the agents use, with the same semantics: 1-based rows and columns, values
+stored and returned as text, `get_all_values()` padded to a rectangle,
+`append_rows()` writing after the last non-empty row, and `row_count`
+growing on append and shrinking on `deleteDimension`. Missing worksheets
+raise `gspread.exceptions.WorksheetNotFound`.
+
+Two stores sit underneath:
+- `MemoryStore`: plain lists, shared by every handle in the process.
+- `SqliteStore`: one row per sheet row in a SQLite file, so separate
+  processes (the dashboard and the agent scripts) see the same data.
+
+Every call that would be an HTTP request against Google counts toward the
+shared Sheets counters and sleeps for the injected latency
+(`SHEETS_LATENCY_MS` plus uniform `SHEETS_LATENCY_JITTER_MS`), so
+benchmarks see realistic call counts and timing.
+
+Select it with `SHEETS_BACKEND=memory` or `SHEETS_BACKEND=sqlite`
+(`SHEETS_LOCAL_PATH` sets the SQLite file); `get_gateway()` does the rest.
+"""
+
+import os, json, time, random, sqlite3, threading
+from contextlib import contextmanager
+
+from gspread.exceptions import WorksheetNotFound
+from gspread.utils import a1_range_to_grid_range, numericise_all, to_records
+
+from shared.sheets_gateway import record_api_call
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_LOCAL_PATH = os.path.join(BASE_DIR, "data", "sheets_local.sqlite")
+
+
+def cell_text(value) -> str:
+    """How Sheets stores a written value when it is read back as formatted text."""
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    return str(value)
+
+
+def _trim(row: list) -> list:
+    row = list(row)
+    while row and row[-1] == "":
+        row.pop()
+    return row
+
+
+# ------------------------------------------------------------
+# Stores
+# ------------------------------------------------------------
+class MemoryStore:
+    """All spreadsheets of the process as nested lists."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._books = {}      # book -> {"modified": float, "sheets": {id: {...}}}
+        self._next_id = 1
+
+    def _book(self, book: str) -> dict:
+        return self._books.setdefault(book, {"modified": time.time(), "sheets": {}})
+
+    def _sheet(self, book: str, sheet_id: int) -> dict:
+        return self._book(book)["sheets"][sheet_id]
+
+    def _touch(self, book: str):
+        meta = self._book(book)
+        meta["modified"] = max(time.time(), meta["modified"] + 1e-6)
+
+    def modified(self, book: str) -> float:
+        with self._lock:
+            return self._book(book)["modified"]
+
+    def list_sheets(self, book: str) -> list[dict]:
+        with self._lock:
+            return [{"id": i, "title": s["title"], "rows": s["rows"], "cols": s["cols"]}
+                    for i, s in self._book(book)["sheets"].items()]
+
+    def add_sheet(self, book: str, title: str, rows: int, cols: int) -> int:
+        with self._lock:
+            sheet_id, self._next_id = self._next_id, self._next_id + 1
+            self._book(book)["sheets"][sheet_id] = {"title": title, "rows": rows, "cols": cols, "grid": []}
+            self._touch(book)
+            return sheet_id
+
+    def drop_sheet(self, book: str, sheet_id: int):
+        with self._lock:
+            self._book(book)["sheets"].pop(sheet_id, None)
+            self._touch(book)
+
+    def read(self, book: str, sheet_id: int, start: int = 1, end: int | None = None) -> list[list[str]]:
+        """Rows start..end (1-based, inclusive), trailing empty rows dropped."""
+        with self._lock:
+            grid = self._sheet(book, sheet_id)["grid"]
+            rows = [list(r) for r in grid[start - 1:end]]
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def last_row(self, book: str, sheet_id: int) -> int:
+        with self._lock:
+            grid = self._sheet(book, sheet_id)["grid"]
+            n = len(grid)
+            while n and not grid[n - 1]:
+                n -= 1
+            return n
+
+    def write(self, book: str, sheet_id: int, cells: list[tuple[int, int, str]]):
+        with self._lock:
+            sheet = self._sheet(book, sheet_id)
+            grid = sheet["grid"]
+            for r, c, value in cells:
+                while len(grid) < r:
+                    grid.append([])
+                row = grid[r - 1]
+                if len(row) < c:
+                    row.extend([""] * (c - len(row)))
+                row[c - 1] = value
+                grid[r - 1] = _trim(row)
+                sheet["rows"] = max(sheet["rows"], r)
+                sheet["cols"] = max(sheet["cols"], c)
+            self._touch(book)
+
+    def delete_rows(self, book: str, sheet_id: int, start: int, end: int):
+        with self._lock:
+            sheet = self._sheet(book, sheet_id)
+            del sheet["grid"][start - 1:end]
+            sheet["rows"] = max(1, sheet["rows"] - (end - start + 1))
+            self._touch(book)
+
+
+class SqliteStore:
+    """Spreadsheets persisted as one SQLite row per sheet row (JSON list of cell texts)."""
+
+    def __init__(self, path: str | None = None):
+        path = path or os.getenv("SHEETS_LOCAL_PATH", DEFAULT_LOCAL_PATH)
+        self.path = path
+        self._lock = threading.RLock()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("CREATE TABLE IF NOT EXISTS books (book TEXT PRIMARY KEY, modified REAL)")
+        db.execute("""CREATE TABLE IF NOT EXISTS sheets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, book TEXT, title TEXT, rows INTEGER, cols INTEGER,
+            UNIQUE (book, title))""")
+        db.execute("""CREATE TABLE IF NOT EXISTS cells (
+            sheet_id INTEGER, r INTEGER, data TEXT, PRIMARY KEY (sheet_id, r))""")
+        self.db = db
+
+    def _touch(self, book: str):
+        self.db.execute("INSERT INTO books VALUES (?, ?) ON CONFLICT (book) "
+                        "DO UPDATE SET modified = MAX(excluded.modified, modified + 0.000001)", (book, time.time()))
+
+    @contextmanager
+    def _tx(self):
+        with self._lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.db
+            except BaseException:
+                self.db.execute("ROLLBACK")
+                raise
+            self.db.execute("COMMIT")
+
+    def modified(self, book: str) -> float:
+        with self._lock:
+            row = self.db.execute("SELECT modified FROM books WHERE book = ?", (book,)).fetchone()
+            if row is None:
+                self._touch(book)
+                return self.modified(book)
+            return row[0]
+
+    def list_sheets(self, book: str) -> list[dict]:
+        with self._lock:
+            return [{"id": i, "title": t, "rows": r, "cols": c} for i, t, r, c in self.db.execute(
+                "SELECT id, title, rows, cols FROM sheets WHERE book = ? ORDER BY id", (book,))]
+
+    def add_sheet(self, book: str, title: str, rows: int, cols: int) -> int:
+        with self._lock:
+            cur = self.db.execute("INSERT INTO sheets (book, title, rows, cols) VALUES (?, ?, ?, ?)",
+                                  (book, title, rows, cols))
+            self._touch(book)
+            return cur.lastrowid
+
+    def drop_sheet(self, book: str, sheet_id: int):
+        with self._tx() as db:
+            db.execute("DELETE FROM cells WHERE sheet_id = ?", (sheet_id,))
+            db.execute("DELETE FROM sheets WHERE id = ?", (sheet_id,))
+            self._touch(book)
+
+    def read(self, book: str, sheet_id: int, start: int = 1, end: int | None = None) -> list[list[str]]:
+        with self._lock:
+            stored = self.db.execute(
+                "SELECT r, data FROM cells WHERE sheet_id = ? AND r >= ? AND r <= ? ORDER BY r",
+                (sheet_id, start, end if end is not None else 2**62)).fetchall()
+        rows, expected = [], start
+        for r, data in stored:
+            rows.extend([] for _ in range(r - expected))
+            rows.append(json.loads(data))
+            expected = r + 1
+        return rows
+
+    def last_row(self, book: str, sheet_id: int) -> int:
+        with self._lock:
+            return self.db.execute("SELECT COALESCE(MAX(r), 0) FROM cells WHERE sheet_id = ?",
+                                   (sheet_id,)).fetchone()[0]
+
+    def write(self, book: str, sheet_id: int, cells: list[tuple[int, int, str]]):
+        by_row = {}
+        for r, c, value in cells:
+            by_row.setdefault(r, []).append((c, value))
+        with self._tx() as db:
+            existing = {}
+            rows_list = sorted(by_row)
+            for i in range(0, len(rows_list), 500):
+                chunk = rows_list[i:i + 500]
+                existing.update(db.execute(
+                    f"SELECT r, data FROM cells WHERE sheet_id = ? AND r IN ({','.join('?' * len(chunk))})",
+                    (sheet_id, *chunk)).fetchall())
+            upserts, deletes, max_col = [], [], 0
+            for r, updates in by_row.items():
+                row = json.loads(existing[r]) if r in existing else []
+                for c, value in updates:
+                    if len(row) < c:
+                        row.extend([""] * (c - len(row)))
+                    row[c - 1] = value
+                    max_col = max(max_col, c)
+                row = _trim(row)
+                if row:
+                    upserts.append((sheet_id, r, json.dumps(row, ensure_ascii=False)))
+                else:
+                    deletes.append((sheet_id, r))
+            db.executemany("INSERT OR REPLACE INTO cells VALUES (?, ?, ?)", upserts)
+            db.executemany("DELETE FROM cells WHERE sheet_id = ? AND r = ?", deletes)
+            db.execute("UPDATE sheets SET rows = MAX(rows, ?), cols = MAX(cols, ?) WHERE id = ?",
+                       (max(by_row, default=0), max_col, sheet_id))
+            self._touch(book)
+
+    def delete_rows(self, book: str, sheet_id: int, start: int, end: int):
+        n = end - start + 1
+        with self._tx() as db:
+            db.execute("DELETE FROM cells WHERE sheet_id = ? AND r BETWEEN ? AND ?", (sheet_id, start, end))
+            # Two steps so the shifted keys never collide with rows not yet moved
+            db.execute("UPDATE cells SET r = -(r - ?) WHERE sheet_id = ? AND r > ?", (n, sheet_id, end))
+            db.execute("UPDATE cells SET r = -r WHERE sheet_id = ? AND r < 0", (sheet_id,))
+            db.execute("UPDATE sheets SET rows = MAX(1, rows - ?) WHERE id = ?", (n, sheet_id))
+            self._touch(book)
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+def get_store(backend: str):
+    """Process-wide store per backend (and per SQLite file), using the current `SHEETS_LOCAL_PATH`."""
+    if backend == "sqlite":
+        key = (backend, os.path.abspath(os.getenv("SHEETS_LOCAL_PATH", DEFAULT_LOCAL_PATH)))
+    elif backend == "memory":
+        key = (backend, None)
+    else:
+        raise ValueError(f"Unknown local Sheets backend: {backend!r}")
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = MemoryStore() if backend == "memory" else SqliteStore(key[1])
+        return _stores[key]
+
+
+# ------------------------------------------------------------
+# gspread-like handles
+# ------------------------------------------------------------
+def _api_call(kind: str):
+    record_api_call(kind)
+    delay = float(os.getenv("SHEETS_LATENCY_MS", "0"))
+    jitter = float(os.getenv("SHEETS_LATENCY_JITTER_MS", "0"))
+    if jitter > 0:
+        delay += random.uniform(0, jitter)
+    if delay > 0:
+        time.sleep(delay / 1000)
+
+
+def _grid_range(a1: str) -> tuple[int, int, int | None, int | None]:
+    """A1 range -> (row1, col1, row2, col2), 1-based inclusive; None = open-ended."""
+    g = a1_range_to_grid_range(a1.split("!")[-1])
+    end_row, end_col = g.get("endRowIndex"), g.get("endColumnIndex")
+    return g.get("startRowIndex", 0) + 1, g.get("startColumnIndex", 0) + 1, end_row, end_col
+
+
+class LocalWorksheet:
+    def __init__(self, spreadsheet, sheet_id: int, title: str):
+        self.spreadsheet = spreadsheet
+        self.id = sheet_id
+        self.title = title
+
+    @property
+    def _store(self):
+        return self.spreadsheet.store
+
+    @property
+    def _book(self):
+        return self.spreadsheet.title
+
+    def _meta(self) -> dict:
+        for meta in self._store.list_sheets(self._book):
+            if meta["id"] == self.id:
+                return meta
+        raise WorksheetNotFound(self.title)
+
+    @property
+    def row_count(self) -> int:
+        return self._meta()["rows"]
+
+    @property
+    def col_count(self) -> int:
+        return self._meta()["cols"]
+
+    def __repr__(self):
+        return f"<LocalWorksheet {self.title!r} id:{self.id}>"
+
+    # -----------------------------------------------------
+    # Reads
+    # -----------------------------------------------------
+    def get_all_values(self, **kwargs) -> list[list[str]]:
+        _api_call("read")
+        rows = self._store.read(self._book, self.id)
+        width = max((len(r) for r in rows), default=0)
+        return [r + [""] * (width - len(r)) for r in rows]
+
+    get_values = get_all_values
+
+    def get_all_records(self, head: int = 1, expected_headers=None, value_render_option=None,
+                        default_blank="", numericise_ignore=(), allow_underscores_in_numeric_literals=False,
+                        empty2zero=False) -> list[dict]:
+        values = self.get_all_values()
+        if len(values) < head:
+            return []
+        keys, rows = values[head - 1], values[head:]
+        if list(numericise_ignore) != ["all"]:
+            rows = [numericise_all(row, empty2zero, default_blank, allow_underscores_in_numeric_literals,
+                                   list(numericise_ignore)) for row in rows]
+        return to_records(keys, rows)
+
+    def row_values(self, row: int, **kwargs) -> list[str]:
+        _api_call("read")
+        rows = self._store.read(self._book, self.id, row, row)
+        return rows[0] if rows else []
+
+    def col_values(self, col: int, **kwargs) -> list[str]:
+        _api_call("read")
+        values = [r[col - 1] if len(r) >= col else "" for r in self._store.read(self._book, self.id)]
+        while values and values[-1] == "":
+            values.pop()
+        return values
+
+    def _range_values(self, a1: str) -> list[list[str]]:
+        r1, c1, r2, c2 = _grid_range(a1)
+        rows = self._store.read(self._book, self.id, r1, r2)
+        return [_trim(r[c1 - 1:c2]) for r in rows]
+
+    def get(self, range_name: str | None = None, **kwargs) -> list[list[str]]:
+        if range_name is None:
+            return self.get_all_values()
+        _api_call("read")
+        return self._range_values(range_name)
+
+    def batch_get(self, ranges, **kwargs) -> list[list[list[str]]]:
+        _api_call("read")
+        return [self._range_values(a1) for a1 in ranges]
+
+    # -----------------------------------------------------
+    # Writes
+    # -----------------------------------------------------
+    def _write_block(self, row: int, col: int, values):
+        self._store.write(self._book, self.id, [
+            (row + i, col + j, cell_text(v)) for i, line in enumerate(values) for j, v in enumerate(line)])
+
+    def append_row(self, values, value_input_option="RAW", **kwargs):
+        return self.append_rows([values], value_input_option=value_input_option)
+
+    def append_rows(self, values, value_input_option="RAW", **kwargs):
+        _api_call("write")
+        values = [list(v) for v in values]
+        start = self._store.last_row(self._book, self.id) + 1
+        if values:
+            self._write_block(start, 1, values)
+        return {"updates": {"updatedRows": len(values), "updatedRange": f"{self.title}!A{start}"}}
+
+    def update(self, values=None, range_name: str | None = None, **kwargs):
+        if isinstance(values, str) and not isinstance(range_name, str):
+            values, range_name = range_name, values   # legacy update(range_name, values) order
+        _api_call("write")
+        if values and not isinstance(values[0], (list, tuple)):
+            values = [values]
+        r1, c1, _, _ = _grid_range(range_name or "A1")
+        self._write_block(r1, c1, values or [])
+        return {"updatedRows": len(values or [])}
+
+    def update_cell(self, row: int, col: int, value):
+        _api_call("write")
+        self._store.write(self._book, self.id, [(row, col, cell_text(value))])
+
+    def update_acell(self, label: str, value):
+        r1, c1, _, _ = _grid_range(label)
+        return self.update_cell(r1, c1, value)
+
+    def batch_update(self, data: list[dict], **kwargs):
+        _api_call("write")
+        for entry in data:
+            r1, c1, _, _ = _grid_range(entry["range"])
+            self._write_block(r1, c1, entry["values"])
+        return {"totalUpdatedCells": sum(len(line) for entry in data for line in entry["values"])}
+
+    def batch_clear(self, ranges):
+        _api_call("write")
+        cells = []
+        for a1 in ranges:
+            r1, c1, r2, c2 = _grid_range(a1)
+            for i, row in enumerate(self._store.read(self._book, self.id, r1, r2)):
+                last = len(row) if c2 is None else min(c2, len(row))
+                cells.extend((r1 + i, c, "") for c in range(c1, last + 1))
+        if cells:
+            self._store.write(self._book, self.id, cells)
+
+    def clear(self):
+        _api_call("write")
+        rows = self._store.read(self._book, self.id)
+        self._store.write(self._book, self.id,
+                          [(r, c, "") for r, row in enumerate(rows, start=1) for c in range(1, len(row) + 1)])
+
+    def delete_rows(self, start_index: int, end_index: int | None = None):
+        _api_call("write")
+        self._store.delete_rows(self._book, self.id, start_index, end_index or start_index)
+
+
+class LocalSpreadsheet:
+    def __init__(self, title: str, store):
+        self.title = title
+        self.store = store
+        self.id = f"local-{title}"
+
+    def worksheets(self, **kwargs) -> list[LocalWorksheet]:
+        _api_call("metadata")
+        return [LocalWorksheet(self, m["id"], m["title"]) for m in self.store.list_sheets(self.title)]
+
+    def worksheet(self, title: str) -> LocalWorksheet:
+        for ws in self.worksheets():
+            if ws.title == title:
+                return ws
+        raise WorksheetNotFound(title)
+
+    @property
+    def sheet1(self) -> LocalWorksheet:
+        sheets = self.worksheets()
+        if not sheets:
+            raise WorksheetNotFound("sheet1")
+        return sheets[0]
+
+    def add_worksheet(self, title: str, rows=1000, cols=26, index=None) -> LocalWorksheet:
+        _api_call("write")
+        if any(m["title"] == title for m in self.store.list_sheets(self.title)):
+            raise ValueError(f'A sheet with the name "{title}" already exists.')
+        return LocalWorksheet(self, self.store.add_sheet(self.title, title, int(rows), int(cols)), title)
+
+    def del_worksheet(self, worksheet: LocalWorksheet):
+        _api_call("write")
+        self.store.drop_sheet(self.title, worksheet.id)
+
+    def batch_update(self, body: dict) -> dict:
+        """
+        Supports the `deleteDimension` (ROWS) requests used by `sheets_bulk.delete_rows_bulk`.
+
+        Like the real endpoint, the batch is checked before anything is
+        applied: any other request raises ValueError and nothing is written.
+        """
+        requests = body.get("requests", [])
+        for n, request in enumerate(requests):
+            dimension = request.get("deleteDimension", {}).get("range", {}).get("dimension")
+            if dimension != "ROWS":
+                kind = f"deleteDimension ({dimension})" if "deleteDimension" in request else ", ".join(request) or "{}"
+                raise ValueError(f"Local Sheets backend ({self.title!r}) cannot apply batch_update request #{n} "
+                                 f"[{kind}]; only deleteDimension on ROWS is supported. "
+                                 "Use SHEETS_BACKEND=gspread for other spreadsheet edits.")
+        _api_call("write")
+        for request in requests:
+            rng = request["deleteDimension"]["range"]
+            self.store.delete_rows(self.title, rng["sheetId"], rng["startIndex"] + 1, rng["endIndex"])
+        return {"replies": [{} for _ in requests]}
+
+    def get_lastUpdateTime(self) -> str:
+        _api_call("drive")
+        return repr(self.store.modified(self.title))
+
+
+def open_local_spreadsheet(title: str, backend: str = "memory") -> LocalSpreadsheet:
+    return LocalSpreadsheet(title, get_store(backend))
@@ -0,0 +1,150 @@
+# support_agent/answer_cache.py
+"""
+Opt-in semantic answer cache for the customer support bot.
+
+A new question reuses a stored answer when its embedding is within a
+cosine-similarity threshold of a cached question. Entries record:
+- the FAQ fingerprint they were answered under. The cache is cleared when
+  the markdown files change.
+- whether the sampler-box hint was applied. First-time-buyer questions only
+  match other first-time-buyer questions.
+
+Only question text is persisted (JSONL). Vectors are rebuilt via the shared
+query-embedding cache, which serves them from disk without API calls.
+
+The support bot calls `lookup` and `add` from many worker threads. Entries,
+the question matrix, the counters and the fingerprint change together under
+one lock; embedding calls run outside it.
+"""
+
+import os, json, time, hashlib, threading
+import numpy as np
+
+
+def faq_fingerprint(docs: list[dict]) -> str:
+    """Hash of every FAQ chunk id; changes whenever any markdown file changes."""
+    return hashlib.sha256("".join(sorted(d["id"] for d in docs)).encode()).hexdigest()
+
+
+class SemanticAnswerCache:
+    """Nearest-neighbour answer lookup over previously answered questions."""
+
+    def __init__(self, path: str, embed_fn, threshold: float = 0.92, max_entries: int = 5000):
+        self.path = path
+        self.embed_fn = embed_fn  # str -> list[float]
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.fingerprint = None
+        self.entries = []
+        self._matrix = None
+        self.counters = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()        # entries, _matrix, counters, fingerprint, the JSONL file
+        self._load_lock = threading.RLock()  # one (re)load at a time
+
+    # -----------------------------------------------------
+    # Lifecycle
+    # -----------------------------------------------------
+    def load(self, fingerprint: str):
+        """
+        Load persisted entries that were answered under `fingerprint`.
+
+        Every question is embedded before any state changes, so a failed
+        embedding call leaves the previous entries and matrix in place.
+        """
+        with self._load_lock:
+            with self._lock:
+                lines = []
+                if os.path.exists(self.path):
+                    with open(self.path, "r", encoding="utf-8") as f:
+                        lines = f.readlines()
+            entries, stale = [], 0
+            for line in lines:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if entry.get("fingerprint") == fingerprint:
+                    entries.append(entry)
+                else:
+                    stale += 1
+            entries = entries[-self.max_entries:]
+            matrix = self._embed_all(entries)
+            with self._lock:
+                self.fingerprint, self.entries, self._matrix = fingerprint, entries, matrix
+                if stale:
+                    self._rewrite()
+            if stale:
+                print(f"🧹 FAQ content changed — dropped {stale} cached answers.")
+
+    def set_fingerprint(self, fingerprint: str):
+        """Invalidate everything if the FAQ content changed since load()."""
+        if fingerprint == self.fingerprint:
+            return
+        with self._load_lock:
+            if fingerprint != self.fingerprint:  # another thread may have reloaded meanwhile
+                self.load(fingerprint)
+
+    def _rewrite(self):
+        """Persist `entries`; call with `_lock` held."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(json.dumps(e, ensure_ascii=False) + "\n" for e in self.entries)
+        os.replace(tmp, self.path)
+
+    def _unit_vector(self, text: str):
+        v = np.asarray(self.embed_fn(text), dtype=np.float32)
+        return v / max(np.linalg.norm(v), 1e-12)
+
+    def _embed_all(self, entries: list[dict]):
+        """Normalised question matrix, one row per entry (None when empty)."""
+        if not entries:
+            return None
+        m = np.array([self.embed_fn(e["query"]) for e in entries], dtype=np.float32)
+        return m / np.linalg.norm(m, axis=1, keepdims=True).clip(min=1e-12)
+
+    # -----------------------------------------------------
+    # Lookup / insert
+    # -----------------------------------------------------
+    def lookup(self, query: str, sampler_hint: bool):
+        """Return (answer, similarity) for the closest compatible entry, or (None, best)."""
+        with self._lock:
+            if self._matrix is None:
+                self.counters["misses"] += 1
+                return None, 0.0
+        q = self._unit_vector(query)
+        with self._lock:
+            if self._matrix is None:  # reloaded empty while embedding
+                self.counters["misses"] += 1
+                return None, 0.0
+            sims = self._matrix @ q
+            for i in np.argsort(sims)[::-1][:5]:
+                if sims[i] < self.threshold:
+                    break
+                if self.entries[i]["sampler_hint"] == sampler_hint:
+                    self.counters["hits"] += 1
+                    return self.entries[i]["answer"], float(sims[i])
+            self.counters["misses"] += 1
+            return None, float(sims.max())
+
+    def add(self, query: str, answer: str, sampler_hint: bool):
+        """Store an answer. The question is embedded first, so a failed call stores nothing."""
+        v = self._unit_vector(query)[None, :]
+        with self._lock:
+            entry = {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "query": query,
+                "answer": answer,
+                "sampler_hint": sampler_hint,
+                "fingerprint": self.fingerprint,
+            }
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self.entries.append(entry)
+            self._matrix = v if self._matrix is None else np.vstack([self._matrix, v])
+            if len(self.entries) > self.max_entries:
+                # Trim rows and entries together; the surviving vectors are reused, not re-embedded.
+                self.entries = self.entries[-self.max_entries:]
+                self._matrix = self._matrix[-self.max_entries:]
+                self._rewrite()
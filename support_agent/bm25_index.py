@@ -0,0 +1,134 @@
+# support_agent/bm25_index.py
+"""
+In-process BM25 inverted index over the FAQ chunks.
+
+Exact-match lookups (product names like "Saffron Infused Chai", order ids
+like "TP002", "14 days") are cheap and reliable lexically. `query_context`
+fuses these results with the Chroma vector ranking via reciprocal-rank
+fusion. It skips the embedding call entirely when the lexical match is
+confident.
+
+Documents are keyed by the same content-hash ids as the Chroma collection,
+so `sync()` only indexes new chunks and drops removed ones.
+"""
+
+import re, math
+from collections import Counter, defaultdict
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+STOPWORDS = {
+    "the", "and", "a", "an", "to", "of", "in", "is", "on", "for", "or", "it", "my", "are", "with",
+    "can", "you", "your", "how", "what", "who", "when", "where", "why", "which", "about", "from",
+    "this", "that", "our", "me", "do", "we", "if", "will", "i", "s", "be", "does", "have", "tell",
+}
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in TOKEN_RE.findall((text or "").lower().replace("’", "'")) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """Incrementally maintained Okapi BM25 index."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.postings = defaultdict(dict)   # term -> {doc_id: tf}
+        self.doc_terms = {}                 # doc_id -> Counter
+        self.doc_len = {}                   # doc_id -> token count
+        self.total_len = 0
+
+    def __len__(self):
+        return len(self.doc_terms)
+
+    # -----------------------------------------------------
+    # Maintenance
+    # -----------------------------------------------------
+    def add(self, doc_id: str, text: str):
+        if doc_id in self.doc_terms:
+            return
+        terms = Counter(tokenize(text))
+        self.doc_terms[doc_id] = terms
+        self.doc_len[doc_id] = sum(terms.values())
+        self.total_len += self.doc_len[doc_id]
+        for term, tf in terms.items():
+            self.postings[term][doc_id] = tf
+
+    def remove(self, doc_id: str):
+        terms = self.doc_terms.pop(doc_id, None)
+        if terms is None:
+            return
+        self.total_len -= self.doc_len.pop(doc_id)
+        for term in terms:
+            self.postings[term].pop(doc_id, None)
+            if not self.postings[term]:
+                del self.postings[term]
+
+    def sync(self, docs: list[dict]) -> dict:
+        """Index new chunks and drop ones that are gone (ids are content hashes)."""
+        wanted = {d["id"]: d["text"] for d in docs}
+        stale = [i for i in self.doc_terms if i not in wanted]
+        for doc_id in stale:
+            self.remove(doc_id)
+        added = 0
+        for doc_id, text in wanted.items():
+            if doc_id not in self.doc_terms:
+                self.add(doc_id, text)
+                added += 1
+        return {"added": added, "deleted": len(stale)}
+
+    # -----------------------------------------------------
+    # Scoring
+    # -----------------------------------------------------
+    def idf(self, term: str) -> float:
+        n, df = len(self.doc_terms), len(self.postings.get(term, ()))
+        return math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+    def search(self, query: str, k: int = 5) -> list[tuple[str, float]]:
+        """Top-k (doc_id, score) by BM25."""
+        if not self.doc_terms:
+            return []
+        avg_len = self.total_len / len(self.doc_terms)
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = self.idf(term)
+            for doc_id, tf in postings.items():
+                dl = self.doc_len[doc_id]
+                scores[doc_id] += idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * dl / avg_len))
+        return sorted(scores.items(), key=lambda x: -x[1])[:k]
+
+    def coverage(self, query: str, doc_id: str) -> float:
+        """Share of the query's IDF mass found in `doc_id` (unknown terms count as rare)."""
+        terms = set(tokenize(query))
+        if not terms:
+            return 0.0
+        max_idf = math.log(1 + (len(self.doc_terms) + 0.5) / 0.5)
+        doc = self.doc_terms.get(doc_id, {})
+        total = matched = 0.0
+        for term in terms:
+            weight = self.idf(term) if term in self.postings else max_idf
+            total += weight
+            if term in doc:
+                matched += weight
+        return matched / total if total else 0.0
+
+    def is_confident(self, query: str, hits: list[tuple[str, float]],
+                     min_coverage: float = 0.9, min_margin: float = 1.5) -> bool:
+        """True when the top hit matches (almost) every query term and clearly beats #2."""
+        if not hits:
+            return False
+        top_id, top = hits[0]
+        runner_up = hits[1][1] if len(hits) > 1 else 0.0
+        return self.coverage(query, top_id) >= min_coverage and top >= min_margin * runner_up
+
+
+def reciprocal_rank_fusion(rankings: list[list[str]], k: int = 60) -> list[str]:
+    """Merge several ranked id lists: score(d) = Σ 1 / (k + rank)."""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores, key=lambda d: -scores[d])
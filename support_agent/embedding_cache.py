@@ -0,0 +1,231 @@
+# support_agent/embedding_cache.py
+"""
+Two-tier cache for query embeddings used by `support_shared.query_context`.
+
+- Tier 1: in-process LRU with a size cap and TTL.
+- Tier 2: on-disk vector file read through `mmap`, shared by every process
+  and kept across restarts. Embeddings are deterministic per model, so disk
+  entries never expire.
+
+Keys are sha256(model + normalized text). Normalization folds case,
+whitespace, curly quotes and trailing punctuation so that "Refund policy?"
+and "refund policy" share an entry.
+
+Both tiers are safe to use from the support bot's thread pool: the LRU and
+the disk index / mapping each sit behind a lock, and disk reads copy their
+bytes out under it, so a remap never pulls a mapping from under a reader.
+"""
+
+import os, re, json, mmap, time, hashlib, statistics, threading
+from array import array
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def normalize_text(text: str) -> str:
+    text = (text or "").replace("’", "'").replace("‘", "'").replace("“", '"').replace("”", '"')
+    text = re.sub(r"\s+", " ", text.lower()).strip()
+    return text.rstrip("?!. ")
+
+
+def cache_key(text: str, model: str) -> str:
+    return hashlib.sha256(f"{model}\x00{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------
+# TIER 1 — IN-PROCESS LRU
+# ---------------------------------------------------------
+class LRUCache:
+    """Size- and TTL-bounded LRU map."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires, value = item
+            if expires < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+
+# ---------------------------------------------------------
+# TIER 2 — MEMORY-MAPPED DISK STORE
+# ---------------------------------------------------------
+class DiskVectorStore:
+    """
+    Append-only float32 vector file plus a JSONL key index.
+
+    `vectors.f32` holds raw vectors back to back; `index.jsonl` maps each key
+    to its (offset, dim). Reads slice the mmap directly. Entries added by
+    other processes are picked up by tailing the index on a miss.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.data_path = os.path.join(path, "vectors.f32")
+        self.index_path = os.path.join(path, "index.jsonl")
+        self.lock_path = os.path.join(path, ".lock")
+        self._index = {}
+        self._index_pos = 0
+        self._mm = None
+        self._lock = threading.RLock()  # index, read position and mapping
+        self._refresh_index()
+
+    @contextmanager
+    def _locked(self):
+        with open(self.lock_path, "a") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _refresh_index(self):
+        with self._lock:
+            if not os.path.exists(self.index_path):
+                return
+            with open(self.index_path, "rb") as f:
+                f.seek(self._index_pos)
+                for raw in f:
+                    if not raw.endswith(b"\n"):
+                        break
+                    self._index_pos += len(raw)
+                    try:
+                        entry = json.loads(raw)
+                        self._index[entry["k"]] = (entry["o"], entry["n"])
+                    except (json.JSONDecodeError, KeyError):
+                        continue
+
+    def _mapped(self, end: int):
+        """
+        Return an mmap covering at least `end` bytes, remapping if the file grew.
+
+        Call with `_lock` held. The old mapping is not closed here: it is
+        released once nothing references it.
+        """
+        if self._mm is None or len(self._mm) < end:
+            with open(self.data_path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._mm
+
+    def get(self, key: str):
+        with self._lock:
+            loc = self._index.get(key)
+            if loc is None:
+                self._refresh_index()
+                loc = self._index.get(key)
+                if loc is None:
+                    return None
+            offset, dim = loc
+            end = offset + dim * 4
+            data = self._mapped(end)[offset:end]  # copied out while the mapping is held
+        vec = array("f")
+        vec.frombytes(data)
+        return vec.tolist()
+
+    def put(self, key: str, vector: list[float]):
+        payload = array("f", vector).tobytes()
+        with self._locked():
+            self._refresh_index()
+            if key in self._index:
+                return
+            with open(self.data_path, "ab") as f:
+                offset = f.seek(0, os.SEEK_END)
+                f.write(payload)
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps({"k": key, "o": offset, "n": len(vector)}) + "\n")
+            self._refresh_index()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._index)
+
+
+# ---------------------------------------------------------
+# TWO-TIER EMBEDDING CACHE
+# ---------------------------------------------------------
+class EmbeddingCache:
+    """Wraps a batch embed function with LRU + disk tiers and hit/miss counters."""
+
+    def __init__(self, embed_fn, model: str, disk_path: str | None = None,
+                 maxsize: int = 1024, ttl: float = 3600):
+        self.embed_fn = embed_fn
+        self.model = model
+        self.memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self.disk = DiskVectorStore(disk_path) if disk_path else None
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0}
+        self._latency_ms = {"hit": deque(maxlen=1000), "miss": deque(maxlen=1000)}
+        self._stats_lock = threading.Lock()
+
+    def get(self, text: str) -> list[float]:
+        t0 = time.perf_counter()
+        key = cache_key(text, self.model)
+        missed = False
+
+        vector = self.memory.get(key)
+        if vector is not None:
+            outcome = "memory_hits"
+        elif self.disk is not None and (vector := self.disk.get(key)) is not None:
+            outcome = "disk_hits"
+            self.memory.put(key, vector)
+        else:
+            missed, outcome = True, "misses"
+            vector = self.embed_fn([text])[0]
+            self.memory.put(key, vector)
+            if self.disk is not None:
+                try:
+                    self.disk.put(key, vector)
+                except OSError as e:
+                    print(f"⚠️ Embedding cache write failed: {e}")
+
+        with self._stats_lock:
+            self.counters[outcome] += 1
+            self._latency_ms["miss" if missed else "hit"].append((time.perf_counter() - t0) * 1000)
+        return vector
+
+    def stats(self) -> dict:
+        """Hit/miss counters, API calls saved, and p50 latency per path."""
+        with self._stats_lock:
+            counters = dict(self.counters)
+            latency = {path: list(xs) for path, xs in self._latency_ms.items()}
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        total = hits + counters["misses"]
+        p50 = lambda xs: round(statistics.median(xs), 3) if xs else None
+        return {
+            **counters,
+            "requests": total,
+            "hit_rate": round(hits / total, 3) if total else 0.0,
+            "api_calls_saved": hits,
+            "p50_hit_ms": p50(latency["hit"]),
+            "p50_miss_ms": p50(latency["miss"]),
+            "memory_entries": len(self.memory),
+            "disk_entries": len(self.disk) if self.disk is not None else 0,
+        }
@@ -0,0 +1,53 @@
+# support_agent/faq_index.py
+"""
+Incremental sync of FAQ chunks into the persistent Chroma collection.
+
+Chunk ids are content hashes, so an id that is already in the collection
+means the exact same text was embedded before. On startup only new or
+edited chunks are embedded; ids that no longer exist on disk are deleted.
+"""
+
+import hashlib, time
+
+
+def chunk_id(source: str, text: str) -> str:
+    """Stable id for a chunk: sha256 of its source file and text."""
+    return hashlib.sha256(f"{source}\x00{text}".encode("utf-8")).hexdigest()
+
+
+def sync_collection(collection, docs: list[dict], embed_fn, batch_size: int = 64) -> dict:
+    """
+    Bring `collection` in line with `docs` (each with id/text/source).
+
+    Args:
+        collection: Chroma collection (persistent or in-memory).
+        docs (list[dict]): Current chunks; `id` must be a content hash.
+        embed_fn (callable): list[str] -> list[list[float]].
+        batch_size (int): Texts per embedding request.
+    Returns:
+        dict: Counts of added / deleted / unchanged chunks and elapsed seconds.
+    """
+    t0 = time.perf_counter()
+    wanted = {d["id"]: d for d in docs}
+    existing = set(collection.get(include=[])["ids"])
+
+    stale = sorted(existing - wanted.keys())
+    if stale:
+        collection.delete(ids=stale)
+
+    new = [wanted[i] for i in wanted if i not in existing]
+    for start in range(0, len(new), batch_size):
+        batch = new[start:start + batch_size]
+        collection.upsert(
+            ids=[d["id"] for d in batch],
+            documents=[d["text"] for d in batch],
+            embeddings=embed_fn([d["text"] for d in batch]),
+            metadatas=[{k: v for k, v in d.items() if k not in ("id", "text")} for d in batch],
+        )
+
+    return {
+        "added": len(new),
+        "deleted": len(stale),
+        "unchanged": len(wanted) - len(new),
+        "seconds": round(time.perf_counter() - t0, 3),
+    }
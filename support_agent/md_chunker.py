@@ -0,0 +1,126 @@
+# support_agent/md_chunker.py
+"""
+Heading- and paragraph-aware chunker for the FAQ markdown files.
+
+Each chunk stays inside one section (heading path such as
+"Refunds, Shipping & Returns Policy › Shipping"), packs whole paragraphs up
+to a token budget, and repeats the tail of the previous chunk as overlap.
+The heading path is prepended to the chunk text so the embedding (and the
+prompt) keeps the section context.
+"""
+
+import re
+
+try:
+    import tiktoken
+    _ENCODING = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _ENCODING = None  # Fallback: ~4 characters per token
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+RULE_RE = re.compile(r"^\s*([-*_])(\s*\1){2,}\s*$")
+
+
+def count_tokens(text: str) -> int:
+    if _ENCODING is not None:
+        return len(_ENCODING.encode(text))
+    return max(1, len(text) // 4)
+
+
+def _sections(markdown: str):
+    """Yield (heading_path, [paragraphs]) in document order."""
+    stack, paragraphs, buf = [], [], []
+
+    def flush_paragraph():
+        if buf:
+            paragraphs.append("\n".join(buf).strip())
+            buf.clear()
+
+    for line in markdown.splitlines():
+        m = HEADING_RE.match(line)
+        if m:
+            flush_paragraph()
+            if paragraphs:
+                yield list(stack), paragraphs
+                paragraphs = []
+            level = len(m.group(1))
+            stack[:] = stack[:level - 1] + [m.group(2).strip()]
+        elif line.strip() and not RULE_RE.match(line):
+            buf.append(line.rstrip())
+        else:
+            flush_paragraph()
+    flush_paragraph()
+    if paragraphs:
+        yield list(stack), paragraphs
+
+
+def _split_oversized(paragraph: str, max_tokens: int) -> list[str]:
+    """Break a paragraph that alone exceeds the budget on sentence/line boundaries."""
+    pieces, current = [], ""
+    for part in SENTENCE_RE.split(paragraph.replace("\n", "\n ")):
+        candidate = f"{current} {part}".strip() if current else part
+        if current and count_tokens(candidate) > max_tokens:
+            pieces.append(current)
+            current = part
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_markdown(markdown: str, source: str, max_tokens: int = 200, overlap_tokens: int = 30) -> list[dict]:
+    """
+    Split one markdown document into token-budgeted chunks.
+
+    Returns:
+        list[dict]: {text, source, section, chunk, tokens} per chunk.
+    """
+    chunks = []
+    for path, paragraphs in _sections(markdown):
+        section = " › ".join(path) if path else source
+        header = f"[{source} › {section}]"
+        budget = max(20, max_tokens - count_tokens(header))
+
+        blocks = []
+        for p in paragraphs:
+            blocks.extend(_split_oversized(p, budget) if count_tokens(p) > budget else [p])
+
+        current, overlap = [], []
+        for block in blocks:
+            body = current + [block]
+            if current and count_tokens("\n\n".join(body)) > budget:
+                chunks.append((section, header, current))
+                # Carry trailing blocks that fit in the overlap budget.
+                overlap = []
+                for prev in reversed(current):
+                    if count_tokens("\n\n".join([prev] + overlap)) > overlap_tokens:
+                        break
+                    overlap.insert(0, prev)
+                current = overlap + [block]
+                if count_tokens("\n\n".join(current)) > budget:
+                    current = [block]
+            else:
+                current = body
+        if current:
+            chunks.append((section, header, current))
+
+    out = []
+    for i, (section, header, blocks) in enumerate(chunks):
+        text = header + "\n" + "\n\n".join(blocks)
+        out.append({"text": text, "source": source, "section": section, "chunk": i,
+                    "tokens": count_tokens(text)})
+    return out
+
+
+def pack_chunks(chunks: list[str], token_budget: int) -> list[str]:
+    """Keep chunks in rank order while they fit the token budget (always at least one)."""
+    packed, used = [], 0
+    for text in chunks:
+        tokens = count_tokens(text)
+        if packed and used + tokens > token_budget:
+            continue
+        packed.append(text)
+        used += tokens
+    return packed
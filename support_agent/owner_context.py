@@ -0,0 +1,159 @@
+# support_agent/owner_context.py
+"""
+Bounded context builder for the owner support assistant.
+
+Instead of pasting the last few raw tickets into the prompt, the question is
+answered from the per-day aggregates kept by `TicketAnalytics`:
+
+1. Resolve the time window the owner asked about ("today", "this week",
+   "last 30 days", ...; default: last 30 days).
+2. Roll the day buckets in that window up into a window overview, weekly
+   summaries (volume + top keywords) and daily summaries.
+3. If the question names a topic ("refund", "shipping"), count matching
+   tickets per week and pull matching sample queries.
+4. Add sections in priority order until the token budget is spent.
+
+Cost depends on the number of days in the window, not the number of
+tickets, so the prompt stays the same size at 100 or 100k tickets.
+"""
+
+import os, re
+from collections import Counter
+from datetime import date, datetime, timedelta
+
+try:
+    from support_agent.ticket_analytics import extract_keywords
+    from support_agent.md_chunker import count_tokens
+except ImportError:  # running as a script from inside support_agent/
+    from ticket_analytics import extract_keywords
+    from md_chunker import count_tokens
+
+OWNER_CONTEXT_TOKEN_BUDGET = int(os.getenv("OWNER_CONTEXT_TOKEN_BUDGET", "1200"))
+DEFAULT_WINDOW_DAYS = 30
+
+# Question words that describe the request rather than a ticket topic
+QUESTION_WORDS = {
+    "summarize", "summary", "summarise", "customer", "customers", "ticket", "tickets", "issue", "issues",
+    "related", "week", "weeks", "month", "today", "yesterday", "last", "past", "days", "day", "all",
+    "most", "appear", "keywords", "trend", "trends", "draft", "email", "sentiment", "any", "has", "were",
+    "was", "been", "have", "there", "many", "much", "show", "give", "list", "top", "common", "people",
+    "asking", "asked", "complaints", "feedback", "product", "negative", "positive", "since",
+}
+
+
+def _stem(word: str) -> str:
+    return word[:-1] if len(word) > 4 and word.endswith("s") else word
+
+
+def resolve_window(question: str, today: date | None = None) -> tuple[date, date, str]:
+    """Map phrases like "this week" / "last 7 days" to (start, end, label)."""
+    today = today or date.today()
+    q = (question or "").lower()
+    m = re.search(r"\b(?:last|past)\s+(\d{1,3})\s+days?\b", q)
+    if m:
+        n = max(1, int(m.group(1)))
+        return today - timedelta(days=n - 1), today, f"last {n} days"
+    if "yesterday" in q:
+        d = today - timedelta(days=1)
+        return d, d, "yesterday"
+    if "today" in q:
+        return today, today, "today"
+    week_start = today - timedelta(days=today.weekday())
+    if re.search(r"\blast week\b", q):
+        return week_start - timedelta(days=7), week_start - timedelta(days=1), "last week"
+    if re.search(r"\b(this|past) week\b", q):
+        return week_start, today, "this week"
+    if re.search(r"\blast month\b", q):
+        end = today.replace(day=1) - timedelta(days=1)
+        return end.replace(day=1), end, "last month"
+    if re.search(r"\b(this|past) month\b", q):
+        return today.replace(day=1), today, "this month"
+    return today - timedelta(days=DEFAULT_WINDOW_DAYS - 1), today, f"last {DEFAULT_WINDOW_DAYS} days"
+
+
+def topic_terms(question: str) -> set[str]:
+    """Keywords in the owner's question that name a ticket topic."""
+    return {_stem(w) for w in extract_keywords(question) if w not in QUESTION_WORDS}
+
+
+def _fmt_keywords(counter: Counter, n: int = 5) -> str:
+    return ", ".join(f"{k} ({v})" for k, v in counter.most_common(n)) or "—"
+
+
+def _week_label(day: str) -> str:
+    d = datetime.strptime(day, "%Y-%m-%d").date()
+    return (d - timedelta(days=d.weekday())).isoformat()
+
+
+def build_owner_context(question: str, analytics, token_budget: int = OWNER_CONTEXT_TOKEN_BUDGET,
+                        today: date | None = None) -> str:
+    """Summarized ticket context for `question`, at most `token_budget` tokens."""
+    start, end, label = resolve_window(question, today)
+    buckets = analytics.day_buckets(start.isoformat(), end.isoformat())
+    terms = topic_terms(question)
+
+    window_total = sum(b["count"] for _, b in buckets)
+    window_keywords = Counter()
+    weeks = {}
+    for day, b in buckets:
+        window_keywords.update(b["keywords"])
+        week = weeks.setdefault(_week_label(day), {"count": 0, "keywords": Counter(), "topic": 0})
+        week["count"] += b["count"]
+        week["keywords"].update(b["keywords"])
+        if terms:
+            week["topic"] += sum(c for k, c in b["keywords"].items() if _stem(k) in terms)
+
+    sections = [
+        f"Ticket window: {label} ({start.isoformat()} to {end.isoformat()}). "
+        f"{window_total} tickets in window, {analytics.total} all-time.\n"
+        f"Top keywords in window: {_fmt_keywords(window_keywords, 8)}"
+    ]
+
+    if terms:
+        topic_total = sum(c for k, c in window_keywords.items() if _stem(k) in terms)
+        lines = [f"Topic '{', '.join(sorted(terms))}': {topic_total} keyword mentions in window."]
+        lines += [f"- week of {w}: {s['topic']} mentions / {s['count']} tickets" for w, s in sorted(weeks.items())]
+        sections.append("\n".join(lines))
+        matches = {}  # distinct query -> newest day it was seen
+        for day, b in reversed(buckets):
+            for q in b["samples"]:
+                if q not in matches and terms & {_stem(k) for k in extract_keywords(q)}:
+                    matches[q] = day
+        if matches:
+            sections.append("Matching tickets (newest first):\n" + "\n".join(f"- {d}: {q}" for q, d in matches.items()))
+
+    if weeks:
+        sections.append("Weekly summary:\n" + "\n".join(
+            f"- week of {w}: {s['count']} tickets; top: {_fmt_keywords(s['keywords'])}"
+            for w, s in sorted(weeks.items(), reverse=True)))
+        sections.append("Daily summary (newest first):\n" + "\n".join(
+            f"- {day}: {b['count']} tickets; top: {_fmt_keywords(b['keywords'], 3)}" for day, b in reversed(buckets)))
+        samples = [(day, q) for day, b in reversed(buckets) for q in b["samples"][:2]]
+        sections.append("Sample tickets (newest first):\n" + "\n".join(f"- {d}: {q}" for d, q in samples))
+    else:
+        sections.append("No tickets in this window. Most recent tickets:\n" + "\n".join(
+            f"- {t.get('timestamp','')[:10]}: {t.get('user_query','')}" for t in analytics.recent(5)))
+
+    return _fit_budget(sections, token_budget)
+
+
+def _fit_budget(sections: list[str], token_budget: int) -> str:
+    """Keep whole sections in priority order; trim the first one that overflows line by line."""
+    out, used = [], 0
+    for section in sections:
+        cost = count_tokens(section) + 2  # + section separator
+        if used + cost <= token_budget:
+            out.append(section)
+            used += cost
+            continue
+        kept = []
+        for line in section.split("\n"):
+            line_cost = count_tokens(line) + 1
+            if used + line_cost > token_budget:
+                break
+            kept.append(line)
+            used += line_cost
+        if len(kept) > 1:
+            out.append("\n".join(kept))
+        break
+    return "\n\n".join(out)
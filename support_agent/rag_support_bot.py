@@ -1,27 +1,62 @@
 # support_agent/rag_support_bot.py
-import os, json, uuid, glob
-import chromadb
+import os, time, asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+import httpx
 import gradio as gr
-from openai import OpenAI
 from dotenv import load_dotenv
 from datetime import datetime
-from support_shared import load_docs, query_context
+from support_shared import (
+    load_docs, query_context, save_ticket, sync_faq_index, query_embeddings, current_faq_docs,
+    refresh_faq_index, BASE_DIR
+)
+from answer_cache import SemanticAnswerCache, faq_fingerprint
+from shared.llm_clients import async_openai_client
 
 # ---------------------------------------------------------
 # Setup
 # ---------------------------------------------------------
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-chroma_client = chromadb.Client()
-collection = chroma_client.get_or_create_collection("two_peaks_faqs")
+STREAMING = os.getenv("SUPPORT_STREAMING", "1") == "1"
+MAX_CONCURRENCY = int(os.getenv("SUPPORT_MAX_CONCURRENCY", "32"))
+
+# One async client + pooled HTTP connections shared by every chat request.
+http_pool = httpx.AsyncClient(
+    limits=httpx.Limits(max_connections=MAX_CONCURRENCY, max_keepalive_connections=MAX_CONCURRENCY),
+    timeout=httpx.Timeout(60.0, connect=5.0),
+)
+client = async_openai_client(http_client=http_pool)
+llm_slots = asyncio.Semaphore(MAX_CONCURRENCY)
+# Blocking work (Chroma, embedding cache, ticket appends) gets its own pool so it
+# is not capped by the small default executor.
+io_pool = ThreadPoolExecutor(max_workers=MAX_CONCURRENCY, thread_name_prefix="support-io")
+_background = set()
+
+async def _run_blocking(fn, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(io_pool, partial(fn, *args, **kwargs))
 
 # ---------------------------------------------------------
-# Load docs once
+# Load docs once and sync the persistent FAQ index
 # ---------------------------------------------------------
 docs = load_docs()
-print(f"📄 Loaded {len(docs)} FAQ files.")
-for d in docs:
-    print("  -", d["source"])
+print(f"📄 Loaded {len(docs)} FAQ chunks from {len({d['source'] for d in docs})} files.")
+for source in sorted({d["source"] for d in docs}):
+    print("  -", source)
+sync_faq_index(docs)
+
+# ---------------------------------------------------------
+# Semantic answer cache (opt-in: SUPPORT_ANSWER_CACHE=1)
+# ---------------------------------------------------------
+answer_cache = None
+if os.getenv("SUPPORT_ANSWER_CACHE", "0") == "1":
+    answer_cache = SemanticAnswerCache(
+        path=os.getenv("SUPPORT_ANSWER_CACHE_PATH", os.path.join(BASE_DIR, "answer_cache.jsonl")),
+        embed_fn=query_embeddings.get,
+        threshold=float(os.getenv("SUPPORT_ANSWER_CACHE_THRESHOLD", "0.92")),
+    )
+    answer_cache.load(faq_fingerprint(docs))
+    print(f"⚡ Answer cache on — {len(answer_cache.entries)} answers reusable "
+          f"(threshold {answer_cache.threshold}).")
 
 # ---------------------------------------------------------
 # System prompt
@@ -36,50 +71,116 @@ Always keep your tone human, empathetic, and concise.
 # ---------------------------------------------------------
 # Main chat handler
 # ---------------------------------------------------------
-def generate_answer(message: str, history: list):
+def wants_sampler_box(query: str) -> bool:
+    """Detect first-time buyers who should hear about the sampler box."""
+    return any(w in query.lower() for w in ["first time", "new customer", "recommend", "try"])
+
+def _elapsed_ms(started: float) -> float:
+    return round((time.perf_counter() - started) * 1000, 1)
+
+def _log_ticket(query: str, text: str, **metrics):
+    """Persist the finished exchange (single append — no read/rewrite of the whole history)."""
+    new_ticket = {"timestamp": datetime.utcnow().isoformat(), "user_query": query,
+                  "assistant_response": text, **metrics}
+    try:
+        save_ticket(new_ticket)
+    except Exception as e:
+        print(f"❌ Ticket log error: {e}")
+
+def _in_background(fn, *args, **kwargs):
+    """Run blocking bookkeeping (ticket + cache writes) off the response path."""
+    task = asyncio.ensure_future(_run_blocking(fn, *args, **kwargs))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+def _cached_lookup(query: str, sampler_hint: bool):
+    """Answer-cache lookup that first drops answers built on edited FAQ files."""
+    refresh_faq_index()
+    answer_cache.set_fingerprint(faq_fingerprint(current_faq_docs()))
+    return answer_cache.lookup(query, sampler_hint)
+
+def _cache_answer(query: str, text: str, sampler_hint: bool):
+    try:
+        answer_cache.add(query, text, sampler_hint)
+    except Exception as e:
+        print(f"⚠️ Answer cache write failed: {e}")
+
+async def generate_answer(message: str, history: list):
+    """
+    Async Gradio chat handler. Yields the growing answer as tokens arrive when
+    SUPPORT_STREAMING=1 (default), otherwise yields the full answer once.
+
+    Blocking steps (vector query, cache lookups) run in worker threads so one
+    event loop serves many chats; at most SUPPORT_MAX_CONCURRENCY completions
+    are in flight. The ticket is written in the background after the last
+    token, with time-to-first-token and total latency.
+    """
     query = message
     print(f"🗣️ Received query: {query}")
+    started = time.perf_counter()
+    sampler_hint = wants_sampler_box(query)
+
+    if answer_cache is not None:
+        try:
+            cached, similarity = await _run_blocking(_cached_lookup, query, sampler_hint)
+        except Exception as e:
+            print(f"⚠️ Answer cache error: {e}")
+            cached = None
+        if cached:
+            latency = _elapsed_ms(started)
+            print(f"⚡ Cache hit (cos={similarity:.3f}) in {latency} ms")
+            _in_background(_log_ticket, query, cached, cached=True, ttft_ms=latency, total_ms=latency)
+            yield cached
+            return
 
     try:
-        context = query_context(query)
+        context = await _run_blocking(query_context, query)
     except Exception as e:
         print(f"❌ Retrieval error: {e}")
         context = ""
 
     # Detect first-time buyers
-    if any(w in query.lower() for w in ["first time", "new customer", "recommend", "try"]):
+    if sampler_hint:
         context += "\n\n[Suggest the Founder's Ritual Sampler Box — perfect for first-time buyers!]"
 
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Context:\n{context}\n\nUser: {query}"}
+    ]
+    text, ttft_ms = "", None
     try:
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            temperature=0.5,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": f"Context:\n{context}\n\nUser: {query}"}
-            ]
-        )
-        text = response.choices[0].message.content.strip()
+        async with llm_slots:
+            if STREAMING:
+                stream = await client.chat.completions.create(
+                    model="gpt-4o-mini", temperature=0.5, messages=messages, stream=True
+                )
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if not delta:
+                        continue
+                    if ttft_ms is None:
+                        ttft_ms = _elapsed_ms(started)
+                    text += delta
+                    yield text
+                text = text.strip()
+            else:
+                response = await client.chat.completions.create(
+                    model="gpt-4o-mini", temperature=0.5, messages=messages
+                )
+                text = response.choices[0].message.content.strip()
+                ttft_ms = _elapsed_ms(started)
+                yield text
     except Exception as e:
         print(f"⚠️ OpenAI error: {e}")
-        return "⚠️ Sorry, something went wrong."
-
-    # Log ticket
-    ticket_path = os.path.join(os.path.dirname(__file__), "support_tickets.json")
-    now = datetime.utcnow().isoformat()
-    new_ticket = {"timestamp": now, "user_query": query, "assistant_response": text}
-    try:
-        tickets = []
-        if os.path.exists(ticket_path):
-            with open(ticket_path, "r", encoding="utf-8") as f:
-                tickets = json.load(f)
-        tickets.append(new_ticket)
-        with open(ticket_path, "w", encoding="utf-8") as f:
-            json.dump(tickets, f, indent=2)
-    except Exception as e:
-        print(f"❌ Ticket log error: {e}")
+        yield (text + "\n\n" if text else "") + "⚠️ Sorry, something went wrong."
+        return
 
-    return text
+    total_ms = _elapsed_ms(started)
+    print(f"⏱️ TTFT {ttft_ms} ms · total {total_ms} ms")
+    _in_background(_log_ticket, query, text, ttft_ms=ttft_ms, total_ms=total_ms)
+    if answer_cache is not None and text.strip():
+        # An empty stream (upstream error, cancellation) must not become a cached blank reply.
+        _in_background(_cache_answer, query, text, sampler_hint)
 
 def welcome_message():
     return (
@@ -88,21 +189,28 @@ def welcome_message():
         "If you’re new here, I can help you pick your perfect chai ☕."
     )
 
-theme = gr.themes.Soft(primary_hue="amber", neutral_hue="stone")
-
-demo = gr.ChatInterface(
-    fn=generate_answer,
-    title="Two Peaks Chai Support Assistant",
-    description="Your personal chai guide — here to help with orders, brewing, and product recommendations.",
-    chatbot=gr.Chatbot(value=[[None, welcome_message()]]),
-    examples=[
-        "What’s the best chai for first-time buyers?",
-        "How do I brew your Signature Masala?",
-        "What’s your refund policy?",
-        "Tell me about the founders."
-    ],
-    theme=theme
-)
+def build_demo():
+    """Gradio UI around the async chat handler (built only when serving)."""
+    theme = gr.themes.Soft(primary_hue="amber", neutral_hue="stone")
+
+    demo = gr.ChatInterface(
+        fn=generate_answer,
+        title="Two Peaks Chai Support Assistant",
+        description="Your personal chai guide — here to help with orders, brewing, and product recommendations.",
+        chatbot=gr.Chatbot(value=[[None, welcome_message()]]),
+        examples=[
+            "What’s the best chai for first-time buyers?",
+            "How do I brew your Signature Masala?",
+            "What’s your refund policy?",
+            "Tell me about the founders."
+        ],
+        theme=theme
+    )
+
+    # Gradio runs one event at a time by default; let the async handler overlap requests.
+    demo.queue(default_concurrency_limit=MAX_CONCURRENCY)
+    return demo
 
 if __name__ == "__main__":
+    demo = build_demo()
     demo.launch(server_name="0.0.0.0", server_port=7860)
\ No newline at end of file
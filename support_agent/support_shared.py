@@ -6,54 +6,182 @@ Shared utility module for both Support Agents:
 Handles: vector store access, ticket loading, and context retrieval.
 """
 
-import os, json, glob, uuid, chromadb
-from openai import OpenAI
+import os, sys, json, glob, time, threading, chromadb
 from dotenv import load_dotenv
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from shared.llm_clients import openai_client
+
+try:
+    from support_agent.ticket_store import get_store
+    from support_agent.faq_index import chunk_id, sync_collection
+    from support_agent.embedding_cache import EmbeddingCache
+    from support_agent.md_chunker import chunk_markdown, pack_chunks
+    from support_agent.bm25_index import BM25Index, reciprocal_rank_fusion
+    from support_agent.ticket_analytics import extract_keywords
+except ImportError:  # running as a script from inside support_agent/
+    from ticket_store import get_store
+    from faq_index import chunk_id, sync_collection
+    from embedding_cache import EmbeddingCache
+    from md_chunker import chunk_markdown, pack_chunks
+    from bm25_index import BM25Index, reciprocal_rank_fusion
+    from ticket_analytics import extract_keywords
+
 # ---------------------------------------------------------
 # INITIALIZATION
 # ---------------------------------------------------------
 load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY", ""))
-chroma_client = chromadb.Client()
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CHROMADB_PATH = os.getenv("CHROMADB_PATH", os.path.join(BASE_DIR, "chroma_db"))
+EMBED_MODEL = "text-embedding-3-small"
+CHUNK_TOKENS = int(os.getenv("FAQ_CHUNK_TOKENS", "200"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("FAQ_CHUNK_OVERLAP_TOKENS", "30"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("FAQ_CONTEXT_TOKEN_BUDGET", "500"))
+FAQ_REFRESH_SECONDS = float(os.getenv("FAQ_REFRESH_SECONDS", "30"))
+LEXICAL_MIN_COVERAGE = float(os.getenv("HYBRID_LEXICAL_MIN_COVERAGE", "0.9"))
+LEXICAL_MIN_MARGIN = float(os.getenv("HYBRID_LEXICAL_MIN_MARGIN", "1.5"))
+
+client = openai_client()
+chroma_client = chromadb.PersistentClient(path=CHROMADB_PATH)
 collection = chroma_client.get_or_create_collection("two_peaks_faqs")
 
+# In-process lexical index + chunk text by id, kept in step with the collection.
+bm25 = BM25Index()
+faq_chunks = {}
+_faq_state = {"mtimes": None, "checked": float("-inf")}
+_faq_lock = threading.RLock()     # one sync (or refresh check) at a time
+_index_lock = threading.RLock()   # bm25 + faq_chunks, swapped together while readers wait
+
 # ---------------------------------------------------------
 # LOAD LOCAL FAQ DOCS
 # ---------------------------------------------------------
+def _faq_paths():
+    return sorted(glob.glob(os.path.join(BASE_DIR, "*.md")))
+
 def load_docs():
-    """Load all markdown FAQ files for embedding into the shared Chroma DB."""
-    docs = []
-    for path in glob.glob(os.path.join("support_agent", "*.md")):
+    """Load the markdown FAQ files as heading-aware chunks for the shared Chroma DB."""
+    docs, seen = [], set()
+    for path in _faq_paths():
         try:
             with open(path, "r", encoding="utf-8") as f:
-                docs.append({
-                    "id": str(uuid.uuid4()),
-                    "text": f.read(),
-                    "source": os.path.basename(path)
-                })
+                text = f.read()
+            source = os.path.basename(path)
+            for chunk in chunk_markdown(text, source, CHUNK_TOKENS, CHUNK_OVERLAP_TOKENS):
+                doc_id = chunk_id(source, chunk["text"])
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                docs.append({"id": doc_id, **chunk})
         except Exception as e:
             print(f"⚠️ Error reading {path}: {e}")
     return docs
 
+def embed_texts(texts: list[str]) -> list[list[float]]:
+    """Embed a batch of texts with one API call."""
+    resp = client.embeddings.create(model=EMBED_MODEL, input=texts)
+    return [d.embedding for d in resp.data]
+
+# Query embeddings are cached: support traffic repeats the same few questions.
+query_embeddings = EmbeddingCache(
+    embed_texts,
+    model=EMBED_MODEL,
+    disk_path=os.getenv("EMBEDDING_CACHE_PATH", os.path.join(BASE_DIR, "embedding_cache")),
+    maxsize=int(os.getenv("EMBEDDING_CACHE_SIZE", "1024")),
+    ttl=float(os.getenv("EMBEDDING_CACHE_TTL", "3600")),
+)
+
+def _faq_mtimes() -> dict:
+    return {p: os.path.getmtime(p) for p in _faq_paths()}
+
+def sync_faq_index(docs=None) -> dict:
+    """
+    Sync the on-disk FAQ collection and the BM25 index with the markdown files.
+    Only new or edited chunks are embedded/indexed; removed ones are deleted.
+    The attempt time is recorded first, so a failed sync is retried by
+    `refresh_faq_index` only after FAQ_REFRESH_SECONDS.
+    """
+    with _faq_lock:
+        _faq_state["checked"] = time.monotonic()
+        mtimes = _faq_mtimes()
+        docs = load_docs() if docs is None else docs
+        stats = sync_collection(collection, docs, embed_texts)
+        chunks = {d["id"]: d["text"] for d in docs}
+        with _index_lock:
+            lexical = bm25.sync(docs)
+            faq_chunks.clear()
+            faq_chunks.update(chunks)
+        _faq_state.update(mtimes=mtimes, checked=time.monotonic())
+    print(f"🗂️ FAQ index synced — {stats['added']} embedded, {stats['deleted']} removed, "
+          f"{stats['unchanged']} reused; BM25 +{lexical['added']}/-{lexical['deleted']} ({stats['seconds']}s).")
+    return stats
+
+def refresh_faq_index() -> bool:
+    """
+    Re-sync when any markdown file was added, removed or edited.
+    Checks file mtimes at most every FAQ_REFRESH_SECONDS after the last check
+    or sync attempt (failed ones included); returns True if it synced. While
+    another thread is syncing, queries keep the current index instead of
+    waiting for it.
+    """
+    if not _faq_lock.acquire(blocking=False):
+        return False
+    try:
+        now = time.monotonic()
+        if now - _faq_state["checked"] < FAQ_REFRESH_SECONDS:
+            return False
+        _faq_state["checked"] = now
+        if _faq_mtimes() == _faq_state["mtimes"]:
+            return False
+        sync_faq_index()
+        return True
+    finally:
+        _faq_lock.release()
+
+def current_faq_docs() -> list[dict]:
+    """Chunks currently indexed (id/text), e.g. for answer-cache fingerprints."""
+    with _index_lock:
+        return [{"id": i, "text": t} for i, t in faq_chunks.items()]
+
 # ---------------------------------------------------------
-# VECTOR QUERYING
+# HYBRID QUERYING (BM25 + VECTOR)
 # ---------------------------------------------------------
-def query_context(query: str, n_results: int = 3) -> str:
+retrieval_counters = {"lexical_only": 0, "hybrid": 0}
+
+def retrieve_chunks(query: str, n_results: int = 6) -> list[str]:
     """
-    Retrieve top contextual snippets from the shared Chroma vector store.
-    Returns concatenated text ready for prompting.
+    Rank FAQ chunks for `query`.
+    A confident BM25 hit (top chunk covers the query terms and clearly beats
+    the runner-up) is served lexically with no embedding call. Otherwise the
+    BM25 and Chroma rankings are merged with reciprocal-rank fusion.
+    BM25 and the chunk map are only read under `_index_lock`, so a concurrent
+    re-sync is never seen half-applied; the embedding and Chroma calls run
+    outside it.
+    """
+    refresh_faq_index()
+    with _index_lock:
+        lexical = bm25.search(query, n_results)
+        lexical_ids = [doc_id for doc_id, _ in lexical]
+        if bm25.is_confident(query, lexical, LEXICAL_MIN_COVERAGE, LEXICAL_MIN_MARGIN):
+            retrieval_counters["lexical_only"] += 1
+            return [faq_chunks[i] for i in lexical_ids if i in faq_chunks]
+        retrieval_counters["hybrid"] += 1
+    q_emb = query_embeddings.get(query)
+    results = collection.query(query_embeddings=[q_emb], n_results=n_results)
+    vector_ids = results["ids"][0] if results and results.get("ids") else []
+    # Chroma can return a None document for an id a concurrent sync is replacing
+    vector_texts = {i: t for i, t in zip(vector_ids, (results.get("documents") or [[]])[0]) if t is not None}
+    ranked = reciprocal_rank_fusion([vector_ids, lexical_ids])[:n_results]
+    with _index_lock:
+        return [faq_chunks.get(i, vector_texts.get(i)) for i in ranked if i in faq_chunks or i in vector_texts]
+
+def query_context(query: str, n_results: int = 6, token_budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    """
+    Retrieve top contextual chunks (hybrid BM25 + Chroma vector search).
+    Returns the best-ranked chunks that fit `token_budget`, ready for prompting.
     """
     try:
-        q_emb = client.embeddings.create(
-            model="text-embedding-3-small",
-            input=query
-        ).data[0].embedding
-
-        results = collection.query(query_embeddings=[q_emb], n_results=n_results)
-        if results and results.get("documents"):
-            return "\n\n".join(results["documents"][0])
-        return ""
+        return "\n\n".join(pack_chunks(retrieve_chunks(query, n_results), token_budget))
     except Exception as e:
         print(f"❌ Chroma query error: {e}")
         return ""
@@ -62,22 +190,23 @@ def query_context(query: str, n_results: int = 3) -> str:
 # LOAD SUPPORT TICKETS
 # ---------------------------------------------------------
 def load_tickets():
-    """Safely load all support tickets saved by either bot."""
-    ticket_path = os.path.join(os.path.dirname(__file__), "support_tickets.json")
-    if not os.path.exists(ticket_path):
-        return []
+    """Safely load all support tickets saved by either bot.
 
+    Reads the append-only JSONL log plus the legacy `support_tickets.json`
+    array (if it has not been migrated yet).
+    """
     try:
-        with open(ticket_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-            if isinstance(data, list):
-                return data
-            else:
-                print("⚠️ Invalid ticket file format; expected list.")
-                return []
-    except json.JSONDecodeError:
-        print("⚠️ Could not decode support_tickets.json; resetting.")
-        return []
+        return get_store().load_all()
     except Exception as e:
         print(f"❌ Error loading tickets: {e}")
-        return []
\ No newline at end of file
+        return []
+
+def save_ticket(ticket: dict):
+    """Append one ticket to the shared log (constant cost per ticket).
+
+    Keywords are extracted here, once, so the dashboard analytics never
+    re-tokenize ticket history.
+    """
+    if "keywords" not in ticket:
+        ticket = {**ticket, "keywords": extract_keywords(ticket.get("user_query", ""))}
+    get_store().append(ticket)
@@ -0,0 +1,168 @@
+# support_agent/ticket_analytics.py
+"""
+Incremental analytics over the support ticket log for the owner dashboard.
+
+Keywords are extracted once, when a ticket is saved (`ticket["keywords"]`),
+and the store keeps running aggregates instead of rescanning history:
+- keyword counts (top topics)
+- per-day buckets (volume, keyword counts, a few sample queries) that the
+  owner assistant rolls up into daily/weekly summaries (`owner_context.py`)
+- a bounded recency index of the latest tickets
+- latency sums for the average response time card
+
+`refresh()` tails the ticket log from the last position it saw, so a
+Streamlit rerun costs O(new tickets). The aggregates and the log position
+are snapshotted to disk so a restarted dashboard resumes without a full scan.
+"""
+
+import os, re, json, threading
+from collections import Counter, deque
+
+try:
+    from support_agent.ticket_store import get_store
+except ImportError:  # running as a script from inside support_agent/
+    from ticket_store import get_store
+
+STOPWORDS = {
+    "the","and","a","to","of","in","is","on","for","or","it","my","are","with","can","you","your",
+    "how","what","who","when","where","why","which","about","from","this","that","our","me","do",
+    "we","an","if","will","order","orders","help"
+}
+RECENT_SIZE = 50
+DAY_SAMPLES = 20  # sample queries kept per day for the owner assistant
+
+
+def extract_keywords(text: str) -> list[str]:
+    words = re.findall(r"\b\w+\b", (text or "").lower())
+    return [w for w in words if w not in STOPWORDS and len(w) > 2]
+
+
+def ticket_keywords(ticket: dict) -> list[str]:
+    """Keywords stored at write time, falling back to extraction for older tickets."""
+    keywords = ticket.get("keywords")
+    if isinstance(keywords, list):
+        return keywords
+    return extract_keywords(ticket.get("user_query", ""))
+
+
+class TicketAnalytics:
+    """Running ticket aggregates, kept current by tailing the ticket log."""
+
+    def __init__(self, store=None, snapshot_path: str | None = None):
+        self.store = store or get_store()
+        self.snapshot_path = snapshot_path or os.path.join(self.store.ticket_dir, "analytics.json")
+        self._lock = threading.Lock()
+        self._reset()
+        self._load_snapshot()
+
+    def _reset(self):
+        self.position = None
+        self.total = 0
+        self.keywords = Counter()
+        self.days = {}  # "YYYY-MM-DD" -> {"count", "keywords": Counter, "samples": [...]}
+        self.recent_items = deque(maxlen=RECENT_SIZE)
+        self.latency = {"total_ms": [0.0, 0], "ttft_ms": [0.0, 0]}
+
+    # -----------------------------------------------------
+    # Snapshot
+    # -----------------------------------------------------
+    def _load_snapshot(self):
+        if not os.path.exists(self.snapshot_path):
+            return
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snap = json.load(f)
+            self.position = snap["position"]
+            self.total = snap["total"]
+            self.keywords = Counter(snap["keywords"])
+            self.days = {day: {"count": b["count"], "keywords": Counter(b["keywords"]), "samples": b["samples"]}
+                         for day, b in snap["days"].items()}
+            self.recent_items = deque(snap["recent"], maxlen=RECENT_SIZE)
+            self.latency = snap["latency"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠️ Ignoring unreadable analytics snapshot: {e}")
+            self._reset()
+
+    def _save_snapshot(self):
+        os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+        tmp = self.snapshot_path + f".{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({
+                "position": self.position,
+                "total": self.total,
+                "keywords": self.keywords,
+                "days": self.days,
+                "recent": list(self.recent_items),
+                "latency": self.latency,
+            }, f, ensure_ascii=False)
+        os.replace(tmp, self.snapshot_path)
+
+    # -----------------------------------------------------
+    # Ingestion
+    # -----------------------------------------------------
+    def _ingest(self, ticket: dict):
+        self.total += 1
+        keywords = ticket_keywords(ticket)
+        self.keywords.update(keywords)
+        day = str(ticket.get("timestamp", ""))[:10]
+        if day:
+            bucket = self.days.setdefault(day, {"count": 0, "keywords": Counter(), "samples": []})
+            bucket["count"] += 1
+            bucket["keywords"].update(keywords)
+            query = (ticket.get("user_query") or "").strip()
+            if query and len(bucket["samples"]) < DAY_SAMPLES:
+                bucket["samples"].append(query)
+        self.recent_items.append({"timestamp": ticket.get("timestamp", ""),
+                                  "user_query": ticket.get("user_query", "")})
+        for field, acc in self.latency.items():
+            value = ticket.get(field)
+            if isinstance(value, (int, float)):
+                acc[0] += value
+                acc[1] += 1
+
+    def refresh(self) -> int:
+        """Fold in tickets written since the last refresh; returns how many."""
+        with self._lock:
+            tickets, position = self.store.read_since(self.position)
+            if self.position is not None and self.position.get("legacy_present") != position["legacy_present"]:
+                self._reset()  # log layout changed (e.g. migration) — read_since restarted from zero
+            for t in tickets:
+                self._ingest(t)
+            changed = bool(tickets) or position != self.position
+            self.position = position
+            if changed:
+                try:
+                    self._save_snapshot()
+                except OSError as e:
+                    print(f"⚠️ Could not save analytics snapshot: {e}")
+            return len(tickets)
+
+    # -----------------------------------------------------
+    # Queries (O(1) / O(k) — independent of ticket volume)
+    # -----------------------------------------------------
+    def top_keywords(self, n: int = 5) -> list[tuple[str, int]]:
+        return self.keywords.most_common(n)
+
+    def recent(self, n: int = 3) -> list[dict]:
+        return list(self.recent_items)[-n:]
+
+    def daily_volume(self, days: int = 14) -> list[tuple[str, int]]:
+        return [(day, self.days[day]["count"]) for day in sorted(self.days)[-days:]]
+
+    def day_buckets(self, start: str = "", end: str = "9999-12-31") -> list[tuple[str, dict]]:
+        """Per-day buckets with start <= day <= end (ISO dates), oldest first."""
+        return [(day, self.days[day]) for day in sorted(self.days) if start <= day <= end]
+
+    def avg_latency(self, field: str = "total_ms"):
+        total, count = self.latency.get(field, [0.0, 0])
+        return total / count if count else None
+
+
+_analytics = None
+
+def get_analytics() -> TicketAnalytics:
+    """Process-wide analytics store (survives Streamlit reruns)."""
+    global _analytics
+    if _analytics is None:
+        _analytics = TicketAnalytics()
+    return _analytics
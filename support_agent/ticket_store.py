@@ -0,0 +1,213 @@
+# support_agent/ticket_store.py
+"""
+Append-only support ticket log shared by the RAG bot and the owner dashboard.
+
+Each ticket is written as one JSON Lines record to the active segment
+(`tickets/tickets-000001.jsonl`, ...). Segments rotate once they pass a size
+limit, so a write never touches older data and costs the same at 10 or 100k
+tickets. The legacy `support_tickets.json` array is still read (first) so
+existing history keeps showing up until it is migrated.
+
+Run `python support_agent/ticket_store.py --migrate` to move the legacy
+array into the segment log.
+"""
+
+import os, json, glob, argparse
+from contextlib import contextmanager
+
+try:
+    import fcntl  # POSIX only — serializes writers across Gradio workers
+except ImportError:
+    fcntl = None
+
+# ---------------------------------------------------------
+# CONFIG
+# ---------------------------------------------------------
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LEGACY_TICKET_PATH = os.path.join(BASE_DIR, "support_tickets.json")
+TICKET_DIR = os.getenv("SUPPORT_TICKET_DIR", os.path.join(BASE_DIR, "tickets"))
+MAX_SEGMENT_BYTES = int(os.getenv("SUPPORT_TICKET_SEGMENT_BYTES", str(8 * 1024 * 1024)))
+
+SEGMENT_PREFIX = "tickets-"
+SEGMENT_SUFFIX = ".jsonl"
+
+
+class TicketStore:
+    """Append-only, size-rotated JSONL ticket log with legacy JSON fallback."""
+
+    def __init__(self, ticket_dir: str = TICKET_DIR, legacy_path: str = LEGACY_TICKET_PATH,
+                 max_segment_bytes: int = MAX_SEGMENT_BYTES):
+        self.ticket_dir = ticket_dir
+        self.legacy_path = legacy_path
+        self.max_segment_bytes = max_segment_bytes
+        self.lock_path = os.path.join(ticket_dir, ".lock")
+
+    # -----------------------------------------------------
+    # Segments
+    # -----------------------------------------------------
+    def _segment_path(self, index: int) -> str:
+        return os.path.join(self.ticket_dir, f"{SEGMENT_PREFIX}{index:06d}{SEGMENT_SUFFIX}")
+
+    def segments(self) -> list[str]:
+        """Return all segment paths, oldest first."""
+        pattern = os.path.join(self.ticket_dir, f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}")
+        return sorted(glob.glob(pattern))
+
+    def _active_segment(self) -> str:
+        """Return the segment new tickets go to, rotating when it is full."""
+        paths = self.segments()
+        if not paths:
+            return self._segment_path(1)
+        current = paths[-1]
+        if os.path.getsize(current) < self.max_segment_bytes:
+            return current
+        index = int(os.path.basename(current)[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+        return self._segment_path(index + 1)
+
+    @contextmanager
+    def _locked(self):
+        os.makedirs(self.ticket_dir, exist_ok=True)
+        with open(self.lock_path, "a") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    # -----------------------------------------------------
+    # Writes
+    # -----------------------------------------------------
+    def append(self, ticket: dict) -> None:
+        """Append one ticket as a single JSON line (O(1) regardless of history)."""
+        self.append_many([ticket])
+
+    def append_many(self, tickets: list[dict]) -> None:
+        """Append several tickets with one locked write."""
+        if not tickets:
+            return
+        payload = "".join(json.dumps(t, ensure_ascii=False) + "\n" for t in tickets)
+        with self._locked():
+            with open(self._active_segment(), "a", encoding="utf-8") as f:
+                f.write(payload)
+
+    # -----------------------------------------------------
+    # Reads
+    # -----------------------------------------------------
+    def _read_legacy(self) -> list[dict]:
+        if not os.path.exists(self.legacy_path):
+            return []
+        try:
+            with open(self.legacy_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            print(f"⚠️ Could not decode {os.path.basename(self.legacy_path)}; skipping legacy tickets.")
+            return []
+        if not isinstance(data, list):
+            print("⚠️ Invalid legacy ticket file format; expected list.")
+            return []
+        return data
+
+    @staticmethod
+    def _read_segment(path: str, offset: int = 0) -> tuple[list[dict], int]:
+        """Read complete records from `offset`; returns (tickets, next_offset)."""
+        tickets = []
+        with open(path, "rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # partial line still being written — pick it up next time
+                offset += len(raw)
+                try:
+                    tickets.append(json.loads(raw))
+                except json.JSONDecodeError:
+                    print(f"⚠️ Skipping malformed ticket line in {os.path.basename(path)}")
+        return tickets, offset
+
+    def iter_tickets(self):
+        """Yield every ticket, legacy array first, then segments oldest → newest."""
+        yield from self._read_legacy()
+        for path in self.segments():
+            tickets, _ = self._read_segment(path)
+            yield from tickets
+
+    def load_all(self) -> list[dict]:
+        return list(self.iter_tickets())
+
+    def read_since(self, position: dict | None) -> tuple[list[dict], dict]:
+        """
+        Tickets written after `position` (None = from the beginning).
+
+        Returns (tickets, new_position). Positions are JSON-serializable so
+        readers such as the analytics store can persist them and resume in
+        O(new tickets). If the legacy file appeared or disappeared since the
+        position was taken (e.g. after --migrate), the layout changed and the
+        read restarts from the beginning; callers should then rebuild.
+        """
+        legacy_present = os.path.exists(self.legacy_path)
+        if position is None or position.get("legacy_present") != legacy_present:
+            position = {"legacy_present": legacy_present, "legacy_done": False, "segment": "", "offset": 0}
+        tickets = []
+        if not position["legacy_done"]:
+            tickets.extend(self._read_legacy())
+        segment, offset = position["segment"], position["offset"]
+        for path in self.segments():
+            name = os.path.basename(path)
+            if name < segment:
+                continue
+            new, end = self._read_segment(path, offset if name == segment else 0)
+            tickets.extend(new)
+            segment, offset = name, end
+        return tickets, {"legacy_present": legacy_present, "legacy_done": True,
+                         "segment": segment, "offset": offset}
+
+    # -----------------------------------------------------
+    # Migration
+    # -----------------------------------------------------
+    def migrate_legacy(self) -> int:
+        """Move the legacy JSON array into the segment log; returns tickets moved.
+
+        The legacy file is renamed to `*.migrated` (not deleted) so the move
+        can be inspected or rolled back by renaming it back.
+        """
+        with self._locked():
+            tickets = self._read_legacy()
+            if not os.path.exists(self.legacy_path):
+                return 0
+            if tickets:
+                # Legacy history is older than anything in the log, so it goes
+                # into a segment that sorts before every existing one.
+                first = self.segments()[0] if self.segments() else None
+                target = self._segment_path(0)
+                if first and os.path.basename(first) <= os.path.basename(target):
+                    raise RuntimeError(f"Cannot migrate: {first} already occupies the oldest slot.")
+                with open(target, "w", encoding="utf-8") as f:
+                    f.writelines(json.dumps(t, ensure_ascii=False) + "\n" for t in tickets)
+            os.replace(self.legacy_path, self.legacy_path + ".migrated")
+        return len(tickets)
+
+
+# ---------------------------------------------------------
+# DEFAULT STORE
+# ---------------------------------------------------------
+_store = None
+
+def get_store() -> TicketStore:
+    """Process-wide store using the configured ticket directory."""
+    global _store
+    if _store is None:
+        _store = TicketStore()
+    return _store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Two Peaks support ticket log")
+    parser.add_argument("--migrate", action="store_true", help="Move support_tickets.json into the JSONL log")
+    args = parser.parse_args()
+
+    store = get_store()
+    if args.migrate:
+        moved = store.migrate_legacy()
+        print(f"✅ Migrated {moved} legacy tickets into {store.ticket_dir}")
+    print(f"📄 {len(store.load_all())} tickets across {len(store.segments())} segments.")
@@ -0,0 +1,79 @@
+# tests/test_answer_cache.py
+"""Concurrent use of the semantic answer cache, as the support bot's thread pool does."""
+
+import os, sys, random, threading, time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from support_agent.answer_cache import SemanticAnswerCache
+
+
+def embed(text: str) -> list[float]:
+    """Distinct, deterministic vector per question; the sleep lets threads interleave."""
+    time.sleep(random.random() / 2000)
+    seed = int(text.split()[-1])
+    return np.random.default_rng(seed).normal(size=64).tolist()
+
+
+def test_concurrent_add_and_lookup_return_matching_answers(tmp_path):
+    cache = SemanticAnswerCache(str(tmp_path / "answers.jsonl"), embed, threshold=0.92, max_entries=150)
+    cache.load("faq")
+    added, wrong, errors = set(), [], []
+    added_lock = threading.Lock()
+
+    def add(i):
+        cache.add(f"question {i}", f"answer {i}", sampler_hint=False)
+        with added_lock:
+            added.add(i)
+
+    def lookup(i):
+        answer, _ = cache.lookup(f"question {i}", sampler_hint=False)
+        if answer is not None and answer != f"answer {i}":
+            wrong.append((i, answer))
+
+    def work(n):
+        try:
+            if n % 3 == 0:
+                add(n // 3)
+            elif n % 50 == 1:
+                cache.load("faq")  # reload / trim while others read
+            else:
+                with added_lock:
+                    pool = list(added)
+                lookup(random.choice(pool) if pool else 0)
+        except Exception as e:
+            errors.append(repr(e))
+
+    with ThreadPoolExecutor(max_workers=32) as pool:
+        list(pool.map(work, range(900)))
+
+    assert not errors
+    assert not wrong
+    assert len(cache.entries) == cache._matrix.shape[0] <= 150
+    for entry in cache.entries:
+        i = int(entry["query"].split()[-1])
+        assert cache.lookup(entry["query"], sampler_hint=False)[0] == f"answer {i}"
+
+
+def test_failed_embedding_stores_nothing(tmp_path):
+    def flaky(text):
+        if text == "question 2":
+            raise RuntimeError("embedding API down")
+        return embed(text)
+
+    cache = SemanticAnswerCache(str(tmp_path / "answers.jsonl"), flaky)
+    cache.load("faq")
+    cache.add("question 1", "answer 1", sampler_hint=False)
+    try:
+        cache.add("question 2", "answer 2", sampler_hint=False)
+    except RuntimeError:
+        pass
+    cache.add("question 3", "answer 3", sampler_hint=False)
+
+    assert [e["query"] for e in cache.entries] == ["question 1", "question 3"]
+    assert cache.lookup("question 3", sampler_hint=False)[0] == "answer 3"
+    with open(tmp_path / "answers.jsonl", encoding="utf-8") as f:
+        assert len(f.readlines()) == 2
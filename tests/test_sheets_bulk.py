@@ -0,0 +1,65 @@
+# tests/test_sheets_bulk.py
+"""Keyed bulk updates against the in-memory Sheets backend."""
+
+import os, sys, uuid
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from shared.sheets_gateway import SheetsGateway
+from shared.sheets_bulk import update_rows_by_key, update_status_by_order_ids
+from shared.sheet_cache import WorksheetCache
+
+HEADERS = ["timestamp", "order_id", "email", "first_name", "subject", "message", "status", "reviewed_by", "sent_at"]
+
+
+def templates_sheet():
+    """Fulfillment_Templates with two drafts for order 1001: an old REJECTED one and the QUEUED one."""
+    gateway = SheetsGateway(spreadsheet_name=f"test-{uuid.uuid4().hex}", backend="memory")
+    ws = gateway.worksheet("Fulfillment_Templates", headers=HEADERS)
+    ws.append_rows([
+        ["2026-01-01 09:00:00", "1001", "a@x.com", "Asha", "Old subject", "Old copy", "REJECTED", "lee", ""],
+        ["2026-01-01 09:05:00", "1002", "b@x.com", "Raj", "Hi Raj", "Copy", "SENT", "lee", "2026-01-01"],
+        ["2026-01-02 10:00:00", "1001", "a@x.com", "Asha", "New subject", "New copy", "QUEUED", "", ""],
+    ])
+    return gateway, ws
+
+
+def test_where_only_touches_the_queued_row():
+    _, ws = templates_sheet()
+    report = update_rows_by_key(ws, "order_id", {"1001": {"subject": "Edited", "status": "APPROVED"}},
+                                where={"status": "QUEUED"})
+
+    assert report["1001"] == {"result": "updated", "rows": [4]}
+    rows = ws.get_all_values()
+    assert rows[1][4:7] == ["Old subject", "Old copy", "REJECTED"]
+    assert rows[3][4:7] == ["Edited", "New copy", "APPROVED"]
+
+
+def test_where_reports_not_found_when_no_row_qualifies():
+    _, ws = templates_sheet()
+    report = update_status_by_order_ids(ws, ["1002"], "APPROVED", where={"status": "QUEUED"})
+
+    assert report["1002"]["result"] == "not_found"
+    assert ws.get_all_values()[2][6] == "SENT"
+
+
+def test_without_where_every_matching_row_changes():
+    _, ws = templates_sheet()
+    report = update_status_by_order_ids(ws, ["1001"], "APPROVED")
+
+    assert report["1001"]["rows"] == [2, 4]
+    assert [r[6] for r in ws.get_all_values()[1:]] == ["APPROVED", "SENT", "APPROVED"]
+
+
+def test_cached_update_keeps_snapshot_and_sheet_in_step():
+    gateway, ws = templates_sheet()
+    cache = WorksheetCache(gateway=gateway, check_interval=60)
+    cache.values("Fulfillment_Templates")
+
+    cache.update_status_by_order_ids("Fulfillment_Templates", ["1001"], "APPROVED",
+                                     where={"status": "QUEUED"}, reviewed_by="hitl")
+
+    expected = ws.get_all_values()
+    assert [r[6] for r in expected[1:]] == ["REJECTED", "SENT", "APPROVED"]
+    assert expected[3][7] == "hitl"
+    assert cache.values("Fulfillment_Templates") == expected